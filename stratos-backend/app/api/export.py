@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.db.session import get_db
+from app.services.export_service import (
+    ExportService,
+    EXPORT_FORMATS,
+    TEXT_FORMATS,
+    iter_markdown,
+    iter_html,
+    claim_render,
+    is_large,
+)
+from app.workers.export_worker import run_export
+
+router = APIRouter()
+
+
+def _validate(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(400, f"Unsupported format (use one of {list(EXPORT_FORMATS)})")
+
+
+def _enqueue(report_id: str, fmt: str, snapshot: models.ReportSnapshot):
+    # Already rendering this content + format → nothing to add
+    if not claim_render(snapshot.content_hash, fmt):
+        return
+
+    options = {}
+    if is_large(snapshot.payload):
+        options["queue"] = settings.EXPORT_LARGE_QUEUE
+    run_export.apply_async(args=[report_id, fmt, snapshot.content_hash], **options)
+
+
+# ------------------------------------------------------------------
+# 1. Request export (background render, cached by content hash)
+# ------------------------------------------------------------------
+@router.post("/{report_id}")
+def request_export(
+    report_id: str,
+    fmt: str = Query("pdf", alias="format"),
+    db: Session = Depends(get_db),
+):
+    _validate(fmt)
+
+    service = ExportService(db)
+    try:
+        snapshot = service.snapshot(report_id)
+    except ValueError:
+        raise HTTPException(404, "Report not found")
+
+    record = service.cached(report_id, fmt, snapshot.content_hash)
+    if record:
+        return {
+            "report_id": report_id,
+            "format": fmt,
+            "status": "ready",
+            "export_id": record.id,
+        }
+
+    _enqueue(report_id, fmt, snapshot)
+
+    return {
+        "report_id": report_id,
+        "format": fmt,
+        "status": "queued",
+    }
+
+
+# ------------------------------------------------------------------
+# 2. Download
+# - Cached artifact → served from disk
+# - Markdown / HTML not cached yet → streamed section by section
+#   while the artifact is rendered in the background
+# ------------------------------------------------------------------
+@router.get("/{report_id}/download")
+def download_export(
+    report_id: str,
+    fmt: str = Query("pdf", alias="format"),
+    db: Session = Depends(get_db),
+):
+    _validate(fmt)
+    ext, media_type = EXPORT_FORMATS[fmt]
+
+    service = ExportService(db)
+    try:
+        snapshot = service.snapshot(report_id)
+    except ValueError:
+        raise HTTPException(404, "Report not found")
+
+    filename = f"report-{report_id}-v{snapshot.version}.{ext}"
+
+    record = service.cached(report_id, fmt, snapshot.content_hash)
+    if record:
+        return FileResponse(record.file_url, media_type=media_type, filename=filename)
+
+    _enqueue(report_id, fmt, snapshot)
+
+    if fmt not in TEXT_FORMATS:
+        # Binary layout needs the whole file; client waits for export_ready
+        return JSONResponse(
+            status_code=202,
+            content={"report_id": report_id, "format": fmt, "status": "queued"},
+        )
+
+    renderer = iter_markdown if fmt == "md" else iter_html
+    return StreamingResponse(
+        renderer(snapshot.payload),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
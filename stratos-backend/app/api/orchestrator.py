@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -9,11 +10,22 @@ from app.utils.state_machine import SessionState
 router = APIRouter(prefix="/orchestrate", tags=["Orchestrator"])
 
 
+class BatchIdea(BaseModel):
+    idea_description: str
+    clarification_schema: dict = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    user_id: str
+    ideas: list[BatchIdea]
+
+
 # ------------------------------------------------------------------
 # 1. Start Session (context seeding + first AI question)
 # - Seeds context
 # - Moves session → CLARIFYING
 # - Triggers first clarification worker run
+# - 429 + Retry-After when admission control defers new sessions
 # ------------------------------------------------------------------
 @router.post("/start-session")
 def start_session(
@@ -38,11 +50,36 @@ def start_session(
     }
 
 
+# ------------------------------------------------------------------
+# 1b. Start Batch (bulk ingestion)
+# - Many ideas in one request, schemas pre-filled by the analyst
+# - Confident ideas skip clarification + consent → research directly
+# - Progress: GET /stream/batches/{batch_id} (one aggregate stream)
+# ------------------------------------------------------------------
+@router.post("/start-batch")
+def start_batch(
+    request: BatchRequest,
+    db: Session = Depends(get_db),
+):
+    batch_id, sessions = OrchestratorService.start_batch(
+        db=db,
+        user_id=request.user_id,
+        ideas=[idea.model_dump() for idea in request.ideas],
+    )
+
+    return {
+        "batch_id": batch_id,
+        "sessions": sessions,
+        "progress_stream": f"/stream/batches/{batch_id}",
+    }
+
+
 # ------------------------------------------------------------------
 # 2. Clarification Chat (multi-turn loop)
 # - Accepts user replies
 # - Appends message
 # - Triggers clarification worker
+# - During consent: reopens clarification, drops speculative research
 # ------------------------------------------------------------------
 @router.post("/clarification/chat")
 def clarification_chat(
@@ -54,7 +91,10 @@ def clarification_chat(
     if not session:
         raise HTTPException(404, "Session not found")
 
-    if session.status != SessionState.CLARIFYING:
+    if session.status not in (
+        SessionState.CLARIFYING,
+        SessionState.AWAITING_CONSENT,
+    ):
         raise HTTPException(
             400,
             f"Session not in clarification state (current: {session.status})"
@@ -97,12 +137,63 @@ def accept_clarification_consent(
     return {
         "session_id": session.id,
         "status": session.status,
-        "message": "Clarification accepted. Research can begin.",
+        "message": "Clarification accepted. Outline and research started.",
+    }
+
+
+# ------------------------------------------------------------------
+# 4. Reject Clarification (Consent)
+# - Back to CLARIFYING; speculative research is revoked + discarded
+# ------------------------------------------------------------------
+@router.post("/clarification/reject-consent")
+def reject_clarification_consent(
+    session_id: str,
+    db: Session = Depends(get_db),
+):
+    session = db.query(models.Session).filter_by(id=session_id).first()
+    if not session:
+        raise HTTPException(404, "Session not found")
+
+    if session.status != SessionState.AWAITING_CONSENT:
+        raise HTTPException(
+            400,
+            f"Consent not requested (current: {session.status})",
+        )
+
+    OrchestratorService.reject_consent(db, session)
+
+    return {
+        "session_id": session.id,
+        "status": session.status,
+        "message": "Clarification reopened.",
+    }
+
+
+# ------------------------------------------------------------------
+# 5. Cancel Session
+# - Stops in-flight pipeline work within seconds, revokes queued tasks
+# - Terminal: the session accepts no further messages
+# ------------------------------------------------------------------
+@router.post("/cancel")
+def cancel_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+):
+    session = db.query(models.Session).filter_by(id=session_id).first()
+    if not session:
+        raise HTTPException(404, "Session not found")
+
+    OrchestratorService.cancel_session(db, session)
+
+    return {
+        "session_id": session.id,
+        "status": session.status,
+        "message": "Session cancelled.",
     }
 
 
 # ------------------------------------------------------------------
-# 4. Status (debug + frontend sync)
+# 6. Status (debug + frontend sync)
 # ------------------------------------------------------------------
 @router.get("/status/{session_id}")
 def get_status(
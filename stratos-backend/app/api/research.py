@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+import json
+
+from app.db.session import get_db, SessionLocal
+from app.db import models
+from app.services.snapshot_service import iter_report, latest_snapshot
+
+router = APIRouter()
+
+
+# ------------------------------------------------------------------
+# 1. Assembled report (latest or pinned snapshot)
+# - Served straight from the stored JSON, no tree reads
+# ------------------------------------------------------------------
+@router.get("/report/{report_id}")
+def get_report(
+    report_id: str,
+    version: int | None = None,
+    db: Session = Depends(get_db),
+):
+    if version is None:
+        snapshot = latest_snapshot(db, report_id)
+    else:
+        snapshot = (
+            db.query(models.ReportSnapshot)
+            .filter_by(report_id=report_id, version=version)
+            .first()
+        )
+
+    if not snapshot:
+        raise HTTPException(404, "Report not assembled yet")
+
+    return snapshot.payload
+
+
+# ------------------------------------------------------------------
+# 2. Live report stream (NDJSON, one line per section)
+# - Reads the current tree, e.g. while sections are still being written
+# ------------------------------------------------------------------
+@router.get("/report/{report_id}/stream")
+def stream_report(report_id: str):
+    db = SessionLocal()
+
+    report = db.query(models.Report.id).filter_by(id=report_id).first()
+    if not report:
+        db.close()
+        raise HTTPException(404, "Report not found")
+
+    def lines():
+        try:
+            for part in iter_report(db, report_id):
+                yield json.dumps(part) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# ------------------------------------------------------------------
+# 3. Snapshot history
+# ------------------------------------------------------------------
+@router.get("/report/{report_id}/versions")
+def list_versions(
+    report_id: str,
+    db: Session = Depends(get_db),
+):
+    rows = (
+        db.query(
+            models.ReportSnapshot.version,
+            models.ReportSnapshot.content_hash,
+            models.ReportSnapshot.created_at,
+        )
+        .filter_by(report_id=report_id)
+        .order_by(models.ReportSnapshot.version.desc())
+        .all()
+    )
+
+    return {
+        "report_id": report_id,
+        "versions": [
+            {
+                "version": version,
+                "content_hash": digest,
+                "created_at": created_at,
+            }
+            for version, digest, created_at in rows
+        ],
+    }
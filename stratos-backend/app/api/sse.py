@@ -1,8 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from sse_starlette.sse import EventSourceResponse
 import redis.asyncio as redis
 import json
+import time
 from app.config import settings
+from app.db.session import SessionLocal
+from app.db import models
+from app.utils.batch_progress import BatchProgress
 
 router = APIRouter()
 
@@ -25,3 +29,79 @@ async def event_stream():
 @router.get("/events")
 async def subscribe():
     return EventSourceResponse(event_stream())
+
+
+def load_batch(batch_id: str) -> BatchProgress | None:
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(models.Session.id, models.Report.id, models.Session.status)
+            .outerjoin(models.Report, models.Report.session_id == models.Session.id)
+            .filter(models.Session.batch_id == batch_id)
+            .all()
+        )
+    finally:
+        db.close()
+    return BatchProgress(batch_id, rows) if rows else None
+
+
+async def batch_stream(progress: BatchProgress, pubsub):
+    """
+    One aggregate event per change in the batch (plus the initial
+    snapshot); closes once every session is ready, cancelled or failed
+    for good, or after BATCH_STREAM_IDLE_SECONDS without batch events
+    (a session stuck without ever reporting back).
+    """
+    try:
+        yield {"event": "batch_progress", "data": json.dumps(progress.snapshot())}
+        if progress.finished:
+            return
+
+        last_event = time.monotonic()
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is None:
+                if time.monotonic() - last_event >= settings.BATCH_STREAM_IDLE_SECONDS:
+                    yield {"event": "batch_idle", "data": json.dumps(progress.snapshot())}
+                    return
+                continue
+            try:
+                event = json.loads(message["data"])
+            except Exception:
+                continue
+
+            if not progress.apply(event):
+                continue
+            last_event = time.monotonic()
+
+            yield {
+                "event": "batch_progress",
+                "data": json.dumps({
+                    **progress.snapshot(),
+                    "last": {
+                        "type": event.get("type"),
+                        "session_id": (event.get("payload") or {}).get("session_id"),
+                        "report_id": (event.get("payload") or {}).get("report_id"),
+                    },
+                }),
+            }
+            if progress.finished:
+                return
+    finally:
+        await pubsub.unsubscribe("stratos_events")
+        await pubsub.close()
+
+
+@router.get("/batches/{batch_id}")
+async def subscribe_batch(batch_id: str):
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe("stratos_events")
+
+    # Snapshot read after subscribing → no events fall in between
+    progress = load_batch(batch_id)
+    if progress is None:
+        await pubsub.unsubscribe("stratos_events")
+        await pubsub.close()
+        raise HTTPException(404, "Batch not found")
+
+    return EventSourceResponse(batch_stream(progress, pubsub))
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,7 +20,100 @@ class Settings:
     LLM_PROVIDER = os.getenv("LLM_PROVIDER")
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     
+    # CLARIFICATION: quick successive messages coalesce into one LLM run
+    CLARIFICATION_DEBOUNCE_SECONDS = float(os.getenv("CLARIFICATION_DEBOUNCE_SECONDS", "2.0"))
+    CLARIFICATION_LEASE_SECONDS = float(os.getenv("CLARIFICATION_LEASE_SECONDS", "120"))
+
+    # OUTLINE: local (keyword rules, no LLM call) | llm
+    OUTLINE_MODE = os.getenv("OUTLINE_MODE", "local")
+
+    # SECTION WRITING (parallel LLM streams, evidence per section)
+    SECTION_MAX_INFLIGHT = int(os.getenv("SECTION_MAX_INFLIGHT", "4"))
+    SECTION_EVIDENCE_K = int(os.getenv("SECTION_EVIDENCE_K", "8"))
+
+    # TRENDS (weekly news buckets per topic)
+    TREND_WINDOW_WEEKS = int(os.getenv("TREND_WINDOW_WEEKS", "12"))
+
+    # EXPORTS (rendered artifacts, cached by snapshot content hash + format)
+    EXPORT_DIR = os.getenv("EXPORT_DIR", "./data/exports")
+    # Opt-in: reports this large render on their own queue, which needs its
+    # own worker (celery -A app.workers.celery_app worker -Q <EXPORT_LARGE_QUEUE>)
+    EXPORT_LARGE_MIN_CHUNKS = int(os.getenv("EXPORT_LARGE_MIN_CHUNKS", "200"))
+    EXPORT_LARGE_QUEUE = os.getenv("EXPORT_LARGE_QUEUE") or None
+
     # SERPAPI
     SERP_API_KEY = os.getenv("SERP_API_KEY")
-    
+
+    # EMBEDDINGS
+    # hashing (deterministic, no model) | local (sentence-transformers on CPU)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+    # VECTOR STORE
+    # local (memory-mapped, per report) | astra
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "local")
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "./data/vectors")
+
+    # NEAR-DUPLICATE EVIDENCE (MinHash-LSH, estimated Jaccard)
+    DEDUP_SNIPPET_THRESHOLD = float(os.getenv("DEDUP_SNIPPET_THRESHOLD", "0.8"))
+    DEDUP_PAGE_THRESHOLD = float(os.getenv("DEDUP_PAGE_THRESHOLD", "0.85"))
+    DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+
+    # DOMAIN POLICY (allow/deny/score lists, see app/data/domain_policy.json)
+    DOMAIN_POLICY_PATH = os.getenv(
+        "DOMAIN_POLICY_PATH",
+        os.path.join(os.path.dirname(__file__), "data", "domain_policy.json"),
+    )
+
+    # FETCH POLITENESS
+    CRAWLER_USER_AGENT = os.getenv("CRAWLER_USER_AGENT", "StratosBot")
+    ROBOTS_TTL_SECONDS = int(os.getenv("ROBOTS_TTL_SECONDS", "21600"))
+    FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))  # AIMD ceiling
+    FETCH_PER_HOST_CONCURRENCY = int(os.getenv("FETCH_PER_HOST_CONCURRENCY", "1"))
+    FETCH_HOST_RATE = float(os.getenv("FETCH_HOST_RATE", "1.0"))  # requests/sec
+    FETCH_HOST_BURST = int(os.getenv("FETCH_HOST_BURST", "2"))
+
+    # ADAPTIVE (AIMD) CONCURRENCY — latency targets in seconds
+    FETCH_CONCURRENCY_INITIAL = int(os.getenv("FETCH_CONCURRENCY_INITIAL", "4"))
+    FETCH_LATENCY_TARGET = float(os.getenv("FETCH_LATENCY_TARGET", "3.0"))
+    SERP_CONCURRENCY_INITIAL = int(os.getenv("SERP_CONCURRENCY_INITIAL", "4"))
+    SERP_CONCURRENCY_MAX = int(os.getenv("SERP_CONCURRENCY_MAX", "12"))
+    SERP_LATENCY_TARGET = float(os.getenv("SERP_LATENCY_TARGET", "8.0"))
+
+    # SERP engine calls per report (web/news/patent each count as one)
+    SERP_CALL_BUDGET = int(os.getenv("SERP_CALL_BUDGET", "9"))
+
+    # RESEARCH BUDGETS (deadline + SERP / page / byte allowances per plan tier)
+    # RESEARCH_BUDGETS overrides fields per tier, e.g. {"free": {"seconds": 90}}
+    RESEARCH_DEFAULT_PLAN = os.getenv("RESEARCH_DEFAULT_PLAN", "free")
+    RESEARCH_BUDGETS = json.loads(os.getenv("RESEARCH_BUDGETS", "{}"))
+
+    # EXECUTION LEASES (one live run per task + report; heartbeat every ttl/3)
+    EXECUTION_LEASE_SECONDS = float(os.getenv("EXECUTION_LEASE_SECONDS", "60"))
+
+    # FAIR SCHEDULING (per-user queues, weighted round-robin → Celery)
+    FAIR_SCHEDULING = os.getenv("FAIR_SCHEDULING", "true").lower() == "true"
+    FAIR_USER_MAX_RUNNING = int(os.getenv("FAIR_USER_MAX_RUNNING", "2"))
+    FAIR_DISPATCH_INTERVAL = float(os.getenv("FAIR_DISPATCH_INTERVAL", "0.2"))
+
+    # ADMISSION CONTROL (new sessions → 429 + Retry-After under overload)
+    ADMISSION_MAX_LAG_SECONDS = float(os.getenv("ADMISSION_MAX_LAG_SECONDS", "30"))
+    ADMISSION_MAX_USER_QUEUED = int(os.getenv("ADMISSION_MAX_USER_QUEUED", "20"))
+    ADMISSION_MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60"))
+
+    # BULK INGESTION (one fair-queue lane per user, capped task parallelism)
+    BATCH_MAX_IDEAS = int(os.getenv("BATCH_MAX_IDEAS", "100"))
+    BATCH_MAX_INFLIGHT = int(os.getenv("BATCH_MAX_INFLIGHT", "4"))
+    BATCH_MAX_QUEUED = int(os.getenv("BATCH_MAX_QUEUED", "400"))
+    # Progress stream closes after this long without any event for the batch
+    BATCH_STREAM_IDLE_SECONDS = float(os.getenv("BATCH_STREAM_IDLE_SECONDS", "900"))
+
+    # SPECULATIVE RESEARCH (prefetch while the user reviews consent)
+    SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "false").lower() == "true"
+    SPECULATIVE_QUEUE = os.getenv("SPECULATIVE_QUEUE", "speculative")
+    SERP_CACHE_TTL = int(os.getenv("SERP_CACHE_TTL", "3600"))
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "3600"))
+
 settings = Settings()
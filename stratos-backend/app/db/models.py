@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     func,
     Boolean,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -28,6 +29,7 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String)
     picture_url = Column(String)
+    plan_tier = Column(String, default="free")
     created_at = Column(DateTime, server_default=func.now())
 
     sessions = relationship("Session", back_populates="user")
@@ -46,6 +48,8 @@ class Session(Base):
     clarified_summary = Column(Text)
     # 🔥 NEW (single field)
     clarification_schema = Column(JSONB, default=dict)
+    # Set for sessions created by the bulk ingestion endpoint
+    batch_id = Column(String, index=True)
     created_at = Column(DateTime, server_default=func.now())
 
     user = relationship("User", back_populates="sessions")
@@ -71,6 +75,24 @@ class Report(Base):
     competitors = relationship("Competitor", back_populates="report")
     trends = relationship("Trend", back_populates="report")
     exports = relationship("ExportRecord", back_populates="report")
+    snapshots = relationship("ReportSnapshot", back_populates="report")
+
+
+# -----------------------------
+# REPORT SNAPSHOTS (assembled, read-only)
+# -----------------------------
+class ReportSnapshot(Base):
+    __tablename__ = "report_snapshots"
+    __table_args__ = (UniqueConstraint("report_id", "version"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    report_id = Column(String, ForeignKey("reports.id"), index=True)
+    version = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    report = relationship("Report", back_populates="snapshots")
 
 
 # -----------------------------
@@ -131,6 +153,12 @@ class Source(Base):
     url = Column(String)
     domain = Column(String)
     type = Column(String)
+    title = Column(String)
+    # News results only (SERP "source" / "date")
+    publisher = Column(String)
+    published_at = Column(DateTime, index=True)
+    # Full cleaned page text (web sources); read by the embedding worker
+    content = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
 
     report = relationship("Report", back_populates="sources")
@@ -188,6 +216,8 @@ class Trend(Base):
     id = Column(String, primary_key=True, default=generate_uuid)
     report_id = Column(String, ForeignKey("reports.id"))
     category = Column(String)
+    # Weekly series, volume + momentum (see TrendService)
+    stats = Column(JSONB)
 
     report = relationship("Report", back_populates="trends")
     items = relationship("TrendItem", back_populates="trend")
@@ -227,11 +257,14 @@ class ChatMessage(Base):
 # -----------------------------
 class ExportRecord(Base):
     __tablename__ = "exports"
+    __table_args__ = (UniqueConstraint("report_id", "file_type", "content_hash"),)
 
     id = Column(String, primary_key=True, default=generate_uuid)
     report_id = Column(String, ForeignKey("reports.id"))
     file_type = Column(String)
     file_url = Column(String)
+    # Snapshot content the artifact was rendered from (cache key with file_type)
+    content_hash = Column(String(64), index=True)
     created_at = Column(DateTime, server_default=func.now())
 
     report = relationship("Report", back_populates="exports")
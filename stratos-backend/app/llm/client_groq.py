@@ -1,6 +1,6 @@
 import os
 from groq import Groq
-from typing import List, Dict
+from typing import List, Dict, Iterator
 
 _client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
@@ -28,4 +28,32 @@ def generate_chat(messages: List[Dict[str, str]], temperature: float = 0.2) -> s
         response_format={"type": "json_object"},
     )
 
-    return response.choices[0].message.content.strip()
\ No newline at end of file
+    return response.choices[0].message.content.strip()
+
+
+def stream_chat(
+    messages: List[Dict[str, str]],
+    temperature: float = 0.3,
+    max_tokens: int = 1024,
+) -> Iterator[str]:
+    """
+    Streaming plain-text completion (no JSON mode).
+    Yields content deltas as the model produces them.
+    """
+
+    stream = _client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+
+    # Closed when the caller stops iterating (e.g. cancellation)
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+    finally:
+        stream.close()
@@ -261,3 +261,30 @@ Return JSON in this exact format:
 Clarified Summary:
 {{CLARIFIED_SUMMARY}}
 """
+
+# SECTION WRITER PROMPT
+
+SECTION_PROMPT = """
+You are an expert product strategist writing one section of a
+product research report.
+
+Section:
+{{SECTION_TITLE}}
+
+Write the body of this section only.
+
+Rules:
+- Plain prose in 2 to 4 paragraphs, separated by a blank line
+- Do NOT include the section title or any headings
+- Do NOT include markdown tables, bullet lists or code
+- Do NOT add citation markers or URLs (citations are attached afterwards)
+- Use ONLY facts supported by the evidence below
+- Prefer specific names, numbers and dates from the evidence
+- If the evidence is thin, say what is unknown instead of guessing
+
+Clarified Summary:
+{{CLARIFIED_SUMMARY}}
+
+Evidence:
+{{EVIDENCE}}
+"""
@@ -2,8 +2,10 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from threading import Thread
 
-from app.api import auth, sse, orchestrator
+from app.api import auth, sse, orchestrator, research, export
+from app.config import settings
 from app.utils.redis_sub import start_event_listener
+from app.utils.fair_queue import start_dispatcher
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -13,6 +15,13 @@ async def lifespan(app: FastAPI):
         daemon=True,
     ).start()
 
+    # Per-user queues → Celery (one live dispatcher across API processes)
+    if settings.FAIR_SCHEDULING:
+        Thread(
+            target=start_dispatcher,
+            daemon=True,
+        ).start()
+
     yield
 
     # Shutdown (nothing to clean yet)
@@ -27,6 +36,8 @@ app = FastAPI(
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(sse.router, prefix="/stream", tags=["SSE"])
 app.include_router(orchestrator.router, prefix="/orchestrate", tags=["Orchestrator"])
+app.include_router(research.router, prefix="/research", tags=["Research"])
+app.include_router(export.router, prefix="/export", tags=["Export"])
 
 @app.get("/")
 def health():
@@ -0,0 +1,221 @@
+# app/services/citation_service.py
+
+import re
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.utils.passage_ranker import STOPWORDS
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+WORD_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE)
+
+# Content-word n-grams shared by chunk and evidence
+SHINGLE_SIZE = 3
+MIN_SHARED_SHINGLES = 2
+MAX_CITATIONS_PER_CHUNK = 3
+MAX_QUOTE_CHARS = 300
+
+# Shingles found in more snippets than this are boilerplate, not evidence
+MAX_POSTINGS = 50
+
+
+def content_words(text: str) -> list[tuple[str, int, int]]:
+    """
+    (token, start, end) for every non-stopword, offsets into `text`.
+    Matched on the original string (lowercasing first can change its
+    length, e.g. "İ" → "i̇", and shift every later offset).
+    """
+    words = []
+    for m in WORD_RE.finditer(text or ""):
+        token = m.group(0).lower()
+        if token not in STOPWORDS:
+            words.append((token, m.start(), m.end()))
+    return words
+
+
+def shingle_keys(words: list[tuple[str, int, int]]) -> list[tuple[str, ...]]:
+    tokens = [w for w, _, _ in words]
+    return [
+        tuple(tokens[i:i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    ]
+
+
+class EvidenceIndex:
+    """
+    Inverted index: shingle → [(evidence index, word position)].
+
+    Matching a chunk costs one dict lookup per chunk shingle
+    (postings capped at MAX_POSTINGS), so citing a whole report is
+    linear in total chunk + evidence length.
+    """
+
+    def __init__(self):
+        self.evidence: list[tuple[str, str, list]] = []  # (source_id, snippet, words)
+        self.postings: dict[tuple, list[tuple[int, int]]] = defaultdict(list)
+
+    def add(self, source_id: str, snippet: str):
+        words = content_words(snippet)
+        idx = len(self.evidence)
+        self.evidence.append((source_id, snippet, words))
+        for pos, key in enumerate(shingle_keys(words)):
+            self.postings[key].append((idx, pos))
+
+    def match(self, text: str) -> list[tuple[int, list[int]]]:
+        """
+        Evidence sharing ≥ MIN_SHARED_SHINGLES with `text`,
+        best first, with the matched snippet positions.
+        """
+        hits = defaultdict(set)
+        for key in shingle_keys(content_words(text)):
+            postings = self.postings.get(key)
+            if not postings or len(postings) > MAX_POSTINGS:
+                continue
+            for idx, pos in postings:
+                hits[idx].add(pos)
+
+        ranked = [
+            (idx, sorted(positions))
+            for idx, positions in hits.items()
+            if len(positions) >= MIN_SHARED_SHINGLES
+        ]
+        ranked.sort(key=lambda hit: (-len(hit[1]), hit[0]))
+        return ranked
+
+    def quote(self, idx: int, positions: list[int]) -> str:
+        """
+        Densest run of matched shingles, cut from the original snippet.
+        """
+        _, snippet, words = self.evidence[idx]
+
+        best = current = [positions[0]]
+        for pos in positions[1:]:
+            if pos - current[-1] <= SHINGLE_SIZE:
+                current.append(pos)
+            else:
+                current = [pos]
+            if len(current) > len(best):
+                best = current
+
+        start = words[best[0]][1]
+        end = words[min(best[-1] + SHINGLE_SIZE - 1, len(words) - 1)][2]
+        quote = snippet[start:end]
+        if len(quote) > MAX_QUOTE_CHARS:
+            quote = quote[:MAX_QUOTE_CHARS].rsplit(" ", 1)[0] + "…"
+        return quote
+
+
+class CitationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --------------------------------------------------
+    # Cite every chunk of a report (one batch write)
+    # --------------------------------------------------
+    def cite_report(
+        self,
+        report_id: str,
+        retrieved: dict[str, list[dict]] | None = None,
+    ) -> dict:
+        """
+        retrieved: section_id → the vector-store hits ({source_id, text})
+        that section was written from. A section's chunks are matched
+        against its own hits; sections without any fall back to the
+        report's stored snippets.
+
+        Markers are numbered per report in reading order
+        ([1] = first source cited); one source keeps one marker.
+        Existing citations for the report are replaced.
+        """
+        indexes = {
+            section_id: self._hit_index(hits)
+            for section_id, hits in (retrieved or {}).items()
+            if hits
+        }
+        snippets = None
+
+        chunks = (
+            self.db.query(models.Chunk.id, models.Chunk.section_id, models.Chunk.chunk_text)
+            .join(models.Section)
+            .filter(models.Section.report_id == report_id)
+            .order_by(models.Section.order_index, models.Chunk.chunk_index)
+            .all()
+        )
+
+        markers: dict[str, str] = {}
+        rows = []
+        for chunk_id, section_id, text in chunks:
+            index = indexes.get(section_id)
+            if index is None:
+                if snippets is None:
+                    snippets = self._snippet_index(report_id)
+                index = snippets
+
+            cited = set()
+            for idx, positions in index.match(text):
+                source_id = index.evidence[idx][0]
+                if source_id in cited:
+                    continue
+                cited.add(source_id)
+
+                rows.append({
+                    "chunk_id": chunk_id,
+                    "source_id": source_id,
+                    "citation_marker": markers.setdefault(
+                        source_id, f"[{len(markers) + 1}]"
+                    ),
+                    "quote": index.quote(idx, positions),
+                })
+                if len(cited) == MAX_CITATIONS_PER_CHUNK:
+                    break
+
+        chunk_ids = [chunk_id for chunk_id, _, _ in chunks]
+        if chunk_ids:
+            (
+                self.db.query(models.Citation)
+                .filter(models.Citation.chunk_id.in_(chunk_ids))
+                .delete(synchronize_session=False)
+            )
+        if rows:
+            self.db.execute(insert(models.Citation), rows)
+        self.db.commit()
+
+        stats = {
+            "evidence": sum(len(i.evidence) for i in indexes.values())
+            + (len(snippets.evidence) if snippets else 0),
+            "chunks": len(chunks),
+            "cited_chunks": len({row["chunk_id"] for row in rows}),
+            "citations": len(rows),
+            "sources": len(markers),
+        }
+        logger.info("[CITATIONS] report=%s %s", report_id, stats)
+        return stats
+
+    def _hit_index(self, hits: list[dict]) -> EvidenceIndex:
+        index = EvidenceIndex()
+        seen = set()
+        for hit in hits:
+            key = (hit.get("source_id"), hit.get("text"))
+            if not all(key) or key in seen:
+                continue
+            seen.add(key)
+            index.add(*key)
+        return index
+
+    def _snippet_index(self, report_id: str) -> EvidenceIndex:
+        index = EvidenceIndex()
+        evidence = (
+            self.db.query(models.SourceEvidence.source_id, models.SourceEvidence.snippet)
+            .join(models.Source)
+            .filter(models.Source.report_id == report_id)
+        )
+        for source_id, snippet in evidence:
+            index.add(source_id, snippet)
+        return index
@@ -0,0 +1,214 @@
+# app/services/competitor_service.py
+
+import re
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.utils.domain_policy import domain_label
+from app.utils.entity_resolution import EntityIndex, Entity, normalize_name
+from app.utils.keyphrases import extract_keyphrases
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_COMPETITORS = 8
+MAX_FEATURES = 5
+SUMMARY_CHARS = 400
+
+# One proper-noun-ish name: "Notion", "Google Keep", "Monday.com", "Any.do"
+_WORD = r"[A-Z][A-Za-z0-9]*(?:[.\-+][A-Za-z0-9]+)*"
+NAME = rf"{_WORD}(?:\s+{_WORD}){{0,2}}"
+
+# Contexts where a capitalized name is very likely a product / company
+CONTEXT_PATTERNS = [
+    re.compile(rf"({NAME})\s+(?:vs\.?|versus)\s+({NAME})"),
+    re.compile(rf"({NAME})\s+(?i:alternatives?|competitors?|review|reviews|pricing)\b"),
+    re.compile(rf"(?i:alternatives?\s+to|competitors?\s+(?:to|of))\s+({NAME})"),
+]
+LIST_PATTERN = re.compile(
+    # List runs to the sentence end; "Monday.com" keeps its inner dot
+    r"(?i:such as|like|including|include|includes|e\.g\.)\s+((?:[^.;:()\n]|\.(?=\S))+)"
+)
+LIST_SPLIT = re.compile(r",\s*|\s+(?:and|or)\s+")
+NAME_LEAD = re.compile(rf"^{NAME}")
+
+# Title "Brand – tagline" / "Brand | tagline" / "Brand: tagline"
+TITLE_SPLIT = re.compile(r"\s+[-–—|:·]\s+|\s*[|–—·]\s*")
+
+# Capitalized words that are never a competitor on their own
+COMMON_WORDS = frozenset(
+    "the a an best top new free how why what when which who your our my this "
+    "these those app apps software tool tools platform service services guide "
+    "review reviews pricing features alternatives alternative competitors vs "
+    "market report news blog home official site best-in-class and or for with "
+    "ai i we you it in on of to is are 2023 2024 2025 2026".split()
+)
+
+
+def clean_candidate(name: str) -> str | None:
+    """
+    Strip leading/trailing generic words ("The Best Notion" → "Notion");
+    None when nothing specific remains.
+    """
+    words = name.split()
+    while words and words[0].lower() in COMMON_WORDS:
+        words.pop(0)
+    while words and words[-1].lower() in COMMON_WORDS:
+        words.pop()
+    if not words:
+        return None
+    return " ".join(words)
+
+
+def candidate_names(text: str) -> list[str]:
+    found = []
+    for pattern in CONTEXT_PATTERNS:
+        for match in pattern.finditer(text or ""):
+            found.extend(g for g in match.groups() if g)
+
+    for match in LIST_PATTERN.finditer(text or ""):
+        for item in LIST_SPLIT.split(match.group(1)):
+            # "Monday.com help teams" → "Monday.com"
+            lead = NAME_LEAD.match(item.strip())
+            if lead:
+                found.append(lead.group(0))
+
+    return [c for c in (clean_candidate(n) for n in found) if c]
+
+
+def vendor_brand(title: str, domain: str) -> str | None:
+    """
+    Brand of a vendor's own page: the title's first segment names
+    the same thing as the domain ("Notion – One workspace" on notion.so).
+    """
+    if not title or not domain:
+        return None
+
+    first = TITLE_SPLIT.split(title.strip(), 1)[0].strip()
+    label = normalize_name(domain_label(domain))
+    key = normalize_name(first)
+
+    if key and label and (key == label or key.startswith(label)):
+        return clean_candidate(first)
+    return None
+
+
+class CompetitorService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --------------------------------------------------
+    # Mentions from collected SERP data (no extra fetches)
+    # --------------------------------------------------
+    def resolve(self, report_id: str) -> list[Entity]:
+        index = EntityIndex()
+
+        sources = (
+            self.db.query(
+                models.Source.id,
+                models.Source.title,
+                models.Source.domain,
+                models.Source.type,
+            )
+            .filter(models.Source.report_id == report_id)
+            .all()
+        )
+        for source_id, title, domain, source_type in sources:
+            brand = vendor_brand(title, domain) if source_type == "web" else None
+            if brand:
+                # Vendor page: strong signal + website for enrichment
+                index.add(brand, source_id, website=f"https://{domain}", weight=2)
+            for name in candidate_names(title):
+                index.add(name, source_id)
+
+        snippets = (
+            self.db.query(models.SourceEvidence.source_id, models.SourceEvidence.snippet)
+            .join(models.Source)
+            .filter(models.Source.report_id == report_id)
+        )
+        for source_id, snippet in snippets:
+            for name in candidate_names(snippet):
+                index.add(name, source_id)
+
+        # Named by ≥ 2 sources, or backed by the vendor's own page
+        entities = [
+            e for e in index.ranked()
+            if len(e.sources) >= 2 or e.website
+        ]
+        return entities[:MAX_COMPETITORS]
+
+    # --------------------------------------------------
+    # Enrichment from a (cached) homepage fetch
+    # --------------------------------------------------
+    def enrich(self, candidates: list[str]) -> tuple[str | None, list[str]]:
+        if not candidates:
+            return None, []
+
+        summary = candidates[0][:SUMMARY_CHARS]
+        features = extract_keyphrases(
+            " ".join(candidates[:20]),
+            top_n=MAX_FEATURES,
+        )
+        return summary, features
+
+    # --------------------------------------------------
+    # Persist (replace the report's competitors, batch insert)
+    # --------------------------------------------------
+    def save(
+        self,
+        report_id: str,
+        entities: list[Entity],
+        enrichment: dict[str, tuple[str | None, list[str]]],
+    ) -> list[dict]:
+        existing = (
+            self.db.query(models.Competitor.id)
+            .filter(models.Competitor.report_id == report_id)
+            .scalar_subquery()
+        )
+        (
+            self.db.query(models.CompetitorFeature)
+            .filter(models.CompetitorFeature.competitor_id.in_(existing))
+            .delete(synchronize_session=False)
+        )
+        (
+            self.db.query(models.Competitor)
+            .filter(models.Competitor.report_id == report_id)
+            .delete(synchronize_session=False)
+        )
+
+        competitors, features = [], []
+        for entity in entities:
+            summary, phrases = enrichment.get(entity.key, (None, []))
+            competitor_id = str(uuid.uuid4())
+            competitors.append({
+                "id": competitor_id,
+                "report_id": report_id,
+                "name": entity.name,
+                "website": entity.website,
+                "summary": summary,
+            })
+            features.extend(
+                {"competitor_id": competitor_id, "feature": phrase}
+                for phrase in phrases
+            )
+
+        if competitors:
+            self.db.execute(insert(models.Competitor), competitors)
+        if features:
+            self.db.execute(insert(models.CompetitorFeature), features)
+        self.db.commit()
+
+        return [
+            {
+                "name": c["name"],
+                "website": c["website"],
+                "aliases": sorted(entity.names),
+                "sources": len(entity.sources),
+            }
+            for c, entity in zip(competitors, entities)
+        ]
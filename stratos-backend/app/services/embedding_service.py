@@ -0,0 +1,204 @@
+# app/services/embedding_service.py
+
+import re
+import time
+import zlib
+import logging
+from itertools import islice
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.config import settings
+from app.utils.text_chunker import iter_chunks
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# --------------------------------------------------
+# Encoders
+# --------------------------------------------------
+class HashingEncoder:
+    """
+    Deterministic feature-hashing encoder.
+    Unigrams + bigrams hashed into a signed, L2-normalised float32 space.
+    No model download, no GPU, identical output across processes.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+
+        for i, text in enumerate(texts):
+            tokens = TOKEN_RE.findall((text or "").lower())
+            features = tokens + [
+                f"{a} {b}" for a, b in zip(tokens, tokens[1:])
+            ]
+            for feat in features:
+                h = zlib.crc32(feat.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                signs.append(1.0 if (h >> 31) & 1 else -1.0)
+
+        flat = np.bincount(
+            np.asarray(rows, dtype=np.int64) * self.dim
+            + np.asarray(cols, dtype=np.int64),
+            weights=np.asarray(signs, dtype=np.float64),
+            minlength=len(texts) * self.dim,
+        )
+        vectors = flat.reshape(len(texts), self.dim).astype(np.float32)
+        return _l2_normalize(vectors)
+
+
+class LocalModelEncoder:
+    """
+    sentence-transformers model pinned to CPU.
+    Only loads from the local cache — never downloads.
+    """
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(
+            model_name,
+            device="cpu",
+            local_files_only=True,
+        )
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts,
+            batch_size=len(texts),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+_ENCODER = None
+
+
+def get_encoder():
+    """
+    Process-wide encoder (model load is expensive).
+    Falls back to hashing when the local model is unavailable.
+    """
+    global _ENCODER
+
+    if _ENCODER is not None:
+        return _ENCODER
+
+    if settings.EMBEDDING_BACKEND == "local":
+        try:
+            _ENCODER = LocalModelEncoder(settings.EMBEDDING_MODEL)
+            return _ENCODER
+        except Exception:
+            logger.exception(
+                "Local embedding model unavailable (%s), using hashing encoder",
+                settings.EMBEDDING_MODEL,
+            )
+
+    _ENCODER = HashingEncoder(dim=settings.EMBEDDING_DIM)
+    return _ENCODER
+
+
+# --------------------------------------------------
+# Batch container
+# --------------------------------------------------
+@dataclass
+class EmbeddingBatch:
+    """
+    Chunks + one contiguous float32 matrix (n_chunks, dim).
+    `spans` are (start, end) char offsets into the source text, if any.
+    """
+    chunks: list[str]
+    vectors: np.ndarray
+    spans: list[tuple[int, int]] = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+
+class EmbeddingService:
+    def __init__(self, encoder=None, batch_size: int | None = None):
+        self.encoder = encoder or get_encoder()
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+    # --------------------------------------------------
+    # Embed arbitrary texts in fixed-size batches
+    # --------------------------------------------------
+    def embed_texts(self, texts: list[str]) -> EmbeddingBatch:
+        vectors = np.empty((len(texts), self.encoder.dim), dtype=np.float32)
+
+        started = time.perf_counter()
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            vectors[start:start + len(batch)] = self.encoder.encode(batch)
+        elapsed = time.perf_counter() - started
+
+        return EmbeddingBatch(
+            chunks=list(texts),
+            vectors=vectors,
+            stats=self._stats(len(texts), elapsed),
+        )
+
+    # --------------------------------------------------
+    # Full document → chunks → vectors
+    # --------------------------------------------------
+    def embed_document(self, text: str) -> EmbeddingBatch:
+        """
+        Consume the streaming chunker one batch at a time: the encoder
+        sees batch_size chunks per call. Chunk strings are kept for the
+        returned batch (callers store them as metadata), so memory still
+        grows with the document.
+        """
+        chunks_iter = iter_chunks(text)
+        parts, spans, chunks = [], [], []
+
+        started = time.perf_counter()
+        while True:
+            batch = list(islice(chunks_iter, self.batch_size))
+            if not batch:
+                break
+            parts.append(self.encoder.encode([c.text for c in batch]))
+            spans.extend((c.start, c.end) for c in batch)
+            chunks.extend(c.text for c in batch)
+        elapsed = time.perf_counter() - started
+
+        vectors = (
+            np.concatenate(parts)
+            if parts
+            else np.empty((0, self.encoder.dim), dtype=np.float32)
+        )
+        return EmbeddingBatch(
+            chunks=chunks,
+            vectors=vectors,
+            spans=spans,
+            stats=self._stats(len(chunks), elapsed),
+        )
+
+    def _stats(self, n: int, elapsed: float) -> dict:
+        return {
+            "chunks": n,
+            "batch_size": self.batch_size,
+            "seconds": round(elapsed, 4),
+            "chunks_per_sec": round(n / elapsed, 1) if elapsed else None,
+        }
+
+    def embed_query(self, query: str) -> np.ndarray:
+        return self.encoder.encode([query])[0]
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
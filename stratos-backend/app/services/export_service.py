@@ -0,0 +1,281 @@
+# app/services/export_service.py
+
+import os
+import html
+import tempfile
+from typing import Iterator
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.config import settings
+from app.services.snapshot_service import latest_snapshot, save_snapshot
+from app.utils.redis_pub import redis_client
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# format → (file extension, media type)
+EXPORT_FORMATS = {
+    "md": ("md", "text/markdown; charset=utf-8"),
+    "html": ("html", "text/html; charset=utf-8"),
+    "pdf": ("pdf", "application/pdf"),
+    "docx": ("docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+}
+
+# Formats that can be streamed over HTTP while rendering
+TEXT_FORMATS = ("md", "html")
+
+# A render claimed but never finished (worker died) unblocks after this
+RENDER_LOCK_SECONDS = 15 * 60
+
+
+# --------------------------------------------------
+# In-flight renders: one per (content hash, format)
+# --------------------------------------------------
+def _render_key(content_hash: str, fmt: str) -> str:
+    return f"export:{content_hash}:{fmt}"
+
+
+def claim_render(content_hash: str, fmt: str) -> bool:
+    """
+    False when a render of this content + format is already queued.
+    """
+    return bool(redis_client.set(
+        _render_key(content_hash, fmt), 1, nx=True, ex=RENDER_LOCK_SECONDS
+    ))
+
+
+def release_render(content_hash: str, fmt: str):
+    redis_client.delete(_render_key(content_hash, fmt))
+
+
+def is_large(payload: dict) -> bool:
+    if not settings.EXPORT_LARGE_QUEUE:
+        return False
+    chunks = sum(len(s["chunks"]) for s in payload["sections"])
+    return chunks >= settings.EXPORT_LARGE_MIN_CHUNKS
+
+
+# --------------------------------------------------
+# Renderers (section by section, from a snapshot payload)
+# --------------------------------------------------
+def _chunk_text(chunk: dict) -> str:
+    markers = "".join(c["marker"] for c in chunk.get("citations", []))
+    return f"{chunk['text']} {markers}".rstrip()
+
+
+def iter_markdown(payload: dict) -> Iterator[str]:
+    yield f"# {payload.get('topic') or 'Research Report'}\n\n"
+
+    for section in payload["sections"]:
+        parts = [f"## {section['title']}\n\n"]
+        parts.extend(f"{_chunk_text(chunk)}\n\n" for chunk in section["chunks"])
+        yield "".join(parts)
+
+    if payload.get("sources"):
+        yield "## Sources\n\n" + "".join(
+            f"{s['marker']} {s['url']}\n" for s in payload["sources"]
+        )
+
+
+def iter_html(payload: dict) -> Iterator[str]:
+    title = html.escape(payload.get("topic") or "Research Report")
+    yield (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title>"
+        "<style>body{font-family:sans-serif;max-width:46em;margin:2em auto;"
+        "line-height:1.5}sup a{text-decoration:none}</style>"
+        f"</head><body>\n<h1>{title}</h1>\n"
+    )
+
+    for section in payload["sections"]:
+        parts = [f"<h2>{html.escape(section['title'])}</h2>\n"]
+        for chunk in section["chunks"]:
+            refs = "".join(
+                f"<sup><a href=\"#source-{c['marker'].strip('[]')}\">{html.escape(c['marker'])}</a></sup>"
+                for c in chunk.get("citations", [])
+            )
+            parts.append(f"<p>{html.escape(chunk['text'])}{refs}</p>\n")
+        yield "".join(parts)
+
+    if payload.get("sources"):
+        items = "".join(
+            f"<li id=\"source-{s['marker'].strip('[]')}\">{html.escape(s['marker'])} "
+            f"<a href=\"{html.escape(s['url'])}\">{html.escape(s['url'])}</a></li>\n"
+            for s in payload["sources"]
+        )
+        yield f"<h2>Sources</h2>\n<ul>\n{items}</ul>\n"
+
+    yield "</body></html>\n"
+
+
+def _write_pdf(payload: dict, path: str):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    escape = lambda text: html.escape(text or "", quote=False)
+
+    # Platypus lays out a flowable list; text is converted per section
+    story = [Paragraph(escape(payload.get("topic") or "Research Report"), styles["Title"])]
+    for section in payload["sections"]:
+        story.append(Paragraph(escape(section["title"]), styles["Heading2"]))
+        story.extend(
+            Paragraph(escape(_chunk_text(chunk)), styles["BodyText"])
+            for chunk in section["chunks"]
+        )
+        story.append(Spacer(1, 8))
+
+    if payload.get("sources"):
+        story.append(Paragraph("Sources", styles["Heading2"]))
+        story.extend(
+            Paragraph(escape(f"{s['marker']} {s['url']}"), styles["BodyText"])
+            for s in payload["sources"]
+        )
+
+    SimpleDocTemplate(path, pagesize=A4).build(story)
+
+
+def _write_docx(payload: dict, path: str):
+    try:
+        import docx
+    except ImportError:
+        raise ValueError("DOCX export requires python-docx")
+
+    document = docx.Document()
+    document.add_heading(payload.get("topic") or "Research Report", level=0)
+
+    for section in payload["sections"]:
+        document.add_heading(section["title"], level=1)
+        for chunk in section["chunks"]:
+            document.add_paragraph(_chunk_text(chunk))
+
+    if payload.get("sources"):
+        document.add_heading("Sources", level=1)
+        for s in payload["sources"]:
+            document.add_paragraph(f"{s['marker']} {s['url']}")
+
+    document.save(path)
+
+
+def render_to_file(payload: dict, fmt: str, path: str) -> int:
+    """
+    Render into a temp file next to `path`, then atomically move it in.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+
+    try:
+        if fmt in TEXT_FORMATS:
+            renderer = iter_markdown if fmt == "md" else iter_html
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for part in renderer(payload):
+                    f.write(part)
+        else:
+            os.close(fd)
+            (_write_pdf if fmt == "pdf" else _write_docx)(payload, tmp)
+
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    return os.path.getsize(path)
+
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # --------------------------------------------------
+    # Snapshot the export renders from
+    # --------------------------------------------------
+    def snapshot(self, report_id: str) -> models.ReportSnapshot:
+        snapshot = latest_snapshot(self.db, report_id)
+        if snapshot is None:
+            snapshot = save_snapshot(self.db, report_id)
+        return snapshot
+
+    # --------------------------------------------------
+    # Cache lookup: (content hash, format)
+    # --------------------------------------------------
+    def cached(self, report_id: str, fmt: str, content_hash: str) -> models.ExportRecord | None:
+        record = (
+            self.db.query(models.ExportRecord)
+            .filter_by(report_id=report_id, file_type=fmt, content_hash=content_hash)
+            .order_by(models.ExportRecord.created_at.desc())
+            .first()
+        )
+        if record and record.file_url and os.path.exists(record.file_url):
+            return record
+        return None
+
+    # --------------------------------------------------
+    # Render (or reuse) an export artifact
+    # --------------------------------------------------
+    def export(self, report_id: str, fmt: str) -> models.ExportRecord:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        snapshot = self.snapshot(report_id)
+        record = self.cached(report_id, fmt, snapshot.content_hash)
+        if record:
+            return record
+
+        ext, _ = EXPORT_FORMATS[fmt]
+        path = os.path.join(
+            settings.EXPORT_DIR,
+            report_id,
+            f"{snapshot.content_hash[:16]}.{ext}",
+        )
+
+        payload = snapshot.payload
+        chunks = sum(len(s["chunks"]) for s in payload["sections"])
+
+        size = render_to_file(payload, fmt, path)
+
+        # One row per (report, format, content): a re-render after the
+        # file went missing updates it instead of adding another
+        record = (
+            self.db.query(models.ExportRecord)
+            .filter_by(report_id=report_id, file_type=fmt, content_hash=snapshot.content_hash)
+            .first()
+        )
+        if record:
+            record.file_url = path
+            self.db.commit()
+        else:
+            record = models.ExportRecord(
+                report_id=report_id,
+                file_type=fmt,
+                file_url=path,
+                content_hash=snapshot.content_hash,
+            )
+            self.db.add(record)
+            try:
+                self.db.commit()
+            except IntegrityError:
+                # A concurrent render stored the same artifact first
+                self.db.rollback()
+                record = (
+                    self.db.query(models.ExportRecord)
+                    .filter_by(report_id=report_id, file_type=fmt, content_hash=snapshot.content_hash)
+                    .one()
+                )
+        self.db.refresh(record)
+
+        logger.info(
+            "[EXPORT] report=%s format=%s chunks=%d bytes=%d",
+            report_id,
+            fmt,
+            chunks,
+            size,
+        )
+        return record
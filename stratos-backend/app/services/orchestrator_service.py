@@ -1,17 +1,29 @@
 # app/services/orchestrator_service.py
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-import uuid, json
+import uuid
 
 from app.db import models
 from app.utils.state_machine import SessionState
 from app.utils.redis_pub import publish_event
-from app.workers.clarification_worker import run_clarification
+from app.utils.pipeline_join import mark_stage_done, reset_stages
+from app.utils.clarification_schema import clarified_summary
+from app.utils import speculation, cancellation, fair_queue
+from app.config import settings
+from app.workers.celery_app import celery_app
+from app.workers.clarification_worker import (
+    request_clarification,
+    merge_schema,
+    compute_confidence,
+    CONFIDENCE_THRESHOLD,
+)
 from app.workers.outline_worker import run_outline
-from app.workers.research_worker import run_research
-# from app.workers.trend_worker import run_trend
-# from app.workers.competitor_worker import run_competitor
+from app.workers.research_worker import run_research, prefetch_research
+from app.workers.section_worker import run_sections
+from app.workers.assembler_worker import run_assembler
+from app.workers.competitor_worker import run_competitor
 
 
 class OrchestratorService:
@@ -25,6 +37,23 @@ class OrchestratorService:
     # --------------------------------------------------
     @staticmethod
     def start_session(db: Session, user_id: str, idea_description: str):
+        user = db.query(models.User).filter_by(id=user_id).first()
+        if not user:
+            raise HTTPException(404, "User not found")
+
+        # Overloaded pipeline / user backlog full → defer, don't queue
+        retry_after = fair_queue.admit(user_id)
+        if retry_after is not None:
+            raise HTTPException(
+                429,
+                "Too many sessions in progress, retry later",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        plan_tier = user.plan_tier
+        fair_queue.set_weight(user_id, plan_tier)
+        fair_queue.set_weight(fair_queue.clarification_lane(user_id), plan_tier)
+
         session = models.Session(
             id=str(uuid.uuid4()),
             user_id=user_id,
@@ -59,6 +88,109 @@ class OrchestratorService:
 
         return session, report
 
+    # --------------------------------------------------
+    # Bulk ingestion (analysts: many ideas, pre-filled schemas)
+    # --------------------------------------------------
+    @staticmethod
+    def start_batch(db: Session, user_id: str, ideas: list[dict]):
+        """
+        One transaction for all sessions / reports / first messages.
+        Ideas whose schema already reaches CONFIDENCE_THRESHOLD skip
+        clarification + consent and go straight to outline + research;
+        the rest start the normal clarification loop pre-seeded.
+        Everything runs in the user's batch lane of the fair queue,
+        at most BATCH_MAX_INFLIGHT tasks at a time.
+        """
+        if not ideas:
+            raise HTTPException(400, "No ideas submitted")
+        if len(ideas) > settings.BATCH_MAX_IDEAS:
+            raise HTTPException(400, f"At most {settings.BATCH_MAX_IDEAS} ideas per batch")
+
+        user = db.query(models.User).filter_by(id=user_id).first()
+        if not user:
+            raise HTTPException(404, "User not found")
+
+        lane = fair_queue.batch_lane(user_id)
+        # Two jobs per idea (outline + research, or clarification)
+        retry_after = fair_queue.admit(
+            lane,
+            incoming=2 * len(ideas),
+            max_queued=settings.BATCH_MAX_QUEUED,
+        )
+        if retry_after is not None:
+            raise HTTPException(
+                429,
+                "Too much batch work in progress, retry later",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+        fair_queue.set_weight(lane, user.plan_tier)
+        fair_queue.set_cap(lane, settings.BATCH_MAX_INFLIGHT)
+
+        batch_id = str(uuid.uuid4())
+        session_rows, report_rows, message_rows, created = [], [], [], []
+
+        for idea in ideas:
+            schema = merge_schema({}, idea.get("clarification_schema") or {})
+            confidence = compute_confidence(schema)
+            ready = confidence >= CONFIDENCE_THRESHOLD
+            status = SessionState.RESEARCH_RUNNING if ready else SessionState.CLARIFYING
+
+            session_id = str(uuid.uuid4())
+            report_id = str(uuid.uuid4())
+
+            session_rows.append({
+                "id": session_id,
+                "user_id": user_id,
+                "status": status,
+                "idea_description": idea["idea_description"],
+                "clarification_schema": schema,
+                "clarified_summary": clarified_summary({
+                    "schema": schema,
+                    "confidence_score": confidence,
+                }) if ready else None,
+                "batch_id": batch_id,
+            })
+            report_rows.append({
+                "id": report_id,
+                "session_id": session_id,
+                "topic": "Pending clarification",
+                "status": status,
+            })
+            message_rows.append({
+                "id": str(uuid.uuid4()),
+                "session_id": session_id,
+                "role": "user",
+                "message": idea["idea_description"],
+            })
+            created.append({
+                "session_id": session_id,
+                "report_id": report_id,
+                "status": status,
+                "confidence_score": confidence,
+            })
+
+        db.execute(insert(models.Session), session_rows)
+        db.execute(insert(models.Report), report_rows)
+        db.execute(insert(models.ChatMessage), message_rows)
+        db.commit()
+
+        publish_event("batch_created", {
+            "batch_id": batch_id,
+            "sessions": len(created),
+            "researching": sum(c["status"] == SessionState.RESEARCH_RUNNING for c in created),
+        })
+
+        for c in created:
+            if c["status"] == SessionState.RESEARCH_RUNNING:
+                reset_stages(c["report_id"])
+                cancellation.dispatch(run_outline, c["session_id"], c["report_id"], user_id=lane)
+                cancellation.dispatch(run_research, c["session_id"], c["report_id"], user_id=lane)
+            else:
+                request_clarification(c["session_id"], debounce=0, user_id=lane)
+
+        return batch_id, created
+
     # --------------------------------------------------
     # Start clarification conversation
     # --------------------------------------------------
@@ -74,7 +206,12 @@ class OrchestratorService:
             "session_id": session.id
         })
 
-        run_clarification.delay(session.id)
+        # First question: nothing to coalesce with yet
+        request_clarification(
+            session.id,
+            debounce=0,
+            user_id=fair_queue.clarification_lane(session.user_id),
+        )
 
     # --------------------------------------------------
     # Handle user message during clarification
@@ -93,10 +230,20 @@ class OrchestratorService:
             role="user",
             message=message,
         ))
+
+        # New input after the consent prompt → summary will change,
+        # so the speculative research built on it is discarded
+        if session.status == SessionState.AWAITING_CONSENT:
+            session.status = SessionState.CLARIFYING
+            OrchestratorService.cancel_speculation(db, session)
+
         db.commit()
 
-        # Resume clarification intelligence
-        run_clarification.delay(session.id)
+        # Resume clarification intelligence (debounced, one run per session)
+        request_clarification(
+            session.id,
+            user_id=fair_queue.clarification_lane(session.user_id),
+        )
 
     # --------------------------------------------------
     # Transition to consent (no hard logic yet)
@@ -112,15 +259,7 @@ class OrchestratorService:
             return
 
         session.status = SessionState.AWAITING_CONSENT
-        session.clarified_summary = json.dumps({
-            "final_schema": payload["schema"],
-            "hard_constraints": payload.get("hard_constraints", []),
-            "hypotheses": payload.get("hypotheses", []),
-            "knowledge_gaps": payload.get("knowledge_gaps", []),
-            "research_directives": payload.get("research_directives", []),
-            "unknown_detected": payload.get("unknown_detected", []),
-            "confidence_score": payload["confidence_score"],
-        }, indent=2)
+        session.clarified_summary = clarified_summary(payload)
 
         db.commit()
 
@@ -132,6 +271,102 @@ class OrchestratorService:
             }
         )
 
+        if settings.SPECULATIVE_RESEARCH:
+            OrchestratorService.start_speculation(db, session)
+
+    # --------------------------------------------------
+    # Speculative research (prefetch while consent is pending)
+    # --------------------------------------------------
+    @staticmethod
+    def start_speculation(db: Session, session: models.Session):
+        report = db.query(models.Report).filter_by(session_id=session.id).first()
+        if not report:
+            return
+
+        task_id = str(uuid.uuid4())
+        speculation.start(report.id, task_id)
+
+        # Own queue: served by a low-concurrency worker so it never
+        # delays tasks for sessions that already consented
+        prefetch_research.apply_async(
+            args=[report.id],
+            task_id=task_id,
+            queue=settings.SPECULATIVE_QUEUE,
+        )
+
+    @staticmethod
+    def cancel_speculation(db: Session, session: models.Session):
+        report = db.query(models.Report).filter_by(session_id=session.id).first()
+        if not report:
+            return
+
+        task_id = speculation.cancel(report.id)
+        if task_id:
+            # Queued → never starts; running → stops at its next check
+            celery_app.control.revoke(task_id)
+
+    # --------------------------------------------------
+    # Cancel the whole session (any non-final state)
+    # --------------------------------------------------
+    @staticmethod
+    def cancel_session(db: Session, session: models.Session):
+        if session.status in (
+            SessionState.READY_FOR_EXPORT,
+            SessionState.CANCELLED,
+        ):
+            raise HTTPException(
+                400,
+                f"Session cannot be cancelled (current: {session.status})",
+            )
+
+        # Flag first: running workers stop at their next checkpoint
+        task_ids = cancellation.cancel(session.id)
+        if task_ids:
+            # Still in a fair queue → never published
+            fair_queue.withdraw(_lanes(session), task_ids)
+            # Queued in Celery → discarded by the worker instead of started
+            celery_app.control.revoke(task_ids)
+
+        OrchestratorService.cancel_speculation(db, session)
+
+        session.status = SessionState.CANCELLED
+        (
+            db.query(models.Report)
+            .filter_by(session_id=session.id)
+            .update({"status": SessionState.CANCELLED})
+        )
+        db.commit()
+
+        publish_event(
+            "session_cancelled",
+            {
+                "session_id": session.id,
+                "state": session.status,
+                "revoked": len(task_ids),
+            }
+        )
+
+    # --------------------------------------------------
+    # User rejects proposed research plan
+    # --------------------------------------------------
+    @staticmethod
+    def reject_consent(db: Session, session: models.Session):
+        if session.status != SessionState.AWAITING_CONSENT:
+            raise HTTPException(400, "Consent not requested")
+
+        session.status = SessionState.CLARIFYING
+        db.commit()
+
+        OrchestratorService.cancel_speculation(db, session)
+
+        publish_event(
+            "clarification_resumed",
+            {
+                "session_id": session.id,
+                "state": session.status,
+            }
+        )
+
     # --------------------------------------------------
     # User accepts proposed research plan
     # --------------------------------------------------
@@ -161,8 +396,34 @@ class OrchestratorService:
             }
         )
 
-        # 🔥 Trigger outline
-        run_outline.delay(report.id)    
+        # -----------------------------
+        # FAN-OUT (parallel)
+        # Research only needs clarified_summary, not the outline;
+        # both join in handle_stage_done before section writing.
+        # -----------------------------
+        session.status = SessionState.RESEARCH_RUNNING
+        report.status = SessionState.RESEARCH_RUNNING
+        db.commit()
+
+        reset_stages(report.id)
+
+        # The real run takes over: stop warming, keep the plan to promote
+        prefetch_id = speculation.stop(report.id)
+        if prefetch_id:
+            celery_app.control.revoke(prefetch_id)
+
+        publish_event(
+            "research_started",
+            {
+                "session_id": session.id,
+                "report_id": report.id,
+            }
+        )
+
+        # 🔥 Trigger outline + research together
+        # (tracked per session so a cancel can revoke them while queued)
+        cancellation.dispatch(run_outline, session.id, report.id, user_id=_tenant(session))
+        cancellation.dispatch(run_research, session.id, report.id, user_id=_tenant(session))
         
         
     @staticmethod
@@ -184,16 +445,9 @@ class OrchestratorService:
             return
 
         # 🔒 Idempotency guard
-        if session.status != SessionState.READY_FOR_RESEARCH:
+        if session.status != SessionState.RESEARCH_RUNNING:
             return
 
-        # -----------------------------
-        # State transition - Accept Outline
-        # -----------------------------
-        session.status = SessionState.OUTLINE_GENERATED
-        report.status = SessionState.OUTLINE_GENERATED
-        db.commit()
-
         publish_event(
             "outline_accepted",
             {
@@ -203,21 +457,117 @@ class OrchestratorService:
             }
         )
 
-        # -----------------------------
-        # FAN-OUT (parallel)
-        # -----------------------------
-        session.status = SessionState.RESEARCH_RUNNING
-        report.status = SessionState.RESEARCH_RUNNING
+        OrchestratorService.handle_stage_done(db, report_id, "outline")
+
+    @staticmethod
+    def handle_research_done(db: Session, report_id: str):
+        OrchestratorService.handle_stage_done(db, report_id, "research")
+
+    @staticmethod
+    def handle_embeddings_done(db: Session, report_id: str):
+        OrchestratorService.handle_stage_done(db, report_id, "embedding")
+
+    # --------------------------------------------------
+    # Join: outline + research + embedding → section writing
+    # --------------------------------------------------
+    @staticmethod
+    def handle_stage_done(db: Session, report_id: str, stage: str):
+        # Only the event that completes the set continues
+        if not mark_stage_done(report_id, stage):
+            return
+
+        report = db.query(models.Report).filter_by(id=report_id).first()
+        if not report:
+            return
+
+        session = (
+            db.query(models.Session)
+            .filter_by(id=report.session_id)
+            .first()
+        )
+        if not session or session.status != SessionState.RESEARCH_RUNNING:
+            return
+
+        session.status = SessionState.WRITING_SECTIONS
+        report.status = SessionState.WRITING_SECTIONS
         db.commit()
 
         publish_event(
-            "research_started",
+            "writing_sections",
+            {
+                "session_id": session.id,
+                "report_id": report.id,
+            }
+        )
+
+        cancellation.dispatch(run_sections, session.id, report.id, user_id=_tenant(session))
+
+        # Needs research sources (SERP titles/snippets), not the sections
+        cancellation.dispatch(run_competitor, session.id, report.id, user_id=_tenant(session))
+
+    # --------------------------------------------------
+    # Sections written → assemble snapshot
+    # --------------------------------------------------
+    @staticmethod
+    def handle_sections_done(db: Session, report_id: str):
+        report = db.query(models.Report).filter_by(id=report_id).first()
+        if not report:
+            return
+
+        session = (
+            db.query(models.Session)
+            .filter_by(id=report.session_id)
+            .first()
+        )
+        # 🔒 Idempotency guard
+        if not session or session.status != SessionState.WRITING_SECTIONS:
+            return
+
+        cancellation.dispatch(run_assembler, session.id, report.id, user_id=_tenant(session))
+
+    # --------------------------------------------------
+    # Snapshot stored → report ready
+    # --------------------------------------------------
+    @staticmethod
+    def handle_report_assembled(db: Session, report_id: str, payload: dict):
+        report = db.query(models.Report).filter_by(id=report_id).first()
+        if not report:
+            return
+
+        session = (
+            db.query(models.Session)
+            .filter_by(id=report.session_id)
+            .first()
+        )
+        # 🔒 Idempotency guard
+        if not session or session.status != SessionState.WRITING_SECTIONS:
+            return
+
+        session.status = SessionState.READY_FOR_EXPORT
+        report.status = SessionState.READY_FOR_EXPORT
+        db.commit()
+
+        publish_event(
+            "report_ready",
             {
                 "session_id": session.id,
                 "report_id": report.id,
+                "version": payload.get("version"),
+                "content_hash": payload.get("content_hash"),
             }
         )
 
-        run_research.delay(report.id)
-        # run_trend.delay(report.id)
-        # run_competitor.delay(report.id)
\ No newline at end of file
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def _tenant(session: models.Session) -> str:
+    # Fair-queue tenant: bulk sessions share the user's batch lane
+    if session.batch_id:
+        return fair_queue.batch_lane(session.user_id)
+    return session.user_id
+
+
+def _lanes(session: models.Session) -> list[str]:
+    # Every fair-queue tenant the session's tasks may sit in
+    return [_tenant(session), fair_queue.clarification_lane(session.user_id)]
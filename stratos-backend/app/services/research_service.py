@@ -1,13 +1,12 @@
 # TODO: Integrate SERP API (SerpAPI / Bing / Brave)
-# TODO: Domain filtering (wikipedia, blogs, product pages)
 # TODO: Duplicate URL detection
-# TODO: Rate limiting
-# TODO: Timeout handling
 
 # app/services/research_service.py
 
 import uuid
+import time
 import requests
+from itertools import islice
 from sqlalchemy.orm import Session
 from serpapi import GoogleSearch
 from typing import List, Dict
@@ -15,6 +14,24 @@ from typing import List, Dict
 from app.db import models
 from app.config import settings
 from app.utils.text_cleaner import clean_html
+from app.utils.text_chunker import iter_paragraph_text
+from app.utils.near_duplicate import NearDuplicateIndex
+from app.utils.passage_ranker import rank_passages
+from app.utils.domain_policy import host_of
+from app.utils.keyphrases import extract_keyphrases
+from app.utils import research_cache
+from app.utils.pipeline_join import expect_embedding
+from app.utils.date_parse import parse_published
+from app.utils.clarification_schema import parse_clarified_summary, summary_schema
+from app.utils.research_budget import ResearchBudget
+from app.utils.adaptive_concurrency import (
+    SERP_LIMITER,
+    FETCH_LIMITER,
+    OK,
+    TIMEOUT,
+    THROTTLED,
+    ERROR,
+)
 from app.llm.client import generate_chat
 from app.llm.prompts import RESEARCH_QUERY_PROMPT
 import json
@@ -37,9 +54,21 @@ BAD_PREFIXES = (
     "where ?",
 )
 
+# Passages kept per page before ranking / after ranking
+MAX_CANDIDATE_PASSAGES = 200
+SNIPPETS_PER_PAGE = 5
+
+EMBEDDING_TASK = "app.workers.embedding_worker.run_embedding"
+
+# Hard cap on bytes read per page (streamed; the rest is never downloaded)
+MAX_PAGE_BYTES = 2 * 2**20
+READ_CHUNK_BYTES = 64 * 1024
+
 class ResearchService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, budget: ResearchBudget | None = None):
         self.db = db
+        # Optional per-report deadline / allowances (see research_budget)
+        self.budget = budget
 
     # --------------------------------------------------
     # Query generation
@@ -47,7 +76,7 @@ class ResearchService:
     def generate_queries(self, clarified_summary: str) -> list[str]:
         """
         Generate SERP queries using LLM.
-        Fallback to deterministic queries on failure.
+        Fallback to local keyphrase queries on failure.
         """
         
         if not clarified_summary:
@@ -84,25 +113,72 @@ class ResearchService:
 
         except Exception:
             # 🚑 SAFE FALLBACK — pipeline must continue
-            return [
-                "existing solutions",
-                "competitor tools",
-                "market overview",
-            ]
+            return self.generate_local_queries(clarified_summary)
+
+    # --------------------------------------------------
+    # Local query generation (no LLM, runs instantly)
+    # --------------------------------------------------
+    def generate_local_queries(self, clarified_summary: str) -> list[str]:
+        """
+        Keyword queries from the structured final_schema fields.
+        Deterministic and CPU-only, so SERP can start before
+        the LLM queries arrive.
+        """
+        schema = summary_schema(clarified_summary)
+
+        def top(field: str) -> str:
+            phrases = extract_keyphrases(str(schema.get(field) or ""), top_n=1)
+            return phrases[0] if phrases else ""
+
+        domain = top("project_domain")
+        persona = top("target_persona")
+        problem = top("core_problem")
+        workaround = top("current_workaround")
+        solution = top("proposed_solution")
+        differentiation = top("differentiation")
+
+        templates = [
+            (solution, domain, "tools"),
+            (persona, problem, "solutions"),
+            (solution, "competitors"),
+            (domain, "market trends"),
+            (workaround, "alternatives", persona),
+            (differentiation, solution),
+        ]
+
+        queries = []
+        for parts in templates:
+            if not all(parts[:1]):
+                continue
+            query = " ".join(p for p in parts if p)
+            if 3 <= len(query.split()) <= 12 and query not in queries:
+                queries.append(query)
+
+        logger.info("[RESEARCH] Local queries: %s", queries)
+        return queries[:5]
 
     # --------------------------------------------------
     # SERP search
     # --------------------------------------------------
-    def search(self, query: str, limit: int = 5) -> list[dict]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        engines: tuple[str, ...] = ("web", "news", "patent"),
+    ) -> list[dict]:
         """
-        Fetch organic search results from SerpAPI.
+        Fetch organic search results from SerpAPI
+        for the engines the query planner assigned.
         """
-        logger.info("Running SERP search for query: %s", query)
+        logger.info("Running SERP search for query: %s (%s)", query, engines)
 
         results = []
-        results.extend(self._google_web(query, limit))
-        results.extend(self._google_news(query, limit))
-        results.extend(self._google_patents(query, limit))
+        if "web" in engines:
+            results.extend(self._google_web(query, limit))
+        if "news" in engines:
+            results.extend(self._google_news(query, limit))
+        if "patent" in engines:
+            results.extend(self._google_patents(query, limit))
 
 
         logger.info(
@@ -149,7 +225,7 @@ class ResearchService:
                 "engine": "google",
                 "q": query,
                 "tbm": "pts",
-                "num": max(10, limit),
+                "num": limit,
                 "api_key": settings.SERP_API_KEY,
             },
             source_type="patent",
@@ -159,20 +235,36 @@ class ResearchService:
     # SERP executor
     # --------------------------------------------------
     def _execute_serp(self, params: dict, source_type: str) -> List[Dict]:
-        try:
-            search = GoogleSearch(params)
-            data = search.get_dict()
-        except Exception as e:
-            logger.exception("SERP request failed (%s)", source_type)
-            return []
-
-        if "error" in data:
-            logger.error(
-                "SERP API error (%s): %s",
-                source_type,
-                data["error"],
-            )
-            return []
+        # Warm cache (speculative prefetch / recent identical query)
+        cached = research_cache.get_serp(params)
+        if cached is not None:
+            return cached
+
+        # Shared AIMD limiter gates provider concurrency + timeout
+        with SERP_LIMITER.slot() as call:
+            try:
+                search = GoogleSearch(params)
+                search.timeout = self._timeout(SERP_LIMITER.timeout())
+                data = search.get_dict()
+            except requests.Timeout:
+                call.outcome = TIMEOUT
+                logger.warning("SERP request timed out (%s)", source_type)
+                return []
+            except Exception as e:
+                # Only provider push-back shrinks the limit, not every bug
+                call.outcome = THROTTLED if _is_throttle_exception(e) else ERROR
+                logger.exception("SERP request failed (%s)", source_type)
+                return []
+
+            if "error" in data:
+                if _is_rate_limit_error(data["error"]):
+                    call.outcome = THROTTLED
+                logger.error(
+                    "SERP API error (%s): %s",
+                    source_type,
+                    data["error"],
+                )
+                return []
 
         results = []        
         # 👇 WEB + PATENTS
@@ -201,8 +293,13 @@ class ResearchService:
                 "title": r.get("title"),
                 "snippet": r.get("snippet"),
                 "type": source_type,
+                # News only: "3 days ago" / "Mar 15, 2024"; source is a
+                # string (tbm=nws) or {"name": ...} (google_news engine)
+                "date": r.get("date"),
+                "publisher": _publisher_name(r.get("source")),
             })
 
+        research_cache.set_serp(params, normalized)
         return normalized
 
     # --------------------------------------------------
@@ -216,15 +313,68 @@ class ResearchService:
             is not None
         )
     
+    # --------------------------------------------------
+    # Near-duplicate evidence (MinHash-LSH, per report)
+    # --------------------------------------------------
+    def load_snippet_index(self, report_id: str) -> NearDuplicateIndex:
+        """
+        Snippet index seeded with evidence already stored for the report
+        (a retried run must not re-insert what the first attempt saved).
+        """
+        index = NearDuplicateIndex(
+            threshold=settings.DEDUP_SNIPPET_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+        )
+
+        rows = (
+            self.db.query(models.SourceEvidence.id, models.SourceEvidence.snippet)
+            .join(models.Source)
+            .filter(models.Source.report_id == report_id)
+        )
+        for evidence_id, snippet in rows:
+            index.add(evidence_id, snippet)
+
+        return index
+
+    def new_page_index(self) -> NearDuplicateIndex:
+        return NearDuplicateIndex(
+            threshold=settings.DEDUP_PAGE_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+        )
+
+    def unique_snippets(
+        self,
+        index: NearDuplicateIndex,
+        url: str,
+        snippets: list[str],
+    ) -> list[str]:
+        """
+        Drop snippets that near-duplicate anything already kept for the report.
+        """
+        return [
+            snippet
+            for i, snippet in enumerate(snippets)
+            if index.add(f"{url}#{i}", snippet) is None
+        ]
+
     # --------------------------------------------------
     # Create source metadata (Postgres)
     # --------------------------------------------------
-    def create_source(self, report_id: str, data: dict) -> models.Source:
+    def create_source(
+        self,
+        report_id: str,
+        data: dict,
+        content: str | None = None,
+    ) -> models.Source:
         source = models.Source(
             report_id=report_id,
             url=data["url"],
             domain=data.get("domain"),
             type=data.get("type", "web"),
+            title=data.get("title"),
+            publisher=data.get("publisher"),
+            published_at=parse_published(data.get("date")),
+            content=content,
         )
 
         self.db.add(source)
@@ -237,43 +387,110 @@ class ResearchService:
     # Scrape + extract
     # --------------------------------------------------
     def scrape_and_extract(self, url: str) -> tuple[list[str], str | None]:
+        cached = research_cache.get_page(url)
+        if cached is not None:
+            return cached
+
+        if self.budget is not None and not self.budget.take_page():
+            return [], None
+
+        started = time.monotonic()
         try:
             resp = requests.get(
                 url,
-                timeout=10,
+                timeout=self._timeout(FETCH_LIMITER.timeout()),
+                stream=True,
                 headers = {
-                    "User-Agent": (
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0 Safari/537.36"
-                    ),
+                    # Same agent robots.txt was checked for
+                    "User-Agent": settings.CRAWLER_USER_AGENT,
                     "Accept-Language": "en-US,en;q=0.9",
                 }
             )
+            FETCH_LIMITER.record(
+                THROTTLED if resp.status_code == 429 or resp.status_code >= 500 else OK,
+                time.monotonic() - started,
+            )
+
             if resp.status_code != 200:
                 logger.warning(
                     "Non-200 response (%s) for url=%s",
                     resp.status_code,
                     url,
                 )
+                resp.close()
                 return [], None
 
-            cleaned = clean_html(resp.text)
+            cleaned = clean_html(self._read_body(resp))
 
-            raw_lines = cleaned.split("\n")
+            # Candidate passages; ranked later in one batch per report
+            candidates = list(islice(
+                (
+                    paragraph
+                    for paragraph in iter_paragraph_text(cleaned)
+                    if self._is_valid_snippet(paragraph)
+                ),
+                MAX_CANDIDATE_PASSAGES,
+            ))
 
-            snippets = [
-                line.strip()
-                for line in raw_lines
-                if self._is_valid_snippet(line)
-            ][:5]
+            research_cache.set_page(url, candidates, cleaned)
+            return candidates, cleaned
 
-            return snippets, cleaned
+        except requests.Timeout:
+            FETCH_LIMITER.record(TIMEOUT)
+            logger.warning("Timed out scraping url=%s", url)
+            return [], None
 
         except Exception:
             logger.exception("Failed to scrape url=%s", url)
             return [], None
 
+    def _read_body(self, resp: requests.Response) -> str:
+        """
+        Stream the body up to MAX_PAGE_BYTES (or the bytes left in the
+        budget), stopping early at the deadline.
+        """
+        limit = MAX_PAGE_BYTES
+        if self.budget is not None:
+            limit = min(limit, self.budget.bytes_left())
+
+        chunks, size = [], 0
+        try:
+            for chunk in resp.iter_content(READ_CHUNK_BYTES):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= limit or (self.budget is not None and self.budget.expired()):
+                    break
+        finally:
+            resp.close()
+
+        if self.budget is not None:
+            self.budget.add_bytes(size)
+        return b"".join(chunks)[:limit].decode(resp.encoding or "utf-8", errors="replace")
+
+    def _timeout(self, default: float) -> float:
+        return self.budget.timeout(default) if self.budget is not None else default
+
+    # --------------------------------------------------
+    # Relevance ranking (BM25, batched across all pages)
+    # --------------------------------------------------
+    def select_snippets(
+        self,
+        pages: list[tuple[str, list[str]]],
+        clarified_summary: str,
+        k: int = SNIPPETS_PER_PAGE,
+    ) -> list[list[str]]:
+        """
+        pages = [(originating query, candidate passages), ...]
+        Returns the top-k passages of each page against its query
+        plus the clarified summary.
+        """
+        return rank_passages(
+            pages=[candidates for _, candidates in pages],
+            page_queries=[query for query, _ in pages],
+            context=self._summary_text(clarified_summary),
+            k=k,
+        )
+
     # --------------------------------------------------
     # Save snippets (Postgres)
     # --------------------------------------------------
@@ -295,26 +512,39 @@ class ResearchService:
     # --------------------------------------------------
     # Save raw text (Astra)
     # --------------------------------------------------
-    def save_to_astra(
-        self,
-        report_id: str,
-        source_id: str,
-        url: str,
-        text: str,
-        metadata: dict,
-    ):
+    def save_to_astra(self, report_id: str, source_id: str):
         """
-        TODO:
-        - Insert into Astra 'evidence' collection
-        - Include full cleaned text
+        Queue the embedding worker for a stored source; it loads the
+        full text (Source.content) and appends it to the report's
+        vector store (local memory-mapped or Astra 'evidence' collection).
+        Only ids cross the broker.
         """
-        pass
+        # Imported here: celery_app imports the research worker, which imports us
+        from app.workers.celery_app import celery_app
+
+        # Section writing waits until every counted embedding finished
+        expect_embedding(report_id)
+        celery_app.send_task(EMBEDDING_TASK, args=[report_id, source_id])
 
     # --------------------------------------------------
     # Helpers
     # --------------------------------------------------
     def _extract_domain(self, url: str) -> str:
-        return url.split("//")[-1].split("/")[0]
+        return host_of(url)
+
+    def _summary_text(self, clarified_summary: str) -> str:
+        """
+        Flatten the clarified summary JSON into plain ranking context.
+        """
+        data = parse_clarified_summary(clarified_summary)
+        if data is None:
+            return clarified_summary or ""
+
+        schema = data.get("final_schema") or {}
+        parts = [str(v) for v in schema.values() if v]
+        parts.extend(str(d) for d in data.get("research_directives") or [])
+        return " ".join(parts)
+
     
     # --------------------------------------------------
     # Evidence quality helpers
@@ -328,4 +558,23 @@ class ResearchService:
         return (
             len(t) >= 40 and
             not t.startswith(BAD_PREFIXES)
-        )
\ No newline at end of file
+        )
+
+
+def _is_rate_limit_error(message: str) -> bool:
+    message = str(message).lower()
+    return any(s in message for s in ("rate", "limit", "too many", "exceeded"))
+
+
+def _is_throttle_exception(exc: Exception) -> bool:
+    # HTTP errors carry the response: 429 / 5xx, as for page fetches
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return _is_rate_limit_error(exc)
+
+
+def _publisher_name(source) -> str | None:
+    if isinstance(source, dict):
+        return source.get("name")
+    return source or None
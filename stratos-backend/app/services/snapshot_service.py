@@ -0,0 +1,207 @@
+# app/services/snapshot_service.py
+
+import json
+import hashlib
+from itertools import groupby
+from typing import Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Rows fetched per round trip while streaming chunks
+CHUNK_BATCH = 500
+
+
+# --------------------------------------------------
+# Streaming read of the report tree
+# --------------------------------------------------
+def iter_report(db: Session, report_id: str) -> Iterator[dict]:
+    """
+    Yields, in order:
+      {"type": "report",   report_id, topic, status}
+      {"type": "section",  id, title, order_index, chunks: [...]}  (one per section)
+      {"type": "sources",  sources: [...]}                          (cited sources, by marker)
+
+    Queries: report row, all citations (+ source columns),
+    then sections ⟕ chunks streamed in order.
+    """
+    report = (
+        db.query(models.Report.id, models.Report.topic, models.Report.status)
+        .filter_by(id=report_id)
+        .first()
+    )
+    if not report:
+        raise ValueError("Report not found")
+
+    yield {
+        "type": "report",
+        "report_id": report.id,
+        "topic": report.topic,
+        "status": report.status,
+    }
+
+    # Citations are small next to chunk text → load once, keyed by chunk
+    citations = (
+        db.query(
+            models.Citation.chunk_id,
+            models.Citation.citation_marker,
+            models.Citation.quote,
+            models.Source.id,
+            models.Source.url,
+            models.Source.domain,
+            models.Source.type,
+        )
+        .join(models.Chunk, models.Citation.chunk_id == models.Chunk.id)
+        .join(models.Section, models.Chunk.section_id == models.Section.id)
+        .join(models.Source, models.Citation.source_id == models.Source.id)
+        .filter(models.Section.report_id == report_id)
+        .all()
+    )
+
+    by_chunk = {}
+    sources = {}
+    for chunk_id, marker, quote, source_id, url, domain, source_type in citations:
+        by_chunk.setdefault(chunk_id, []).append({
+            "marker": marker,
+            "source_id": source_id,
+            "quote": quote,
+        })
+        sources.setdefault(source_id, {
+            "marker": marker,
+            "source_id": source_id,
+            "url": url,
+            "domain": domain,
+            "type": source_type,
+        })
+
+    for chunk_citations in by_chunk.values():
+        chunk_citations.sort(key=lambda c: _marker_number(c["marker"]))
+
+    rows = (
+        db.query(
+            models.Section.id,
+            models.Section.title,
+            models.Section.order_index,
+            models.Chunk.id,
+            models.Chunk.chunk_index,
+            models.Chunk.chunk_text,
+        )
+        .outerjoin(models.Chunk, models.Chunk.section_id == models.Section.id)
+        .filter(models.Section.report_id == report_id)
+        .order_by(models.Section.order_index, models.Chunk.chunk_index)
+        .yield_per(CHUNK_BATCH)
+    )
+
+    for (section_id, title, order_index), section_rows in groupby(
+        rows, key=lambda row: row[:3]
+    ):
+        yield {
+            "type": "section",
+            "id": section_id,
+            "title": title,
+            "order_index": order_index,
+            "chunks": [
+                {
+                    "id": chunk_id,
+                    "index": chunk_index,
+                    "text": text,
+                    "citations": by_chunk.get(chunk_id, []),
+                }
+                for *_, chunk_id, chunk_index, text in section_rows
+                if chunk_id is not None
+            ],
+        }
+
+    yield {
+        "type": "sources",
+        "sources": sorted(
+            sources.values(),
+            key=lambda s: _marker_number(s["marker"]),
+        ),
+    }
+
+
+def _marker_number(marker: str) -> int:
+    digits = (marker or "").strip("[]")
+    return int(digits) if digits.isdigit() else 0
+
+
+# --------------------------------------------------
+# Snapshot materialization
+# --------------------------------------------------
+def build_payload(db: Session, report_id: str) -> dict:
+    payload = {"sections": []}
+    for part in iter_report(db, report_id):
+        kind = part.pop("type")
+        if kind == "section":
+            payload["sections"].append(part)
+        elif kind == "sources":
+            payload["sources"] = part["sources"]
+        else:
+            # Pipeline status is live state, not report content
+            part.pop("status", None)
+            payload.update(part)
+    return payload
+
+
+def content_hash(payload: dict) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def latest_snapshot(db: Session, report_id: str) -> models.ReportSnapshot | None:
+    return (
+        db.query(models.ReportSnapshot)
+        .filter_by(report_id=report_id)
+        .order_by(models.ReportSnapshot.version.desc())
+        .first()
+    )
+
+
+def save_snapshot(db: Session, report_id: str) -> models.ReportSnapshot:
+    payload = build_payload(db, report_id)
+    digest = content_hash(payload)
+
+    # Row lock on the report serialises concurrent writers (assembler,
+    # export): version = max + 1 and the hash check below stay race-free
+    (
+        db.query(models.Report.id)
+        .filter(models.Report.id == report_id)
+        .with_for_update()
+        .first()
+    )
+
+    latest = latest_snapshot(db, report_id)
+    if latest and latest.content_hash == digest:
+        return latest
+
+    version = (
+        db.query(func.coalesce(func.max(models.ReportSnapshot.version), 0))
+        .filter(models.ReportSnapshot.report_id == report_id)
+        .scalar()
+    ) + 1
+
+    snapshot = models.ReportSnapshot(
+        report_id=report_id,
+        version=version,
+        content_hash=digest,
+        payload={**payload, "version": version, "content_hash": digest},
+    )
+    db.add(snapshot)
+    db.commit()
+
+    logger.info(
+        "[SNAPSHOT] report=%s version=%d sections=%d hash=%s",
+        report_id,
+        version,
+        len(payload["sections"]),
+        digest[:12],
+    )
+    return snapshot
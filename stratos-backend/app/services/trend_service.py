@@ -0,0 +1,256 @@
+# app/services/trend_service.py
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.services.embedding_service import HashingEncoder
+from app.utils.keyphrases import extract_keyphrases
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Hashed-embedding cosine for two headlines to share a topic
+TOPIC_SIMILARITY = 0.3
+MAX_TOPICS = 6
+OTHER_TOPIC = "Other coverage"
+
+# Momentum compares the last RECENT_WEEKS with the RECENT_WEEKS before
+RECENT_WEEKS = 4
+
+
+def cluster_topics(vectors: np.ndarray, threshold: float = TOPIC_SIMILARITY) -> np.ndarray:
+    """
+    Leader clustering on the full similarity matrix (news per report is
+    small, so n×n is cheap): best-connected items lead first and absorb
+    their unassigned neighbours. Returns a cluster id per row.
+    """
+    n = len(vectors)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n == 0:
+        return labels
+
+    adjacency = (vectors @ vectors.T) >= threshold
+    order = np.argsort(-adjacency.sum(axis=1), kind="stable")
+
+    cluster = 0
+    for leader in order:
+        if labels[leader] >= 0:
+            continue
+        members = adjacency[leader] & (labels < 0)
+        members[leader] = True
+        labels[members] = cluster
+        cluster += 1
+    return labels
+
+
+def weekly_stats(labels: np.ndarray, published: np.ndarray, now: datetime, weeks: int) -> dict:
+    """
+    Columnar pass over all items: bucket ages into weeks, then
+    volume / momentum / slope for every topic at once.
+    """
+    topics = int(labels.max()) + 1 if len(labels) else 0
+    now64 = np.datetime64(now, "s")
+
+    dated = ~np.isnat(published)
+    age_days = (now64 - published) / np.timedelta64(1, "D")
+    in_window = dated & (age_days >= 0) & (age_days < weeks * 7)
+
+    # Week 0 = oldest, weeks-1 = current week
+    bucket = weeks - 1 - np.floor(np.where(in_window, age_days, 0) / 7).astype(np.int64)
+    series = np.bincount(
+        labels[in_window] * weeks + bucket[in_window],
+        minlength=topics * weeks,
+    ).reshape(topics, weeks)
+
+    volume = np.bincount(labels, minlength=topics)
+    undated = np.bincount(labels[~dated], minlength=topics)
+    recent = series[:, -RECENT_WEEKS:].sum(axis=1)
+    prior = series[:, -2 * RECENT_WEEKS:-RECENT_WEEKS].sum(axis=1)
+
+    t = np.arange(weeks) - (weeks - 1) / 2
+    slope = series @ t / (t @ t)
+
+    return {
+        "series": series,
+        "volume": volume,
+        "undated": undated,
+        "recent": recent,
+        "prior": prior,
+        "momentum": (recent - prior) / np.maximum(prior, 1),
+        "slope": slope,
+        "share": volume / max(int(volume.sum()), 1),
+    }
+
+
+class TrendService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.encoder = HashingEncoder(dim=256)
+
+    # --------------------------------------------------
+    # One batch pass per report
+    # --------------------------------------------------
+    def build(self, report_id: str, now: datetime | None = None) -> list[dict]:
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        weeks = settings.TREND_WINDOW_WEEKS
+
+        # One row per article: a single snippet, not one row per snippet
+        snippet = (
+            self.db.query(models.SourceEvidence.snippet)
+            .filter(models.SourceEvidence.source_id == models.Source.id)
+            .limit(1)
+            .correlate(models.Source)
+            .scalar_subquery()
+        )
+        rows = (
+            self.db.query(
+                models.Source.title,
+                models.Source.url,
+                models.Source.published_at,
+                snippet,
+            )
+            .filter(models.Source.report_id == report_id, models.Source.type == "news")
+            .all()
+        )
+
+        self._clear(report_id)
+        if not rows:
+            self.db.commit()
+            return []
+
+        titles = [title or "" for title, _, _, _ in rows]
+        vectors = self.encoder.encode([
+            f"{title or ''} {snippet or ''}" for title, _, _, snippet in rows
+        ])
+        published = np.array(
+            [p if p is not None else "NaT" for _, _, p, _ in rows],
+            dtype="datetime64[s]",
+        )
+
+        labels, other = self._cap_topics(cluster_topics(vectors))
+        stats = weekly_stats(labels, published, now, weeks)
+
+        week_starts = [
+            (now - timedelta(weeks=weeks - 1 - w)).date().isoformat()
+            for w in range(weeks)
+        ]
+
+        trends, trend_rows, item_rows = [], [], []
+        # Largest topics first, leftovers last
+        for topic in [*np.argsort(-stats["volume"][:other], kind="stable"), other]:
+            members = np.flatnonzero(labels == topic)
+            if len(members) == 0:
+                continue
+
+            name = (
+                self._label([titles[i] for i in members])
+                if topic != other else OTHER_TOPIC
+            )
+            trend = {
+                "topic": name,
+                "volume": int(stats["volume"][topic]),
+                "undated": int(stats["undated"][topic]),
+                "recent_weeks": int(stats["recent"][topic]),
+                "prior_weeks": int(stats["prior"][topic]),
+                "momentum": round(float(stats["momentum"][topic]), 3),
+                "slope": round(float(stats["slope"][topic]), 4),
+                "share": round(float(stats["share"][topic]), 3),
+                "week_starts": week_starts,
+                "series": stats["series"][topic].tolist(),
+            }
+            trends.append(trend)
+
+            trend_id = str(uuid.uuid4())
+            trend_rows.append({
+                "id": trend_id,
+                "report_id": report_id,
+                "category": name,
+                "stats": trend,
+            })
+            item_rows.extend(
+                {
+                    "trend_id": trend_id,
+                    "title": rows[i][0],
+                    "url": rows[i][1],
+                    "summary": rows[i][3],
+                    "published_at": rows[i][2],
+                }
+                for i in members
+            )
+
+        self.db.execute(insert(models.Trend), trend_rows)
+        self.db.execute(insert(models.TrendItem), item_rows)
+        self.db.commit()
+
+        logger.info(
+            "[TRENDS] report=%s items=%d topics=%s",
+            report_id,
+            len(rows),
+            [t["topic"] for t in trends],
+        )
+        return trends
+
+    # --------------------------------------------------
+    # Text block for the "Market & Industry Trends" section
+    # --------------------------------------------------
+    @staticmethod
+    def describe(trends: list[dict]) -> str:
+        if not trends:
+            return ""
+
+        lines = [
+            f"News volume by topic (last {RECENT_WEEKS} weeks vs the "
+            f"{RECENT_WEEKS} before; momentum = relative change):"
+        ]
+        for t in trends:
+            lines.append(
+                f"- {t['topic']}: {t['volume']} articles "
+                f"({t['share']:.0%} of coverage), "
+                f"{t['recent_weeks']} recent vs {t['prior_weeks']} prior, "
+                f"momentum {t['momentum']:+.0%}"
+            )
+        return "\n".join(lines)
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+    def _cap_topics(self, labels: np.ndarray) -> tuple[np.ndarray, int]:
+        """
+        Keep the MAX_TOPICS largest multi-item clusters; everything
+        else is relabelled to one "other" topic (returned id).
+        """
+        sizes = np.bincount(labels)
+        keep = [c for c in np.argsort(-sizes, kind="stable") if sizes[c] > 1][:MAX_TOPICS]
+
+        remap = np.full(len(sizes), len(keep), dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        return remap[labels], len(keep)
+
+    def _label(self, titles: list[str]) -> str:
+        phrases = extract_keyphrases(". ".join(titles), top_n=1, max_words=3)
+        return phrases[0].title() if phrases else OTHER_TOPIC
+
+    def _clear(self, report_id: str):
+        existing = (
+            self.db.query(models.Trend.id)
+            .filter(models.Trend.report_id == report_id)
+            .scalar_subquery()
+        )
+        (
+            self.db.query(models.TrendItem)
+            .filter(models.TrendItem.trend_id.in_(existing))
+            .delete(synchronize_session=False)
+        )
+        (
+            self.db.query(models.Trend)
+            .filter(models.Trend.report_id == report_id)
+            .delete(synchronize_session=False)
+        )
@@ -0,0 +1,406 @@
+# app/services/vector_store.py
+
+import os
+import json
+import fcntl
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# Rows scanned per matmul block (bounds peak memory on huge reports)
+SCAN_BLOCK_ROWS = 65536
+
+# Below this many rows brute force beats any index
+IVF_MIN_ROWS = 50_000
+
+
+class VectorStore(ABC):
+    """
+    Per-report evidence vector store.
+    Each row = one embedded chunk + JSON metadata.
+    """
+
+    @abstractmethod
+    def add(self, vectors: np.ndarray, metadatas: list[dict]) -> int:
+        ...
+
+    @abstractmethod
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 8,
+        source_type: str | None = None,
+        domain: str | None = None,
+    ) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+
+# --------------------------------------------------
+# Local (memory-mapped, one directory per report)
+# --------------------------------------------------
+class LocalVectorStore(VectorStore):
+    """
+    Append-only files under VECTOR_STORE_DIR/<report_id>/:
+
+    - vectors.f32   float32 rows, memory-mapped for search
+    - tags.i32      (source_type code, domain code) per row
+    - meta.jsonl    one JSON object per row
+    - meta.idx      uint64 byte offset of each meta line
+    - manifest.json dim, row count, tag vocabularies (commit point)
+    - ivf.npz       optional coarse-quantizer index
+    """
+
+    def __init__(self, report_id: str, dim: int | None = None, root: str | None = None):
+        self.report_id = report_id
+        self.dir = os.path.join(root or settings.VECTOR_STORE_DIR, report_id)
+        self.dim = dim or settings.EMBEDDING_DIM
+        os.makedirs(self.dir, exist_ok=True)
+
+    # --------------------------------------------------
+    # Paths + manifest
+    # --------------------------------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._path("manifest.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"dim": self.dim, "rows": 0, "types": [], "domains": []}
+
+    def _write_manifest(self, manifest: dict):
+        tmp = self._path("manifest.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._path("manifest.json"))
+
+    @contextmanager
+    def _lock(self):
+        with open(self._path(".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def count(self) -> int:
+        return self._read_manifest()["rows"]
+
+    # --------------------------------------------------
+    # Incremental append (safe across worker processes)
+    # --------------------------------------------------
+    def add(self, vectors: np.ndarray, metadatas: list[dict]) -> int:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(metadatas):
+            raise ValueError("vectors/metadatas shape mismatch")
+        if len(vectors) == 0:
+            return 0
+
+        with self._lock():
+            manifest = self._read_manifest()
+            if vectors.shape[1] != manifest["dim"]:
+                raise ValueError(
+                    f"Vector dim {vectors.shape[1]} != store dim {manifest['dim']}"
+                )
+
+            type_codes = {v: i for i, v in enumerate(manifest["types"])}
+            domain_codes = {v: i for i, v in enumerate(manifest["domains"])}
+
+            tags = np.empty((len(metadatas), 2), dtype=np.int32)
+            for i, meta in enumerate(metadatas):
+                tags[i, 0] = _code(manifest["types"], type_codes, meta.get("type"))
+                tags[i, 1] = _code(manifest["domains"], domain_codes, meta.get("domain"))
+
+            # Writers may have died mid-append: truncate to committed rows
+            rows = manifest["rows"]
+            self._truncate(rows, manifest["dim"])
+
+            with open(self._path("meta.jsonl"), "ab") as f:
+                pos = f.tell()
+                offsets = np.empty(len(metadatas), dtype=np.uint64)
+                for i, meta in enumerate(metadatas):
+                    line = (json.dumps(meta) + "\n").encode("utf-8")
+                    offsets[i] = pos
+                    f.write(line)
+                    pos += len(line)
+
+            with open(self._path("vectors.f32"), "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._path("tags.i32"), "ab") as f:
+                f.write(tags.tobytes())
+            with open(self._path("meta.idx"), "ab") as f:
+                f.write(offsets.tobytes())
+
+            manifest["rows"] = rows + len(vectors)
+            self._write_manifest(manifest)
+
+        logger.debug(
+            "Vector store report=%s appended %d rows (total=%d)",
+            self.report_id,
+            len(vectors),
+            manifest["rows"],
+        )
+        return len(vectors)
+
+    def _truncate(self, rows: int, dim: int):
+        for name, row_bytes in (
+            ("vectors.f32", 4 * dim),
+            ("tags.i32", 8),
+            ("meta.idx", 8),
+        ):
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > rows * row_bytes:
+                os.truncate(path, rows * row_bytes)
+
+    # --------------------------------------------------
+    # Search
+    # --------------------------------------------------
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 8,
+        source_type: str | None = None,
+        domain: str | None = None,
+        nprobe: int = 8,
+    ) -> list[dict]:
+        manifest = self._read_manifest()
+        rows, dim = manifest["rows"], manifest["dim"]
+        if rows == 0:
+            return []
+
+        type_code = _lookup(manifest["types"], source_type)
+        domain_code = _lookup(manifest["domains"], domain)
+        if type_code == -2 or domain_code == -2:
+            return []
+
+        vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dim))
+        tags = np.memmap(self._path("tags.i32"), dtype=np.int32, mode="r", shape=(rows, 2))
+        query = np.asarray(query, dtype=np.float32).reshape(dim)
+
+        candidates = self._ivf_candidates(query, rows, nprobe)
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+
+        for block in _blocks(candidates, rows):
+            block_tags = tags[block]
+            mask = np.ones(len(block_tags), dtype=bool)
+            if type_code >= 0:
+                mask &= block_tags[:, 0] == type_code
+            if domain_code >= 0:
+                mask &= block_tags[:, 1] == domain_code
+
+            idx = _block_rows(block)[mask]
+            if len(idx) == 0:
+                continue
+
+            scores = (vectors[block] @ query)[mask]
+            best_rows = np.concatenate([best_rows, idx])
+            best_scores = np.concatenate([best_scores, scores])
+
+            if len(best_scores) > k:
+                keep = np.argpartition(-best_scores, k)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        order = np.argsort(-best_scores)[:k]
+        metas = self._read_metas(best_rows[order], rows)
+        return [
+            {**meta, "score": float(best_scores[i])}
+            for meta, i in zip(metas, order)
+        ]
+
+    def _read_metas(self, hits: np.ndarray, rows: int) -> list[dict]:
+        offsets = np.memmap(self._path("meta.idx"), dtype=np.uint64, mode="r", shape=(rows,))
+        metas = []
+        with open(self._path("meta.jsonl"), "rb") as f:
+            for row in hits:
+                f.seek(int(offsets[row]))
+                metas.append(json.loads(f.readline()))
+        return metas
+
+    # --------------------------------------------------
+    # Approximate index (IVF, spherical k-means)
+    # --------------------------------------------------
+    def build_index(self, nlist: int | None = None, iters: int = 10, sample: int = 100_000):
+        """
+        Cluster rows into `nlist` inverted lists.
+        Rows appended afterwards are still scanned exhaustively,
+        so the index only needs periodic rebuilds.
+        """
+        manifest = self._read_manifest()
+        rows, dim = manifest["rows"], manifest["dim"]
+        if rows < IVF_MIN_ROWS:
+            return None
+
+        nlist = nlist or int(np.sqrt(rows))
+        vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dim))
+
+        rng = np.random.default_rng(0)
+        train = vectors[np.sort(rng.choice(rows, size=min(sample, rows), replace=False))]
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+
+        for _ in range(iters):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, train)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        assign = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, SCAN_BLOCK_ROWS):
+            block = vectors[start:start + SCAN_BLOCK_ROWS]
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))])
+
+        np.savez(
+            self._path("ivf.npz"),
+            centroids=centroids,
+            order=order,
+            offsets=offsets,
+            rows=np.int64(rows),
+        )
+        logger.info(
+            "Built IVF index report=%s rows=%d nlist=%d",
+            self.report_id,
+            rows,
+            nlist,
+        )
+        return nlist
+
+    def _ivf_candidates(self, query: np.ndarray, rows: int, nprobe: int):
+        path = self._path("ivf.npz")
+        if rows < IVF_MIN_ROWS or not os.path.exists(path):
+            return None
+
+        index = np.load(path)
+        centroids, order, offsets = index["centroids"], index["order"], index["offsets"]
+        indexed = int(index["rows"])
+
+        probes = np.argsort(-(centroids @ query))[:nprobe]
+        lists = [order[offsets[p]:offsets[p + 1]] for p in probes]
+        tail = np.arange(indexed, rows, dtype=np.int64)
+        return np.sort(np.concatenate(lists + [tail]))
+
+
+# --------------------------------------------------
+# Astra (optional)
+# --------------------------------------------------
+class AstraVectorStore(VectorStore):
+    """
+    Astra DB 'evidence' collection, filtered by report_id.
+    """
+
+    def __init__(self, report_id: str, collection: str = "evidence"):
+        from astrapy import DataAPIClient
+
+        self.report_id = report_id
+        db = DataAPIClient().get_database(
+            settings.ASTRA_DB_ENDPOINT,
+            token=settings.ASTRA_DB_APPLICATION_TOKEN,
+        )
+        self.collection = db.get_collection(collection)
+
+    def add(self, vectors: np.ndarray, metadatas: list[dict]) -> int:
+        if len(vectors) == 0:
+            return 0
+
+        self.collection.insert_many([
+            {**meta, "report_id": self.report_id, "$vector": vec.tolist()}
+            for vec, meta in zip(vectors, metadatas)
+        ])
+        return len(vectors)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 8,
+        source_type: str | None = None,
+        domain: str | None = None,
+    ) -> list[dict]:
+        filters = {"report_id": self.report_id}
+        if source_type:
+            filters["type"] = source_type
+        if domain:
+            filters["domain"] = domain
+
+        cursor = self.collection.find(
+            filters,
+            sort={"$vector": np.asarray(query, dtype=np.float32).tolist()},
+            limit=k,
+            include_similarity=True,
+            projection={"$vector": False},
+        )
+        return [
+            {**doc, "score": doc.pop("$similarity", None)}
+            for doc in cursor
+        ]
+
+    def count(self) -> int:
+        return self.collection.count_documents(
+            {"report_id": self.report_id},
+            upper_bound=1_000_000,
+        )
+
+
+def get_vector_store(report_id: str) -> VectorStore:
+    if settings.VECTOR_STORE_BACKEND == "astra":
+        return AstraVectorStore(report_id)
+    return LocalVectorStore(report_id)
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def _code(vocab: list, codes: dict, value) -> int:
+    if value is None:
+        return -1
+    if value not in codes:
+        codes[value] = len(vocab)
+        vocab.append(value)
+    return codes[value]
+
+
+def _lookup(vocab: list, value) -> int:
+    """
+    -1 → no filter, -2 → filter value never stored (no match possible)
+    """
+    if value is None:
+        return -1
+    return vocab.index(value) if value in vocab else -2
+
+
+def _blocks(candidates, rows: int):
+    if candidates is None:
+        for start in range(0, rows, SCAN_BLOCK_ROWS):
+            yield slice(start, min(start + SCAN_BLOCK_ROWS, rows))
+    else:
+        for start in range(0, len(candidates), SCAN_BLOCK_ROWS):
+            yield candidates[start:start + SCAN_BLOCK_ROWS]
+
+
+def _block_rows(block) -> np.ndarray:
+    if isinstance(block, slice):
+        return np.arange(block.start, block.stop, dtype=np.int64)
+    return block
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -0,0 +1,172 @@
+# app/utils/adaptive_concurrency.py
+
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from app.config import settings
+
+# Outcomes reported by callers
+OK = "ok"
+TIMEOUT = "timeout"
+THROTTLED = "throttled"  # 429 / 5xx / provider rate-limit error
+ERROR = "error"  # not a capacity signal (DNS, 404, parse...)
+
+BACKOFF_OUTCOMES = (TIMEOUT, THROTTLED)
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    - healthy completion (ok, latency under target) → limit += 1 / limit
+      (≈ +1 per full window of successful calls)
+    - timeout / 429 / 5xx → limit *= decrease, at most once per cooldown
+      so one burst of failures does not collapse the limit to the floor
+
+    Also tracks an EWMA of latency to derive an adaptive request timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        decrease: float = 0.5,
+        min_timeout: float = 3.0,
+        max_timeout: float = 15.0,
+    ):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+        self.inflight = 0
+        self.ewma_latency = None
+        self.last_decrease = 0.0
+        self.outcomes = Counter()
+
+        self._cond = threading.Condition()
+
+    # --------------------------------------------------
+    # Slots
+    # --------------------------------------------------
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def acquire(self):
+        with self._cond:
+            while self.inflight >= self.current_limit():
+                self._cond.wait()
+            self.inflight += 1
+
+    def release(self, outcome: str, latency: float | None = None):
+        with self._cond:
+            self.inflight -= 1
+            self._record(outcome, latency)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        with limiter.slot() as call:
+            ...
+            call.outcome = THROTTLED
+        Unhandled exceptions count as ERROR.
+        """
+        call = _Call()
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield call
+        except Exception:
+            call.outcome = ERROR
+            raise
+        finally:
+            self.release(call.outcome, time.monotonic() - started)
+
+    # --------------------------------------------------
+    # Feedback (callers that manage their own concurrency)
+    # --------------------------------------------------
+    def record(self, outcome: str, latency: float | None = None):
+        with self._cond:
+            self._record(outcome, latency)
+            self._cond.notify_all()
+
+    def _record(self, outcome: str, latency: float | None):
+        self.outcomes[outcome] += 1
+        now = time.monotonic()
+
+        if latency is not None and outcome != TIMEOUT:
+            self.ewma_latency = (
+                latency if self.ewma_latency is None
+                else 0.8 * self.ewma_latency + 0.2 * latency
+            )
+
+        if outcome in BACKOFF_OUTCOMES:
+            cooldown = self.ewma_latency or self.latency_target
+            if now - self.last_decrease >= cooldown:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self.last_decrease = now
+        elif outcome == OK and (latency is None or latency <= self.latency_target):
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    # --------------------------------------------------
+    # Adaptive timeout
+    # --------------------------------------------------
+    def timeout(self) -> float:
+        if self.ewma_latency is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, 4 * self.ewma_latency))
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.current_limit(),
+                "inflight": self.inflight,
+                "ewma_latency_ms": (
+                    round(self.ewma_latency * 1000) if self.ewma_latency else None
+                ),
+                "timeout_s": round(self.timeout(), 1),
+                "outcomes": dict(self.outcomes),
+            }
+
+
+class _Call:
+    outcome = OK
+
+
+# --------------------------------------------------
+# Process-wide limiters
+# --------------------------------------------------
+SERP_LIMITER = AIMDLimiter(
+    "serp",
+    initial=settings.SERP_CONCURRENCY_INITIAL,
+    min_limit=1,
+    max_limit=settings.SERP_CONCURRENCY_MAX,
+    latency_target=settings.SERP_LATENCY_TARGET,
+    min_timeout=10.0,
+    max_timeout=60.0,
+)
+
+FETCH_LIMITER = AIMDLimiter(
+    "fetch",
+    initial=settings.FETCH_CONCURRENCY_INITIAL,
+    min_limit=1,
+    max_limit=settings.FETCH_CONCURRENCY,
+    latency_target=settings.FETCH_LATENCY_TARGET,
+)
+
+
+def limiter_snapshots() -> dict:
+    return {
+        SERP_LIMITER.name: SERP_LIMITER.snapshot(),
+        FETCH_LIMITER.name: FETCH_LIMITER.snapshot(),
+    }
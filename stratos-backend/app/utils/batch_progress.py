@@ -0,0 +1,96 @@
+# app/utils/batch_progress.py
+
+from collections import Counter
+
+from app.utils.state_machine import SessionState
+
+# Pipeline event → session state it implies (plain values, as stored)
+EVENT_STATES = {
+    "clarification_started": SessionState.CLARIFYING.value,
+    "clarification_resumed": SessionState.CLARIFYING.value,
+    "clarification_consent_requested": SessionState.AWAITING_CONSENT.value,
+    "research_started": SessionState.RESEARCH_RUNNING.value,
+    "writing_sections": SessionState.WRITING_SECTIONS.value,
+    "report_ready": SessionState.READY_FOR_EXPORT.value,
+    "session_cancelled": SessionState.CANCELLED.value,
+}
+
+# Attempt failures (Celery may still retry them)
+FAILURE_EVENTS = frozenset({
+    "research_failed",
+    "sections_failed",
+    "competitors_failed",
+})
+
+# Stages the report can't be finished without: once their retries are
+# exhausted ("final" in the payload) the session is over
+FATAL_FAILURES = frozenset({
+    "research_failed",
+    "sections_failed",
+})
+
+# Stream-only state: failed sessions keep their last status in Postgres
+FAILED = "FAILED"
+
+TERMINAL_STATES = frozenset({
+    SessionState.READY_FOR_EXPORT.value,
+    SessionState.CANCELLED.value,
+    FAILED,
+})
+
+
+class BatchProgress:
+    """
+    Folds the global event stream into one progress view per batch.
+
+    rows: (session_id, report_id, status) for every session in the batch.
+    """
+
+    def __init__(self, batch_id: str, rows):
+        self.batch_id = batch_id
+        self.states = {}
+        self.report_sessions = {}
+        self.failing = set()
+
+        for session_id, report_id, status in rows:
+            self.states[session_id] = getattr(status, "value", status)
+            if report_id:
+                self.report_sessions[report_id] = session_id
+
+    def apply(self, event: dict) -> bool:
+        """
+        Returns True when the event belongs to this batch.
+        """
+        payload = event.get("payload") or {}
+        session_id = payload.get("session_id") or self.report_sessions.get(
+            payload.get("report_id")
+        )
+        if session_id not in self.states:
+            return False
+
+        event_type = event.get("type")
+        if event_type in FATAL_FAILURES and payload.get("final"):
+            self.states[session_id] = FAILED
+            self.failing.discard(session_id)
+        elif event_type in FAILURE_EVENTS:
+            self.failing.add(session_id)
+        elif event_type in EVENT_STATES:
+            self.states[session_id] = EVENT_STATES[event_type]
+            self.failing.discard(session_id)
+        return True
+
+    @property
+    def finished(self) -> bool:
+        return all(state in TERMINAL_STATES for state in self.states.values())
+
+    def snapshot(self) -> dict:
+        counts = Counter(self.states.values())
+        done = sum(counts[state] for state in TERMINAL_STATES)
+        return {
+            "batch_id": self.batch_id,
+            "total": len(self.states),
+            "done": done,
+            "states": dict(counts),
+            "failing": len(self.failing),
+            "finished": self.finished,
+        }
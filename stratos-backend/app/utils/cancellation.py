@@ -0,0 +1,108 @@
+# app/utils/cancellation.py
+
+import time
+import uuid
+
+from app.config import settings
+from app.utils import fair_queue
+from app.utils.redis_pub import redis_client
+
+CANCEL_TTL_SECONDS = 24 * 3600
+
+# Hot loops (streamed reads, LLM deltas) hit Redis at most this often
+POLL_INTERVAL_SECONDS = 0.5
+
+
+class Cancelled(Exception):
+    """
+    Raised at a checkpoint once the session has been cancelled.
+    """
+
+
+def _flag_key(session_id: str) -> str:
+    return f"cancel:{session_id}"
+
+
+def _tasks_key(session_id: str) -> str:
+    return f"cancel:{session_id}:tasks"
+
+
+def track(session_id: str, task_id: str):
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.sadd(_tasks_key(session_id), task_id)
+    pipe.expire(_tasks_key(session_id), CANCEL_TTL_SECONDS)
+    pipe.execute()
+
+
+def dispatch(task, session_id: str, *args, user_id: str | None = None, **options):
+    """
+    Enqueue a task with a known id, remembered per session so cancel()
+    can revoke it while still queued. With a user_id it goes through
+    that user's fair queue; otherwise straight to Celery.
+    """
+    task_id = str(uuid.uuid4())
+    track(session_id, task_id)
+
+    if user_id and settings.FAIR_SCHEDULING:
+        fair_queue.submit(
+            user_id,
+            task,
+            list(args),
+            task_id,
+            countdown=options.get("countdown", 0),
+        )
+        return task_id
+
+    task.apply_async(args=list(args), task_id=task_id, **options)
+    return task_id
+
+
+def cancel(session_id: str) -> list[str]:
+    """
+    Raise the session's cancel flag; returns the tracked task ids
+    (queued ones should be revoked, running ones stop at a checkpoint).
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(_flag_key(session_id), 1, ex=CANCEL_TTL_SECONDS)
+    pipe.smembers(_tasks_key(session_id))
+    pipe.delete(_tasks_key(session_id))
+    _, task_ids, _ = pipe.execute()
+    return [t.decode() for t in task_ids]
+
+
+def is_cancelled(session_id: str) -> bool:
+    return bool(redis_client.exists(_flag_key(session_id)))
+
+
+class CancelToken:
+    """
+    Per-run view of the cancel flag, safe to poll from tight loops
+    and worker threads (answers are cached for `interval` seconds;
+    once set it stays set).
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        interval: float = POLL_INTERVAL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.session_id = session_id
+        self.interval = interval
+        self.clock = clock
+        self._set = False
+        self._checked_at = None
+
+    def is_set(self) -> bool:
+        if self._set:
+            return True
+
+        now = self.clock()
+        if self._checked_at is None or now - self._checked_at >= self.interval:
+            self._checked_at = now
+            self._set = is_cancelled(self.session_id)
+        return self._set
+
+    def check(self):
+        if self.is_set():
+            raise Cancelled(self.session_id)
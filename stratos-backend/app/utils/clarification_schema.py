@@ -1,5 +1,7 @@
 # app/utils/clarification_schema.py
 
+import json
+
 IDEA_SCHEMA_FIELDS = [
     "project_domain",
     "target_persona",
@@ -29,3 +31,35 @@ def confidence_score(schema: dict) -> float:
         score += 0.15
 
     return min(score, 1.0)
+
+
+# --------------------------------------------------
+# Clarified summary (session.clarified_summary)
+# --------------------------------------------------
+def clarified_summary(payload: dict) -> str:
+    return json.dumps({
+        "final_schema": payload["schema"],
+        "hard_constraints": payload.get("hard_constraints", []),
+        "hypotheses": payload.get("hypotheses", []),
+        "knowledge_gaps": payload.get("knowledge_gaps", []),
+        "research_directives": payload.get("research_directives", []),
+        "unknown_detected": payload.get("unknown_detected", []),
+        "confidence_score": payload["confidence_score"],
+    }, indent=2)
+
+
+def parse_clarified_summary(text: str | None) -> dict | None:
+    """
+    Inverse of clarified_summary(); None when the stored text is not
+    that JSON (callers fall back to using it verbatim).
+    """
+    try:
+        data = json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def summary_schema(text: str | None) -> dict:
+    data = parse_clarified_summary(text) or {}
+    return data.get("final_schema") or {}
@@ -0,0 +1,67 @@
+# app/utils/date_parse.py
+
+import re
+from datetime import datetime, timedelta, timezone
+
+RELATIVE_RE = re.compile(
+    r"(\d+|an?|one)\s*(min(?:ute)?|hour|hr|day|week|wk|month|mo|year|yr)s?\.?\s+ago",
+    re.IGNORECASE,
+)
+
+# Approximate lengths; news dates only need day resolution
+UNIT_DAYS = {
+    "min": 1 / 1440, "minute": 1 / 1440,
+    "hour": 1 / 24, "hr": 1 / 24,
+    "day": 1,
+    "week": 7, "wk": 7,
+    "month": 30, "mo": 30,
+    "year": 365, "yr": 365,
+}
+
+ABSOLUTE_FORMATS = (
+    "%m/%d/%Y, %I:%M %p, %z",   # google_news engine ("+0000 UTC" trimmed)
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%Y-%m-%d",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%m/%d/%Y",
+)
+
+
+def parse_published(value: str | None, now: datetime | None = None) -> datetime | None:
+    """
+    "3 days ago", "yesterday", "Mar 15, 2024", "03/15/2024, 07:00 AM, +0000 UTC"
+    → naive UTC datetime (None when unparseable).
+    """
+    if not value:
+        return None
+
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    text = value.strip()
+    lower = text.lower()
+
+    if lower in ("just now", "now", "today"):
+        return now
+    if lower == "yesterday":
+        return now - timedelta(days=1)
+
+    match = RELATIVE_RE.search(text)
+    if match:
+        amount = match.group(1).lower()
+        count = 1 if amount in ("a", "an", "one") else int(amount)
+        unit = match.group(2).lower()
+        return now - timedelta(days=count * UNIT_DAYS[unit])
+
+    text = re.sub(r"\s+UTC$", "", text)
+    for fmt in ABSOLUTE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    return None
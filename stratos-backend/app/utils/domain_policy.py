@@ -0,0 +1,144 @@
+# app/utils/domain_policy.py
+
+import json
+import logging
+from collections import Counter, defaultdict
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import tldextract
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Bundled public-suffix snapshot only — never fetched at runtime
+_extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+_RULE = "$"
+
+
+class DomainVerdict(NamedTuple):
+    host: str
+    domain: str  # registrable domain (eTLD+1)
+    score: float
+    allowed: bool
+    rule: str | None  # most specific matching rule, if any
+
+
+def host_of(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def registrable_domain(host: str) -> str:
+    parts = _extract(host)
+    if parts.domain and parts.suffix:
+        return f"{parts.domain}.{parts.suffix}"
+    return parts.domain or host
+
+
+def domain_label(host: str) -> str:
+    # "app.notion.so" → "notion", "bbc.co.uk" → "bbc"
+    return _extract(host).domain or host
+
+
+class DomainPolicy:
+    """
+    Allow/deny/score rules in a reverse-label trie:
+
+        "docs.example.co.uk" → uk → co → example → docs
+
+    Lookup walks the host's labels right-to-left, so it costs O(labels)
+    and the most specific rule wins ("gov" < "nasa.gov" < "api.nasa.gov").
+    """
+
+    def __init__(self, rules: dict):
+        self.default_score = rules.get("default_score", 0.5)
+        self.min_score = rules.get("min_score", 0.0)
+        self.trie = {}
+
+        for suffix, score in (rules.get("scores") or {}).items():
+            self._insert(suffix, float(score))
+        for suffix in rules.get("deny") or []:
+            self._insert(suffix, None)
+
+    @classmethod
+    def from_file(cls, path: str) -> "DomainPolicy":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _insert(self, suffix: str, score: float | None):
+        node = self.trie
+        for label in reversed(suffix.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[_RULE] = (suffix, score)
+
+    def lookup(self, host: str):
+        node, match = self.trie, None
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            match = node.get(_RULE, match)
+        return match
+
+    def evaluate(self, url: str) -> DomainVerdict:
+        host = host_of(url)
+        match = self.lookup(host)
+
+        if match is None:
+            rule, score = None, self.default_score
+        else:
+            rule, score = match
+
+        if score is None:  # deny rule
+            return DomainVerdict(host, registrable_domain(host), 0.0, False, rule)
+
+        return DomainVerdict(
+            host,
+            registrable_domain(host),
+            score,
+            score >= self.min_score,
+            rule,
+        )
+
+
+_POLICY = None
+
+
+def get_domain_policy() -> DomainPolicy:
+    global _POLICY
+    if _POLICY is None:
+        _POLICY = DomainPolicy.from_file(settings.DOMAIN_POLICY_PATH)
+    return _POLICY
+
+
+# --------------------------------------------------
+# Per-domain counters (for tuning the lists)
+# --------------------------------------------------
+class DomainStats:
+    """
+    In-process counters per registrable domain, flushed to a Redis hash
+    per domain ("domain_stats:<domain>") once per research run.
+    """
+
+    EVENTS = ("seen", "denied", "fetched", "failed", "kept")
+
+    def __init__(self):
+        self.counts = defaultdict(Counter)
+
+    def incr(self, domain: str, event: str, n: int = 1):
+        self.counts[domain][event] += n
+
+    def flush(self, redis_client):
+        if not self.counts:
+            return
+
+        pipe = redis_client.pipeline(transaction=False)
+        for domain, counter in self.counts.items():
+            for event, n in counter.items():
+                pipe.hincrby(f"domain_stats:{domain}", event, n)
+        pipe.execute()
+        self.counts.clear()
@@ -0,0 +1,117 @@
+# app/utils/entity_resolution.py
+
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Dropped before comparing names: "Notion Labs Inc." ≈ "Notion"
+CORPORATE_SUFFIXES = frozenset(
+    "inc incorporated ltd limited llc corp corporation co company gmbh sa "
+    "labs lab hq technologies technology tech software group holdings "
+    "app apps io ai so com net org".split()
+)
+
+# Dropped from the front only: "The Acme Corporation" ≈ "Acme"
+LEADING_ARTICLES = frozenset(("the", "a", "an"))
+
+FUZZY_RATIO = 0.88
+BLOCK_PREFIX = 3
+
+
+def normalize_name(name: str) -> str:
+    """
+    "Notion Labs, Inc." → "notion", "notion.so" → "notion",
+    "Monday.com" → "monday", "Click Up" → "clickup",
+    "The Acme Corporation" → "acme".
+    """
+    tokens = TOKEN_RE.findall((name or "").lower())
+    # Unless nothing but suffixes would be left ("the.com")
+    if tokens and tokens[0] in LEADING_ARTICLES and any(
+        t not in CORPORATE_SUFFIXES for t in tokens[1:]
+    ):
+        tokens = tokens[1:]
+    core = [t for t in tokens if t not in CORPORATE_SUFFIXES]
+    return "".join(core or tokens)
+
+
+class Entity:
+    __slots__ = ("key", "names", "mentions", "sources", "websites")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.names = Counter()
+        self.mentions = 0
+        self.sources = set()
+        self.websites = Counter()
+
+    @property
+    def name(self) -> str:
+        # Most frequent surface form; ties → capitalized, then shorter
+        # ("Notion" over "notion.so" and "Notion Labs")
+        return min(
+            self.names,
+            key=lambda n: (-self.names[n], not n[:1].isupper(), len(n), n),
+        )
+
+    @property
+    def website(self) -> str | None:
+        return self.websites.most_common(1)[0][0] if self.websites else None
+
+
+class EntityIndex:
+    """
+    Incremental name resolution.
+
+    - Exact match on the normalized key (dict, O(1))
+    - Otherwise fuzzy match (difflib ratio ≥ FUZZY_RATIO) only against
+      keys sharing the same BLOCK_PREFIX-letter prefix, so each lookup
+      compares a handful of names instead of every entity
+    """
+
+    def __init__(self):
+        self.entities: dict[str, Entity] = {}
+        self.blocks: dict[str, list[str]] = defaultdict(list)
+
+    def add(
+        self,
+        name: str,
+        source_id: str | None = None,
+        website: str | None = None,
+        weight: int = 1,
+    ) -> Entity | None:
+        key = normalize_name(name)
+        if len(key) < 2:
+            return None
+
+        entity = self.entities.get(key) or self._fuzzy(key)
+        if entity is None:
+            entity = Entity(key)
+            self.entities[key] = entity
+            self.blocks[key[:BLOCK_PREFIX]].append(key)
+
+        entity.names[name.strip()] += weight
+        entity.mentions += weight
+        if source_id:
+            entity.sources.add(source_id)
+        if website:
+            entity.websites[website] += weight
+        return entity
+
+    def _fuzzy(self, key: str) -> Entity | None:
+        best, best_ratio = None, FUZZY_RATIO
+        for other in self.blocks.get(key[:BLOCK_PREFIX], ()):
+            matcher = SequenceMatcher(None, key, other)
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = other, ratio
+        return self.entities[best] if best else None
+
+    def ranked(self, min_sources: int = 1) -> list[Entity]:
+        return sorted(
+            (e for e in self.entities.values() if len(e.sources) >= min_sources),
+            key=lambda e: (-len(e.sources), -e.mentions, e.key),
+        )
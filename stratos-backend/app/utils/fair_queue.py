@@ -0,0 +1,299 @@
+# app/utils/fair_queue.py
+
+import json
+import math
+import time
+import logging
+
+from celery.signals import task_prerun, task_postrun, task_revoked
+
+from app.config import settings
+from app.utils.redis_pub import redis_client
+from app.utils.redis_lease import Lease
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Jobs dispatched per round-robin visit
+PLAN_WEIGHTS = {"free": 1, "pro": 2, "team": 4}
+
+RING_KEY = "fairq:ring"              # list: users with queued jobs, visit order
+ACTIVE_KEY = "fairq:active"          # set: members of the ring
+WEIGHTS_KEY = "fairq:weights"        # hash: user → weight
+CAPS_KEY = "fairq:caps"              # hash: user → max running (default FAIR_USER_MAX_RUNNING)
+DISPATCHED_KEY = "fairq:dispatched"  # zset: task_id → published_at, until started
+
+# Slots of tasks that never reported back (worker died) expire after this
+RUNNING_TTL_SECONDS = 3600
+
+# Queued jobs looked at per visit (ready ones pass debounced ones)
+SCAN_DEPTH = 50
+
+
+def batch_lane(user_id: str) -> str:
+    """
+    Tenant for a user's bulk runs: scheduled beside (not in front of)
+    the same user's interactive sessions.
+    """
+    return f"{user_id}:batch"
+
+
+def clarification_lane(user_id: str) -> str:
+    """
+    Tenant for a user's clarification turns: short interactive calls
+    that must not wait behind (or count against the cap of) the same
+    user's research and outline runs.
+    """
+    return f"{user_id}:chat"
+
+
+def _queue_key(user_id: str) -> str:
+    return f"fairq:user:{user_id}"
+
+
+def _running_key(user_id: str) -> str:
+    return f"fairq:running:{user_id}"
+
+
+def _owner_key(task_id: str) -> str:
+    return f"fairq:task:{task_id}"
+
+
+# Drop a user from the ring only if nothing was queued meanwhile
+_RETIRE = redis_client.register_script("""
+if redis.call("LLEN", KEYS[1]) == 0 then
+    redis.call("SREM", KEYS[2], ARGV[1])
+    redis.call("LREM", KEYS[3], 0, ARGV[1])
+    return 1
+end
+return 0
+""")
+
+
+# --------------------------------------------------
+# Producer side (API / orchestrator)
+# --------------------------------------------------
+def set_weight(user_id: str, plan_tier: str | None):
+    redis_client.hset(WEIGHTS_KEY, user_id, PLAN_WEIGHTS.get(plan_tier, 1))
+
+
+def set_cap(user_id: str, max_running: int):
+    redis_client.hset(CAPS_KEY, user_id, max_running)
+
+
+def submit(user_id: str, task, args: list, task_id: str, countdown: float = 0):
+    """
+    Queue a Celery task behind the user's earlier work; the dispatcher
+    publishes it when the user's turn and a free slot come up.
+    """
+    ready_at = time.time() + (countdown or 0)
+    job = json.dumps({
+        "task": task.name,
+        "args": args,
+        "task_id": task_id,
+        "ready_at": ready_at,
+    })
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.rpush(_queue_key(user_id), job)
+    pipe.sadd(ACTIVE_KEY, user_id)
+    _, added = pipe.execute()
+
+    if added:
+        redis_client.rpush(RING_KEY, user_id)
+
+
+def withdraw(user_ids: list[str], task_ids: list[str]) -> int:
+    """
+    Drop still-queued jobs (cancelled session) from the given users'
+    queues so the dispatcher never publishes them. Returns jobs removed.
+    """
+    wanted = set(task_ids)
+    removed = 0
+    for user_id in user_ids:
+        queue = _queue_key(user_id)
+        for raw in redis_client.lrange(queue, 0, -1):
+            if json.loads(raw)["task_id"] in wanted:
+                removed += redis_client.lrem(queue, 1, raw)
+    return removed
+
+
+def queue_lag(now: float | None = None) -> float:
+    """
+    Seconds the oldest published-but-not-started task has waited for
+    a Celery worker. Jobs held back by their own user's cap don't
+    count: a tenant's self-inflicted backlog must not reject others.
+    """
+    now = time.time() if now is None else now
+    redis_client.zremrangebyscore(DISPATCHED_KEY, "-inf", now - RUNNING_TTL_SECONDS)
+    oldest = redis_client.zrange(DISPATCHED_KEY, 0, 0, withscores=True)
+    if not oldest:
+        return 0.0
+    return max(0.0, now - oldest[0][1])
+
+
+def admit(user_id: str, incoming: int = 1, max_queued: int | None = None) -> int | None:
+    """
+    Admission control for new sessions (`incoming` jobs about to be queued).
+    Returns None to admit, or a Retry-After (seconds) to reject with 429.
+    """
+    lag = queue_lag()
+    if lag > settings.ADMISSION_MAX_LAG_SECONDS:
+        return min(
+            settings.ADMISSION_MAX_RETRY_AFTER,
+            max(1, math.ceil(lag - settings.ADMISSION_MAX_LAG_SECONDS)),
+        )
+
+    # One tenant's backlog never grows past its own cap
+    if max_queued is None:
+        max_queued = settings.ADMISSION_MAX_USER_QUEUED
+    if redis_client.llen(_queue_key(user_id)) + incoming > max_queued:
+        return settings.ADMISSION_MAX_RETRY_AFTER
+
+    return None
+
+
+# --------------------------------------------------
+# Slot accounting (worker side, via Celery signals)
+# --------------------------------------------------
+def running(user_id: str, now: float | None = None) -> int:
+    now = time.time() if now is None else now
+    key = _running_key(user_id)
+    redis_client.zremrangebyscore(key, "-inf", now - RUNNING_TTL_SECONDS)
+    return redis_client.zcard(key)
+
+
+def release(task_id: str):
+    redis_client.zrem(DISPATCHED_KEY, task_id)
+    user_id = redis_client.getdel(_owner_key(task_id))
+    if user_id is not None:
+        redis_client.zrem(_running_key(user_id.decode()), task_id)
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    redis_client.zrem(DISPATCHED_KEY, task_id)
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, state=None, **kwargs):
+    # A retry keeps its slot until the final attempt
+    if state != "RETRY":
+        release(task_id)
+
+
+@task_revoked.connect
+def _on_task_revoked(request=None, **kwargs):
+    if request is not None:
+        release(request.id)
+
+
+# --------------------------------------------------
+# Dispatcher (one live instance, lease-guarded)
+# --------------------------------------------------
+class FairDispatcher:
+    """
+    Weighted round-robin across users with queued jobs.
+
+    Each visit publishes up to `weight` ready jobs for the user at the
+    ring head, never more than its cap (FAIR_USER_MAX_RUNNING) in flight,
+    then rotates the user to the back. A user flooding the system
+    only lengthens their own queue; everyone else still gets a turn
+    every round.
+    """
+
+    def __init__(self, interval: float | None = None):
+        self.interval = interval or settings.FAIR_DISPATCH_INTERVAL
+        self.lease = Lease("fairq:dispatcher", max(5.0, self.interval * 20))
+
+    def run_forever(self):
+        while True:
+            if not self.lease.acquire():
+                # Another API process dispatches
+                time.sleep(self.lease.ttl_ms / 1000 / 2)
+                continue
+            try:
+                while self.lease.renew():
+                    if not self.dispatch_round():
+                        time.sleep(self.interval)
+            except Exception:
+                logger.exception("[FAIRQ] Dispatcher failed")
+                time.sleep(self.interval)
+            finally:
+                self.lease.release()
+
+    def dispatch_round(self, now: float | None = None) -> int:
+        """
+        Visit every user in the ring once; returns jobs published.
+        """
+        now = time.time() if now is None else now
+        published = 0
+
+        for _ in range(redis_client.llen(RING_KEY)):
+            raw = redis_client.lmove(RING_KEY, RING_KEY, "LEFT", "RIGHT")
+            if raw is None:
+                break
+            user_id = raw.decode()
+            published += self._visit(user_id, now)
+
+        return published
+
+    def _visit(self, user_id: str, now: float) -> int:
+        weight = int(redis_client.hget(WEIGHTS_KEY, user_id) or 1)
+        cap = int(redis_client.hget(CAPS_KEY, user_id) or settings.FAIR_USER_MAX_RUNNING)
+        free = cap - running(user_id, now)
+        queue = _queue_key(user_id)
+
+        budget = min(weight, free)
+        if budget <= 0:
+            return 0
+
+        queued = redis_client.lrange(queue, 0, SCAN_DEPTH - 1)
+        if not queued:
+            _RETIRE(keys=[queue, ACTIVE_KEY, RING_KEY], args=[user_id])
+            return 0
+
+        published = 0
+        for raw in queued:
+            if published >= budget:
+                break
+
+            job = json.loads(raw)
+            # Not ready yet (debounce) → stays queued, later jobs go ahead
+            if job["ready_at"] > now:
+                continue
+
+            # Gone meanwhile (withdrawn by a cancel) → skip
+            if not redis_client.lrem(queue, 1, raw):
+                continue
+
+            self._publish(user_id, job, now)
+            published += 1
+
+        return published
+
+    def _publish(self, user_id: str, job: dict, now: float):
+        task_id = job["task_id"]
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.set(_owner_key(task_id), user_id, ex=RUNNING_TTL_SECONDS)
+        pipe.zadd(_running_key(user_id), {task_id: now})
+        pipe.expire(_running_key(user_id), RUNNING_TTL_SECONDS)
+        pipe.zadd(DISPATCHED_KEY, {task_id: now})
+        pipe.execute()
+
+        # Imported here: workers import this module (via cancellation)
+        from app.workers.celery_app import celery_app
+
+        celery_app.send_task(job["task"], args=job["args"], task_id=task_id)
+
+        logger.debug(
+            "[FAIRQ] user=%s task=%s waited=%.2fs",
+            user_id,
+            job["task"],
+            now - job["ready_at"],
+        )
+
+
+def start_dispatcher():
+    FairDispatcher().run_forever()
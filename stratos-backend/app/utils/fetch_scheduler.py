@@ -0,0 +1,281 @@
+# app/utils/fetch_scheduler.py
+
+import time
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from app.config import settings
+from app.utils.domain_policy import host_of
+from app.utils.adaptive_concurrency import AIMDLimiter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+# --------------------------------------------------
+# robots.txt (shared TTL cache in Redis + per-process parse cache)
+# --------------------------------------------------
+class RobotsCache:
+    """
+    robots.txt bodies are shared across workers via Redis
+    ("robots:<scheme>://<host>", TTL ROBOTS_TTL_SECONDS).
+    Parsed rules are memoised per process until the same expiry.
+
+    RFC 9309 status handling:
+    - 2xx        → parse body
+    - 4xx        → no restrictions
+    - 5xx / error → disallow everything (short TTL, retried soon)
+    """
+
+    DISALLOW_ALL = "User-agent: *\nDisallow: /\n"
+    FAILURE_TTL = 300
+
+    def __init__(self, redis_client=None, ttl: int | None = None, user_agent: str | None = None):
+        self.redis = redis_client
+        self.ttl = ttl or settings.ROBOTS_TTL_SECONDS
+        self.user_agent = user_agent or settings.CRAWLER_USER_AGENT
+        self._parsed = {}  # origin → (expires_at, RobotFileParser)
+        self._lock = threading.Lock()
+
+    def _origin(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def rules(self, url: str) -> RobotFileParser:
+        origin = self._origin(url)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._parsed.get(origin)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        body, ttl = self._load(origin)
+        parser = RobotFileParser()
+        parser.parse(body.splitlines())
+
+        with self._lock:
+            self._parsed[origin] = (now + ttl, parser)
+        return parser
+
+    def _load(self, origin: str) -> tuple[str, int]:
+        key = f"robots:{origin}"
+
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(key)
+                if cached is not None:
+                    return cached.decode("utf-8", "replace"), max(self.redis.ttl(key), 1)
+            except Exception:
+                logger.exception("robots cache read failed for %s", origin)
+
+        try:
+            resp = requests.get(
+                f"{origin}/robots.txt",
+                timeout=5,
+                headers={"User-Agent": self.user_agent},
+            )
+            if resp.status_code >= 500:
+                body, ttl = self.DISALLOW_ALL, self.FAILURE_TTL
+            elif resp.status_code >= 400:
+                body, ttl = "", self.ttl
+            else:
+                body, ttl = resp.text, self.ttl
+        except requests.RequestException:
+            body, ttl = self.DISALLOW_ALL, self.FAILURE_TTL
+
+        if self.redis is not None:
+            try:
+                self.redis.set(key, body, ex=ttl)
+            except Exception:
+                logger.exception("robots cache write failed for %s", origin)
+
+        return body, ttl
+
+    def can_fetch(self, url: str) -> bool:
+        return self.rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url: str) -> float | None:
+        delay = self.rules(url).crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+
+# --------------------------------------------------
+# Per-host token bucket
+# --------------------------------------------------
+class HostBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.min_interval = 0.0  # robots Crawl-delay
+        self.last_start = 0.0
+        self.inflight = 0
+
+    def ready_at(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        ready = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        return max(ready, self.last_start + self.min_interval)
+
+    def take(self, now: float):
+        self.tokens -= 1
+        self.last_start = now
+        self.inflight += 1
+
+
+# --------------------------------------------------
+# Scheduler
+# --------------------------------------------------
+BLOCKED = object()
+
+
+class FetchScheduler:
+    """
+    Interleaves fetches across hosts:
+    - global concurrency stays at max_concurrency
+      (or the attached AIMD limiter's current limit, if lower)
+    - each host gets at most per_host_concurrency in flight,
+      paced by its token bucket and robots Crawl-delay
+    - URLs disallowed by robots.txt are never fetched
+
+    - once should_stop() turns true, queued URLs are dropped and only
+      fetches already in flight are drained
+
+    run() yields (key, result) in completion order;
+    result is BLOCKED for robots-disallowed URLs.
+    """
+
+    def __init__(
+        self,
+        fetch_fn,
+        robots: RobotsCache | None = None,
+        limiter: AIMDLimiter | None = None,
+        max_concurrency: int | None = None,
+        per_host_concurrency: int | None = None,
+        host_rate: float | None = None,
+        host_burst: int | None = None,
+        should_stop=None,
+    ):
+        self.fetch_fn = fetch_fn
+        self.should_stop = should_stop
+        self.robots = robots
+        self.limiter = limiter
+        self.max_concurrency = max_concurrency or settings.FETCH_CONCURRENCY
+        self.per_host = per_host_concurrency or settings.FETCH_PER_HOST_CONCURRENCY
+        self.host_rate = host_rate or settings.FETCH_HOST_RATE
+        self.host_burst = host_burst or settings.FETCH_HOST_BURST
+
+        self.buckets = {}
+        self.metrics = Counter()
+
+    def _fetch(self, bucket: HostBucket, url: str):
+        if self.robots is not None:
+            try:
+                if not self.robots.can_fetch(url):
+                    return BLOCKED
+                delay = self.robots.crawl_delay(url)
+                if delay:
+                    bucket.min_interval = max(bucket.min_interval, delay)
+            except Exception:
+                logger.exception("robots check failed for %s", url)
+
+        return self.fetch_fn(url)
+
+    def run(self, items):
+        """
+        items: iterable of (key, url)
+        """
+        queues = {}  # host → deque[(key, url)]
+        for key, url in items:
+            queues.setdefault(host_of(url), deque()).append((key, url))
+
+        hosts = deque(queues)
+        inflight = {}  # future → (host, key)
+        waiting = set()  # hosts whose head URL was already counted as deferred
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while hosts or inflight:
+                if hosts and self.should_stop is not None and self.should_stop():
+                    self.metrics["skipped"] += sum(len(q) for q in queues.values())
+                    queues.clear()
+                    hosts.clear()
+                    if not inflight:
+                        break
+
+                now = time.monotonic()
+                next_ready = None
+
+                # Global cap follows the adaptive limit when one is attached
+                capacity = self.max_concurrency
+                if self.limiter is not None:
+                    capacity = min(capacity, self.limiter.current_limit())
+
+                # One round-robin pass over hosts with queued work
+                for _ in range(len(hosts)):
+                    if len(inflight) >= capacity:
+                        break
+
+                    host = hosts.popleft()
+                    bucket = self.buckets.setdefault(
+                        host, HostBucket(self.host_rate, self.host_burst)
+                    )
+                    ready = bucket.ready_at(now)
+
+                    if bucket.inflight >= self.per_host or ready > now:
+                        if host not in waiting:
+                            waiting.add(host)
+                            self.metrics["deferred"] += 1
+                        if bucket.inflight < self.per_host:
+                            next_ready = ready if next_ready is None else min(next_ready, ready)
+                        hosts.append(host)
+                        continue
+
+                    key, url = queues[host].popleft()
+                    waiting.discard(host)
+                    bucket.take(now)
+                    future = executor.submit(self._fetch, bucket, url)
+                    inflight[future] = (host, key)
+                    self.metrics["submitted"] += 1
+
+                    if queues[host]:
+                        hosts.append(host)
+
+                if not inflight:
+                    if next_ready is not None:
+                        time.sleep(max(0.0, next_ready - time.monotonic()))
+                    continue
+
+                timeout = None
+                if next_ready is not None:
+                    timeout = max(0.0, next_ready - time.monotonic())
+
+                done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, key = inflight.pop(future)
+                    self.buckets[host].inflight -= 1
+
+                    try:
+                        result = future.result()
+                    except Exception:
+                        logger.exception("Scheduled fetch failed (%s)", host)
+                        self.metrics["errors"] += 1
+                        result = None
+
+                    if result is BLOCKED:
+                        self.metrics["blocked_robots"] += 1
+                    else:
+                        self.metrics["completed"] += 1
+
+                    yield key, result
+
+    def snapshot(self) -> dict:
+        return {**self.metrics, "hosts": len(self.buckets)}
@@ -0,0 +1,68 @@
+# app/utils/keyphrases.py
+
+import re
+from collections import Counter, defaultdict
+
+from app.utils.passage_ranker import STOPWORDS
+
+# Extra words that split phrases but carry no search value
+PHRASE_BREAKERS = STOPWORDS | frozenset(
+    "i we they them our us me my can could would should do does did not "
+    "very really just also more most some any many much about into over "
+    "than then there these those so but if because while using use want "
+    "need needs people someone something thing things way ways like".split()
+)
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+\-']*")
+SPLIT_RE = re.compile(r"[.,;:!?()\[\]{}\"/\n]+")
+
+
+def candidate_phrases(text: str, max_words: int = 4) -> list[list[str]]:
+    """
+    RAKE-style candidates: runs of content words between
+    stopwords / punctuation, capped at max_words.
+    """
+    phrases = []
+    for fragment in SPLIT_RE.split((text or "").lower()):
+        current = []
+        for word in WORD_RE.findall(fragment):
+            if word in PHRASE_BREAKERS or (len(word) < 2 and not word.isdigit()):
+                if current:
+                    phrases.append(current)
+                current = []
+                continue
+            current.append(word)
+            if len(current) == max_words:
+                phrases.append(current)
+                current = []
+        if current:
+            phrases.append(current)
+    return phrases
+
+
+def extract_keyphrases(text: str, top_n: int = 3, max_words: int = 4) -> list[str]:
+    """
+    Rank candidate phrases by summed word degree / frequency (RAKE).
+    Deterministic, no model, microseconds per field.
+    """
+    phrases = candidate_phrases(text, max_words)
+    if not phrases:
+        return []
+
+    freq = Counter()
+    degree = defaultdict(int)
+    for phrase in phrases:
+        for word in phrase:
+            freq[word] += 1
+            degree[word] += len(phrase)
+
+    scored = {}
+    for position, phrase in enumerate(phrases):
+        key = " ".join(phrase)
+        score = sum(degree[w] / freq[w] for w in phrase)
+        # Ties → earlier phrase first
+        if key not in scored:
+            scored[key] = (score, -position)
+
+    ranked = sorted(scored, key=lambda k: scored[k], reverse=True)
+    return ranked[:top_n]
@@ -0,0 +1,116 @@
+# app/utils/near_duplicate.py
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Mersenne prime for universal hashing: (a * x + b) mod P
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """
+    crc32 of word n-grams (unigrams when the text is shorter than `size`).
+    """
+    tokens = TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < size:
+        grams = tokens
+    else:
+        grams = (
+            " ".join(tokens[i:i + size])
+            for i in range(len(tokens) - size + 1)
+        )
+    return np.unique(np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams),
+        dtype=np.uint64,
+    ))
+
+
+def optimal_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose
+    LSH S-curve midpoint (1/b)^(1/r) is closest to `threshold`.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        x = shingles(text, self.shingle_size)
+        if len(x) == 0:
+            return None
+        hashed = (self.a * x[None, :] + self.b) % _MERSENNE_PRIME
+        return (hashed & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash-LSH index over one report's evidence.
+
+    add() returns the key of an already-indexed near duplicate
+    (estimated Jaccard >= threshold) or None after indexing the text.
+    Duplicates are recorded under their canonical key in `clusters`.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 3):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        self.signatures = {}
+        self.clusters = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def find(self, signature: np.ndarray):
+        seen = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            for candidate in self.buckets[band].get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = np.mean(self.signatures[candidate] == signature)
+                if similarity >= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, key, text: str):
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+
+        duplicate_of = self.find(signature)
+        if duplicate_of is not None:
+            self.clusters[duplicate_of].append(key)
+            return duplicate_of
+
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band][band_key].append(key)
+        return None
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield signature[band * self.rows:(band + 1) * self.rows].tobytes()
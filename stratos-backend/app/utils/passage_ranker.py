@@ -0,0 +1,105 @@
+# app/utils/passage_ranker.py
+
+import re
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or "
+    "that the their this to was were what when which who will with you your".split()
+)
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        t for t in TOKEN_RE.findall((text or "").lower())
+        if t not in STOPWORDS
+    ]
+
+
+def rank_passages(
+    pages: list[list[str]],
+    page_queries: list[str],
+    context: str = "",
+    k: int = 5,
+    context_weight: float = 0.5,
+) -> list[list[str]]:
+    """
+    BM25 over every candidate passage of every page in ONE vectorized pass.
+
+    - pages[i]         candidate passages of page i
+    - page_queries[i]  query that surfaced page i (full weight)
+    - context          shared text, e.g. the clarified summary (context_weight)
+
+    IDF is computed across the whole batch (the report's corpus).
+    Returns the top-k passages per page, best first.
+    """
+    vocab: dict[str, int] = {}
+    doc_ids, term_ids, doc_page, doc_len = [], [], [], []
+
+    doc = 0
+    for page, passages in enumerate(pages):
+        for passage in passages:
+            tokens = tokenize(passage)
+            for t in tokens:
+                term_ids.append(vocab.setdefault(t, len(vocab)))
+            doc_ids.extend([doc] * len(tokens))
+            doc_page.append(page)
+            doc_len.append(len(tokens))
+            doc += 1
+
+    n_docs, n_terms = doc, len(vocab)
+    if n_docs == 0 or n_terms == 0:
+        return [passages[:k] for passages in pages]
+
+    doc_page = np.asarray(doc_page, dtype=np.int64)
+    doc_len = np.asarray(doc_len, dtype=np.float64)
+
+    # (doc, term) → term frequency
+    pairs, tf = np.unique(
+        np.asarray(doc_ids, dtype=np.int64) * n_terms
+        + np.asarray(term_ids, dtype=np.int64),
+        return_counts=True,
+    )
+    pair_doc, pair_term = pairs // n_terms, pairs % n_terms
+
+    df = np.bincount(pair_term, minlength=n_terms)
+    idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    # Query weights: one row per distinct query string
+    query_index: dict[str, int] = {}
+    page_query = np.asarray(
+        [query_index.setdefault(q or "", len(query_index)) for q in page_queries],
+        dtype=np.int64,
+    )
+    weights = np.zeros((len(query_index), n_terms), dtype=np.float64)
+    context_terms = [vocab[t] for t in tokenize(context) if t in vocab]
+    for q, row in query_index.items():
+        weights[row, context_terms] = context_weight
+        weights[row, [vocab[t] for t in tokenize(q) if t in vocab]] = 1.0
+
+    avgdl = doc_len.mean() or 1.0
+    norm = tf + K1 * (1 - B + B * doc_len[pair_doc] / avgdl)
+    pair_score = (
+        idf[pair_term]
+        * tf * (K1 + 1) / norm
+        * weights[page_query[doc_page[pair_doc]], pair_term]
+    )
+    scores = np.bincount(pair_doc, weights=pair_score, minlength=n_docs)
+
+    # Sort by page, then score desc (stable → document order on ties)
+    order = np.lexsort((-scores, doc_page))
+    flat = [p for passages in pages for p in passages]
+
+    selected = [[] for _ in pages]
+    for d in order:
+        bucket = selected[doc_page[d]]
+        if len(bucket) < k:
+            bucket.append(flat[d])
+    return selected
@@ -0,0 +1,85 @@
+# app/utils/pipeline_join.py
+
+from app.utils.redis_pub import redis_client
+
+# Stages that must finish before section writing
+# ("embedding": every page research queued is in the vector store)
+SECTION_WRITING_DEPENDENCIES = ("outline", "research", "embedding")
+
+JOIN_TTL_SECONDS = 24 * 3600
+
+
+def mark_stage_done(
+    report_id: str,
+    stage: str,
+    required: tuple[str, ...] = SECTION_WRITING_DEPENDENCIES,
+) -> bool:
+    """
+    Record a finished stage for the report.
+
+    Returns True for exactly one caller: the one whose stage completes
+    the set. SADD + SCARD run in one MULTI block, so concurrent or
+    duplicated events (several listeners, redelivery) cannot both win.
+    """
+    key = f"join:{report_id}"
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.sadd(key, stage)
+    pipe.scard(key)
+    pipe.expire(key, JOIN_TTL_SECONDS)
+    added, count, _ = pipe.execute()
+
+    return bool(added) and count == len(required)
+
+
+def reset_stages(report_id: str):
+    redis_client.delete(
+        f"join:{report_id}",
+        _pending_key(report_id),
+        _research_key(report_id),
+    )
+
+
+# --------------------------------------------------
+# Embedding stage: outstanding embeddings + research finished
+# --------------------------------------------------
+def _pending_key(report_id: str) -> str:
+    return f"join:{report_id}:embeddings"
+
+
+def _research_key(report_id: str) -> str:
+    return f"join:{report_id}:research_finished"
+
+
+def expect_embedding(report_id: str):
+    """
+    Count one queued embedding (before it is sent to the broker).
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.incr(_pending_key(report_id))
+    pipe.expire(_pending_key(report_id), JOIN_TTL_SECONDS)
+    pipe.execute()
+
+
+def embedding_finished(report_id: str) -> bool:
+    """
+    One embedding reached its final outcome. True when it was the last
+    outstanding one and research has stopped queueing new ones.
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.decr(_pending_key(report_id))
+    pipe.exists(_research_key(report_id))
+    remaining, finished = pipe.execute()
+    return remaining <= 0 and bool(finished)
+
+
+def research_finished(report_id: str) -> bool:
+    """
+    Research queued its last embedding. True when none is outstanding.
+    Exactly one of this and embedding_finished() sees both conditions.
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(_research_key(report_id), 1, ex=JOIN_TTL_SECONDS)
+    pipe.get(_pending_key(report_id))
+    _, remaining = pipe.execute()
+    return int(remaining or 0) <= 0
@@ -0,0 +1,147 @@
+# app/utils/query_planner.py
+
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.embedding_service import HashingEncoder
+from app.utils.passage_ranker import tokenize
+
+WEB = "web"
+NEWS = "news"
+PATENT = "patent"
+
+NEWS_TERMS = frozenset(
+    "trend trends news latest market growth funding funded launch launches "
+    "raised acquisition industry report forecast".split()
+)
+PATENT_TERMS = frozenset(
+    "patent patents technology algorithm method device sensor hardware "
+    "apparatus mechanism invention chip protocol".split()
+)
+
+# Near-duplicate thresholds (either one merges two queries)
+TOKEN_JACCARD = 0.6
+EMBEDDING_COSINE = 0.85
+
+
+class PlannedQuery(NamedTuple):
+    query: str
+    engines: tuple[str, ...]
+
+
+class QueryPlanner:
+    """
+    Per-report SERP planning.
+
+    - Near-duplicate queries (token Jaccard or hashed-embedding cosine)
+      collapse into the first one seen
+    - Engines are chosen per query by intent; every query gets web,
+      news/patents only when the wording asks for them
+    - News and patents are each guaranteed at least one call
+      (coverage) while budget allows
+    - Total engine calls never exceed the report budget
+
+    Stateful so queries arriving later (e.g. from the LLM) are planned
+    against what has already been issued.
+    """
+
+    def __init__(self, budget: int | None = None):
+        self.remaining = settings.SERP_CALL_BUDGET if budget is None else budget
+        self.encoder = HashingEncoder(dim=256)
+        self.queries: list[str] = []
+        self.token_sets: list[frozenset] = []
+        self.vectors = np.empty((0, self.encoder.dim), dtype=np.float32)
+        self.engines_used: set[str] = set()
+        self.merged: dict[str, list[str]] = {}
+
+    def plan(self, queries: list[str], max_calls: int | None = None) -> list[PlannedQuery]:
+        """
+        max_calls caps this batch (e.g. keep budget for later queries).
+        """
+        kept = [q for q in (q.strip() for q in queries) if q and not self._is_duplicate(q)]
+        if not kept:
+            return []
+
+        intents = [self._intent(q) for q in kept]
+        engines = [[] for _ in kept]
+        allowance = self.remaining if max_calls is None else min(max_calls, self.remaining)
+
+        def assign(i: int, engine: str) -> bool:
+            nonlocal allowance
+            if allowance <= 0 or engine in engines[i]:
+                return False
+            engines[i].append(engine)
+            self.engines_used.add(engine)
+            self.remaining -= 1
+            allowance -= 1
+            return True
+
+        # 1. Web for every query, in priority order
+        for i in range(len(kept)):
+            assign(i, WEB)
+
+        # 2. Coverage: first news / patent call of the report
+        for engine in (NEWS, PATENT):
+            if engine in self.engines_used:
+                continue
+            target = next(
+                (i for i, intent in enumerate(intents) if engine in intent),
+                0,
+            )
+            assign(target, engine)
+
+        # 3. Remaining intent-driven calls
+        for i, intent in enumerate(intents):
+            for engine in (NEWS, PATENT):
+                if engine in intent:
+                    assign(i, engine)
+
+        return [
+            PlannedQuery(q, tuple(e))
+            for q, e in zip(kept, engines)
+            if e
+        ]
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+    def _is_duplicate(self, query: str) -> bool:
+        tokens = frozenset(_stem(t) for t in tokenize(query))
+        vector = self.encoder.encode([query])[0]
+
+        if len(self.vectors):
+            cosines = self.vectors @ vector
+            for i, existing in enumerate(self.token_sets):
+                union = tokens | existing
+                jaccard = len(tokens & existing) / len(union) if union else 1.0
+                if jaccard >= TOKEN_JACCARD or cosines[i] >= EMBEDDING_COSINE:
+                    self.merged.setdefault(self.queries[i], []).append(query)
+                    return True
+
+        self.token_sets.append(tokens)
+        self.vectors = np.vstack([self.vectors, vector])
+        self.queries.append(query)
+        return False
+
+    def _intent(self, query: str) -> set[str]:
+        tokens = set(tokenize(query))
+        intent = set()
+        if tokens & NEWS_TERMS or tokens & _recent_years():
+            intent.add(NEWS)
+        if tokens & PATENT_TERMS:
+            intent.add(PATENT)
+        return intent
+
+
+def _recent_years() -> set[str]:
+    # Last, current and next year read as a request for recent coverage
+    year = date.today().year
+    return {str(y) for y in range(year - 1, year + 2)}
+
+
+def _stem(token: str) -> str:
+    # "apps" ≈ "app", "diabetics" ≈ "diabetic"
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
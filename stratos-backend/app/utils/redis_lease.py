@@ -0,0 +1,117 @@
+# app/utils/redis_lease.py
+
+import uuid
+import logging
+import threading
+
+from app.config import settings
+from app.utils.redis_pub import redis_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Only the holder (matching token) may release / extend
+_RELEASE = redis_client.register_script("""
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+""")
+
+_RENEW = redis_client.register_script("""
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+""")
+
+
+class Lease:
+    """
+    Short-TTL mutual exclusion on a Redis key.
+
+    SET NX PX with a random token; release and renew are
+    compare-and-act Lua scripts, so an expired holder can never
+    delete or extend a lease someone else has since taken.
+    """
+
+    def __init__(self, key: str, ttl_seconds: float):
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        return bool(redis_client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+
+    def renew(self) -> bool:
+        return bool(_RENEW(keys=[self.key], args=[self.token, self.ttl_ms]))
+
+    def release(self) -> bool:
+        return bool(_RELEASE(keys=[self.key], args=[self.token]))
+
+
+class LeaseLost(Exception):
+    """
+    The execution lease expired or was taken over; stop writing.
+    """
+
+
+class ExecutionLease(Lease):
+    """
+    One live execution per (task type, report_id).
+
+    - The lease value is a fencing token from INCR, so every
+      acquisition (across nodes) gets a strictly larger token
+    - A heartbeat thread renews it every ttl/3; if the worker
+      process dies, the lease expires and a redelivery takes over
+    - check() before writes: a stale holder raises LeaseLost
+      instead of overwriting the newer execution's data
+    """
+
+    def __init__(self, task: str, report_id: str, ttl_seconds: float | None = None):
+        super().__init__(
+            f"lease:{task}:{report_id}",
+            settings.EXECUTION_LEASE_SECONDS if ttl_seconds is None else ttl_seconds,
+        )
+        self.fence_key = f"fence:{task}:{report_id}"
+        self.fence = None
+        self._stop = threading.Event()
+        self._lost = threading.Event()
+        self._heartbeat = None
+
+    def acquire(self) -> bool:
+        self.fence = redis_client.incr(self.fence_key)
+        self.token = str(self.fence)
+        if not super().acquire():
+            return False
+
+        self._heartbeat = threading.Thread(
+            target=self._beat,
+            name=f"heartbeat-{self.key}",
+            daemon=True,
+        )
+        self._heartbeat.start()
+        return True
+
+    def check(self):
+        if self._lost.is_set() or redis_client.get(self.key) != self.token.encode():
+            self._lost.set()
+            raise LeaseLost(f"{self.key} (fence {self.fence}) is no longer held")
+
+    def release(self) -> bool:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        return super().release()
+
+    def _beat(self):
+        interval = self.ttl_ms / 3000
+        while not self._stop.wait(interval):
+            try:
+                if not self.renew():
+                    logger.warning("Lease %s lost (fence %s)", self.key, self.fence)
+                    self._lost.set()
+                    return
+            except Exception:
+                # Transient Redis error: keep trying until the TTL runs out
+                logger.exception("Lease heartbeat failed for %s", self.key)
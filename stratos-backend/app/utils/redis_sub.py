@@ -7,7 +7,7 @@ from app.services.orchestrator_service import OrchestratorService
 def start_event_listener():
     """
     Background Redis Pub/Sub listener.
-    Listens for clarification_ready and triggers orchestrator transitions.
+    Listens for pipeline events and triggers orchestrator transitions.
     """
     r = redis.Redis.from_url(settings.REDIS_PUBSUB_URL)
     pubsub = r.pubsub()
@@ -45,5 +45,48 @@ def start_event_listener():
                     report_id=payload["report_id"],
                     sections=payload["sections"],
                 )
+            finally:
+                db.close()
+
+        elif event_type == "research_done":
+            # join with outline before section writing
+            db = SessionLocal()
+            try:
+                OrchestratorService.handle_research_done(
+                    db=db,
+                    report_id=payload["report_id"],
+                )
+            finally:
+                db.close()
+
+        elif event_type == "embeddings_done":
+            # research pages are all in the vector store
+            db = SessionLocal()
+            try:
+                OrchestratorService.handle_embeddings_done(
+                    db=db,
+                    report_id=payload["report_id"],
+                )
+            finally:
+                db.close()
+
+        elif event_type == "sections_done":
+            db = SessionLocal()
+            try:
+                OrchestratorService.handle_sections_done(
+                    db=db,
+                    report_id=payload["report_id"],
+                )
+            finally:
+                db.close()
+
+        elif event_type == "report_assembled":
+            db = SessionLocal()
+            try:
+                OrchestratorService.handle_report_assembled(
+                    db=db,
+                    report_id=payload["report_id"],
+                    payload=payload,
+                )
             finally:
                 db.close()
\ No newline at end of file
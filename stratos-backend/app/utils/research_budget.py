@@ -0,0 +1,134 @@
+# app/utils/research_budget.py
+
+import time
+import threading
+from typing import NamedTuple
+
+from app.config import settings
+
+
+class BudgetLimits(NamedTuple):
+    seconds: float
+    serp_calls: int
+    pages: int
+    bytes: int
+
+
+# Per plan tier; RESEARCH_BUDGETS (JSON env) overrides individual fields
+PLAN_BUDGETS = {
+    "free": BudgetLimits(seconds=120, serp_calls=9, pages=15, bytes=15 * 2**20),
+    "pro": BudgetLimits(seconds=300, serp_calls=12, pages=40, bytes=60 * 2**20),
+    "team": BudgetLimits(seconds=600, serp_calls=24, pages=100, bytes=150 * 2**20),
+}
+
+# Exhaustion reasons
+TIME = "time"
+SERP = "serp_calls"
+PAGES = "pages"
+BYTES = "bytes"
+CANCELLED = "cancelled"
+
+
+def limits_for(plan_tier: str | None) -> BudgetLimits:
+    tier = plan_tier if plan_tier in PLAN_BUDGETS else settings.RESEARCH_DEFAULT_PLAN
+    limits = PLAN_BUDGETS[tier]
+    return limits._replace(**(settings.RESEARCH_BUDGETS.get(tier) or {}))
+
+
+class ResearchBudget:
+    """
+    Wall-clock deadline + SERP / page / byte allowances for one report run.
+
+    Shared by every stage (and thread): stages ask before starting new
+    work and stop once it is gone; whatever already finished is kept.
+    The first limit hit is recorded as `exhausted`.
+
+    `cancelled` (e.g. a CancelToken's is_set) ends the budget early, so
+    every deadline check doubles as a cancellation checkpoint.
+    """
+
+    def __init__(self, limits: BudgetLimits, clock=time.monotonic, cancelled=None):
+        self.limits = limits
+        self.clock = clock
+        self.cancelled = cancelled
+        self.started = clock()
+        self.deadline = self.started + limits.seconds
+        self.used = {SERP: 0, PAGES: 0, BYTES: 0}
+        self.exhausted: str | None = None
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Time
+    # --------------------------------------------------
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.clock())
+
+    def expired(self) -> bool:
+        if self.cancelled is not None and self.cancelled():
+            self._exhaust(CANCELLED)
+            return True
+        if self.remaining() > 0:
+            return False
+        self._exhaust(TIME)
+        return True
+
+    def timeout(self, default: float) -> float:
+        """
+        Per-request timeout that never outlives the deadline.
+        """
+        return max(0.1, min(default, self.remaining()))
+
+    # --------------------------------------------------
+    # Counted allowances
+    # --------------------------------------------------
+    def take_serp(self, calls: int = 1) -> bool:
+        return self._take(SERP, calls, self.limits.serp_calls)
+
+    def take_page(self) -> bool:
+        return self._take(PAGES, 1, self.limits.pages)
+
+    def bytes_left(self) -> int:
+        with self._lock:
+            return max(0, self.limits.bytes - self.used[BYTES])
+
+    def add_bytes(self, n: int):
+        with self._lock:
+            self.used[BYTES] += n
+            if self.used[BYTES] >= self.limits.bytes:
+                self._exhaust(BYTES)
+
+    def stopped(self) -> bool:
+        """
+        True once no new fetch should start (time, pages or bytes gone).
+        Reads the counters: `exhausted` only keeps the first reason.
+        """
+        if self.expired():
+            return True
+        with self._lock:
+            return (
+                self.used[PAGES] >= self.limits.pages
+                or self.used[BYTES] >= self.limits.bytes
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limits": self.limits._asdict(),
+                "used": {**self.used, "seconds": round(self.clock() - self.started, 2)},
+                "exhausted": self.exhausted,
+            }
+
+    # --------------------------------------------------
+    def _take(self, kind: str, n: int, limit: int) -> bool:
+        if self.expired():
+            return False
+        with self._lock:
+            if self.used[kind] + n > limit:
+                self._exhaust(kind)
+                return False
+            self.used[kind] += n
+            return True
+
+    def _exhaust(self, reason: str):
+        if self.exhausted is None:
+            self.exhausted = reason
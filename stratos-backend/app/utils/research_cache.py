@@ -0,0 +1,68 @@
+# app/utils/research_cache.py
+
+import json
+import zlib
+import hashlib
+import logging
+
+from app.config import settings
+from app.utils.redis_pub import redis_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def _get(key: str):
+    try:
+        raw = redis_client.get(key)
+    except Exception:
+        logger.exception("Research cache read failed (%s)", key)
+        return None
+    if raw is None:
+        return None
+    return json.loads(zlib.decompress(raw))
+
+
+def _set(key: str, value, ttl: int):
+    try:
+        redis_client.set(key, zlib.compress(json.dumps(value).encode("utf-8")), ex=ttl)
+    except Exception:
+        logger.exception("Research cache write failed (%s)", key)
+
+
+# --------------------------------------------------
+# SERP responses (normalized results, keyed by engine params)
+# --------------------------------------------------
+def serp_key(params: dict) -> str:
+    public = {k: v for k, v in params.items() if k != "api_key"}
+    return f"cache:serp:{_digest(json.dumps(public, sort_keys=True))}"
+
+
+def get_serp(params: dict) -> list[dict] | None:
+    return _get(serp_key(params))
+
+
+def set_serp(params: dict, results: list[dict]):
+    _set(serp_key(params), results, settings.SERP_CACHE_TTL)
+
+
+# --------------------------------------------------
+# Scraped pages (candidate passages + cleaned text)
+# --------------------------------------------------
+def page_key(url: str) -> str:
+    return f"cache:page:{_digest(url)}"
+
+
+def get_page(url: str) -> tuple[list[str], str] | None:
+    cached = _get(page_key(url))
+    if cached is None:
+        return None
+    return cached["candidates"], cached["text"]
+
+
+def set_page(url: str, candidates: list[str], text: str):
+    _set(page_key(url), {"candidates": candidates, "text": text}, settings.PAGE_CACHE_TTL)
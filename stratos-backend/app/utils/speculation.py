@@ -0,0 +1,80 @@
+# app/utils/speculation.py
+
+import json
+
+from app.utils.redis_pub import redis_client
+
+SPECULATION_TTL_SECONDS = 3600
+
+
+def _key(report_id: str) -> str:
+    return f"speculative:{report_id}"
+
+
+def start(report_id: str, task_id: str):
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.delete(_key(report_id))
+    pipe.hset(_key(report_id), mapping={"task_id": task_id})
+    pipe.expire(_key(report_id), SPECULATION_TTL_SECONDS)
+    pipe.execute()
+
+
+def save_queries(report_id: str, queries: list[str]):
+    # May land after promote() deleted the hash: never leave it without a TTL
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hset(_key(report_id), "queries", json.dumps(queries))
+    pipe.expire(_key(report_id), SPECULATION_TTL_SECONDS)
+    pipe.execute()
+
+
+def is_cancelled(report_id: str) -> bool:
+    """
+    True once the prefetch should stop: cancelled, or consent given.
+    """
+    return any(redis_client.hmget(_key(report_id), "cancelled", "stopped"))
+
+
+def cancel(report_id: str) -> str | None:
+    """
+    Mark the speculation cancelled and drop its query plan.
+    Returns the task id so the caller can revoke it.
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hget(_key(report_id), "task_id")
+    pipe.hdel(_key(report_id), "queries")
+    pipe.hset(_key(report_id), "cancelled", "1")
+    pipe.expire(_key(report_id), SPECULATION_TTL_SECONDS)
+    task_id, *_ = pipe.execute()
+    return task_id.decode() if task_id else None
+
+
+def stop(report_id: str) -> str | None:
+    """
+    Consent given: the real run takes over, so the prefetch stops
+    warming; its query plan stays for promote(). Returns the task id
+    so the caller can revoke it.
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hget(_key(report_id), "task_id")
+    pipe.hset(_key(report_id), "stopped", "1")
+    pipe.expire(_key(report_id), SPECULATION_TTL_SECONDS)
+    task_id, *_ = pipe.execute()
+    return task_id.decode() if task_id else None
+
+
+def promote(report_id: str) -> list[str] | None:
+    """
+    Hand the speculative query plan to the real research run (once).
+    """
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hget(_key(report_id), "queries")
+    pipe.hget(_key(report_id), "cancelled")
+    # Stop marker stays, so a prefetch still running stops too
+    pipe.hdel(_key(report_id), "queries")
+    pipe.hset(_key(report_id), "stopped", "1")
+    pipe.expire(_key(report_id), SPECULATION_TTL_SECONDS)
+    raw, cancelled, *_ = pipe.execute()
+
+    if raw is None or cancelled is not None:
+        return None
+    return json.loads(raw)
@@ -17,4 +17,5 @@ class SessionState(str, Enum):
     RESEARCH_RUNNING = "RESEARCH_RUNNING"
     WRITING_SECTIONS = "WRITING_SECTIONS"
     READY_FOR_EXPORT = "READY_FOR_EXPORT"
+    CANCELLED = "CANCELLED"
  
\ No newline at end of file
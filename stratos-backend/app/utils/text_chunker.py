@@ -0,0 +1,116 @@
+# app/utils/text_chunker.py
+
+import re
+from collections import deque
+from typing import Iterator, NamedTuple
+
+PARAGRAPH_RE = re.compile(r"[^\n]+")
+TOKEN_RE = re.compile(r"\S+")
+
+MAX_TOKENS = 256
+OVERLAP_TOKENS = 32
+
+
+class TextChunk(NamedTuple):
+    text: str
+    start: int  # char offset into the source text
+    end: int
+    tokens: int
+
+
+def iter_paragraphs(text: str) -> Iterator[tuple[int, int]]:
+    """
+    Yield (start, end) of every non-blank line.
+    clean_html() already collapses blocks to one paragraph per line.
+    """
+    for match in PARAGRAPH_RE.finditer(text):
+        start, end = match.span()
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            yield start, end
+
+
+def iter_paragraph_text(text: str) -> Iterator[str]:
+    for start, end in iter_paragraphs(text):
+        yield text[start:end]
+
+
+def count_tokens(text: str, start: int = 0, end: int | None = None) -> int:
+    end = len(text) if end is None else end
+    return sum(1 for _ in TOKEN_RE.finditer(text, start, end))
+
+
+def iter_chunks(
+    text: str,
+    max_tokens: int = MAX_TOKENS,
+    overlap_tokens: int = OVERLAP_TOKENS,
+) -> Iterator[TextChunk]:
+    """
+    Stream token-bounded chunks that break on paragraph boundaries.
+
+    - Paragraphs are packed until the next one would exceed max_tokens
+    - The trailing paragraphs (up to overlap_tokens) open the next chunk
+    - A single paragraph longer than max_tokens is split on token windows
+
+    Only (start, end, tokens) spans are buffered, never the text itself,
+    so memory stays flat regardless of page size.
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+
+    window: deque[tuple[int, int, int]] = deque()
+    window_tokens = 0
+
+    def flush() -> TextChunk:
+        start, end = window[0][0], window[-1][1]
+        return TextChunk(text[start:end], start, end, window_tokens)
+
+    for start, end in iter_paragraphs(text):
+        tokens = count_tokens(text, start, end)
+
+        if tokens > max_tokens:
+            if window:
+                yield flush()
+                window.clear()
+                window_tokens = 0
+            yield from _split_paragraph(text, start, end, max_tokens, overlap_tokens)
+            continue
+
+        if window and window_tokens + tokens > max_tokens:
+            yield flush()
+            while window and (
+                window_tokens > overlap_tokens
+                or window_tokens + tokens > max_tokens
+            ):
+                window_tokens -= window.popleft()[2]
+
+        window.append((start, end, tokens))
+        window_tokens += tokens
+
+    if window:
+        yield flush()
+
+
+def _split_paragraph(
+    text: str,
+    start: int,
+    end: int,
+    max_tokens: int,
+    overlap_tokens: int,
+) -> Iterator[TextChunk]:
+    spans: deque[tuple[int, int]] = deque()
+
+    for match in TOKEN_RE.finditer(text, start, end):
+        spans.append(match.span())
+        if len(spans) == max_tokens:
+            s, e = spans[0][0], spans[-1][1]
+            yield TextChunk(text[s:e], s, e, max_tokens)
+            for _ in range(max_tokens - overlap_tokens):
+                spans.popleft()
+
+    if len(spans) > overlap_tokens:
+        s, e = spans[0][0], spans[-1][1]
+        yield TextChunk(text[s:e], s, e, len(spans))
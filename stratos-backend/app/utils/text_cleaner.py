@@ -2,8 +2,14 @@
 # TODO: Remove nav/footer/scripts
 # TODO: Min-length threshold
 
+import re
+
 from bs4 import BeautifulSoup
 
+# One line at a time (no list of every line of the page);
+# same line boundaries as str.splitlines()
+LINE_RE = re.compile(r"[^\n\r\v\f\x1c-\x1e\x85\u2028\u2029]+")
+
 
 def clean_html(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
@@ -14,6 +20,6 @@ def clean_html(html: str) -> str:
     text = soup.get_text(separator="\n")
     # normalize unicode
     text = text.replace("\u00a0", " ").replace("\u200b", "")
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    lines = (m.group(0).strip() for m in LINE_RE.finditer(text))
 
-    return "\n".join(lines)
\ No newline at end of file
+    return "\n".join(line for line in lines if line)
\ No newline at end of file
@@ -0,0 +1,41 @@
+# app/workers/assembler_worker.py
+
+from sqlalchemy.orm import Session
+
+from app.workers.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.services.snapshot_service import save_snapshot
+from app.utils.redis_pub import publish_event
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": 3},
+)
+def run_assembler(self, report_id: str):
+    """
+    Report Assembler
+    - Streams the report tree (3 set-based queries, no lazy loads)
+    - Stores a versioned, content-hashed JSON snapshot
+    - Unchanged content → no new version
+    """
+    db: Session = SessionLocal()
+
+    try:
+        snapshot = save_snapshot(db, report_id)
+
+        publish_event("report_assembled", {
+            "report_id": report_id,
+            "version": snapshot.version,
+            "content_hash": snapshot.content_hash,
+        })
+
+    finally:
+        db.close()
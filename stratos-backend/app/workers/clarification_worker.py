@@ -9,7 +9,10 @@ from app.llm.client import generate_chat
 from app.llm.prompts import CLARIFICATION_CONTROLLER_PROMPT
 from app.db.session import SessionLocal
 from app.db import models
-from app.utils.redis_pub import publish_event
+from app.config import settings
+from app.utils.redis_pub import publish_event, redis_client
+from app.utils.redis_lease import Lease
+from app.utils import cancellation
 
 CONFIDENCE_THRESHOLD = 0.95
 
@@ -48,6 +51,50 @@ def compute_confidence(schema: dict) -> float:
     )
     return round(filled / len(SCHEMA_FIELDS), 2)
 
+# --------------------------------------------------
+# Per-session coalescing
+# --------------------------------------------------
+def _dirty_key(session_id: str) -> str:
+    return f"clarify:{session_id}:dirty"
+
+
+def _scheduled_key(session_id: str) -> str:
+    return f"clarify:{session_id}:scheduled"
+
+
+def request_clarification(
+    session_id: str,
+    debounce: float | None = None,
+    user_id: str | None = None,
+):
+    """
+    Mark the session as having unprocessed messages and schedule
+    at most one debounced run. Messages arriving inside the window
+    (or while a run is in flight) are picked up by that run.
+    """
+    if debounce is None:
+        debounce = settings.CLARIFICATION_DEBOUNCE_SECONDS
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(_dirty_key(session_id), 1)
+    pipe.set(
+        _scheduled_key(session_id),
+        1,
+        nx=True,
+        px=int((debounce + settings.CLARIFICATION_LEASE_SECONDS) * 1000),
+    )
+    _, scheduled = pipe.execute()
+
+    if scheduled:
+        cancellation.dispatch(
+            run_clarification,
+            session_id,
+            session_id,
+            user_id=user_id,
+            countdown=debounce,
+        )
+
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
@@ -55,6 +102,45 @@ def compute_confidence(schema: dict) -> float:
     retry_kwargs={"max_retries": 3},
 )
 def run_clarification(self, session_id: str):
+    """
+    Coalesced clarification runner.
+    - One LLM call in flight per session (lease)
+    - Reruns while new messages arrived during the previous pass
+    """
+    # From here on, new messages schedule a fresh task
+    redis_client.delete(_scheduled_key(session_id))
+
+    if cancellation.is_cancelled(session_id):
+        return
+
+    lease = Lease(
+        f"clarify:{session_id}:lease",
+        settings.CLARIFICATION_LEASE_SECONDS,
+    )
+
+    # Holder busy → it sees the dirty flag after its current pass
+    while lease.acquire():
+        try:
+            while (
+                not cancellation.is_cancelled(session_id)
+                and redis_client.getdel(_dirty_key(session_id))
+            ):
+                try:
+                    clarify_once(session_id)
+                except Exception:
+                    # Keep the messages pending for the retry
+                    redis_client.set(_dirty_key(session_id), 1)
+                    raise
+                lease.renew()
+        finally:
+            lease.release()
+
+        # A message may have landed between the last check and release
+        if not redis_client.exists(_dirty_key(session_id)):
+            break
+
+
+def clarify_once(session_id: str):
     """
     Stateless clarification intelligence.
     Reads conversation, asks next question, emits update.
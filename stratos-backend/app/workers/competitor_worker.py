@@ -0,0 +1,103 @@
+# app/workers/competitor_worker.py
+
+from app.workers.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.db import models
+from app.services.competitor_service import CompetitorService
+from app.services.research_service import ResearchService
+from app.utils.fetch_scheduler import FetchScheduler, RobotsCache, BLOCKED
+from app.utils.adaptive_concurrency import FETCH_LIMITER
+from app.utils.redis_pub import publish_event, redis_client
+from app.utils.redis_lease import ExecutionLease, LeaseLost
+from app.utils.cancellation import CancelToken, Cancelled
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=10,
+    retry_kwargs={"max_retries": 3},
+)
+def run_competitor(self, report_id: str):
+    """
+    Competitor Worker
+    - Extracts names from stored SERP titles / snippets / domains
+    - Resolves aliases ("Notion", "notion.so", "Notion Labs") to one entity
+    - Enriches each canonical competitor from ONE homepage fetch
+      (page cache + polite fetch scheduler)
+    """
+
+    lease = ExecutionLease("competitor", report_id)
+    if not lease.acquire():
+        logger.info("[COMPETITOR] Already running for report=%s", report_id)
+        return
+
+    db = SessionLocal()
+
+    try:
+        session_id = (
+            db.query(models.Report.session_id)
+            .filter_by(id=report_id)
+            .scalar()
+        )
+        token = CancelToken(session_id)
+        token.check()
+
+        service = CompetitorService(db)
+        entities = service.resolve(report_id)
+
+        research = ResearchService(db=db)
+        scheduler = FetchScheduler(
+            fetch_fn=research.scrape_and_extract,
+            robots=RobotsCache(redis_client),
+            limiter=FETCH_LIMITER,
+            should_stop=token.is_set,
+        )
+
+        enrichment = {}
+        for key, fetched in scheduler.run(
+            (e.key, e.website) for e in entities if e.website
+        ):
+            if fetched is BLOCKED or not fetched:
+                continue
+            candidates, _ = fetched
+            enrichment[key] = service.enrich(candidates)
+
+        lease.check()
+        token.check()
+        competitors = service.save(report_id, entities, enrichment)
+
+        logger.info(
+            "[COMPETITOR] report=%s competitors=%s",
+            report_id,
+            [c["name"] for c in competitors],
+        )
+
+        publish_event("competitors_ready", {
+            "report_id": report_id,
+            "competitors": competitors,
+        })
+
+    except LeaseLost:
+        db.rollback()
+        logger.warning("[COMPETITOR] Lease lost for report=%s, stopping", report_id)
+
+    except Cancelled:
+        db.rollback()
+        logger.info("[COMPETITOR] Cancelled report=%s", report_id)
+
+    except Exception as e:
+        publish_event(
+            "competitors_failed",
+            {"report_id": report_id, "error": str(e)},
+        )
+        raise
+
+    finally:
+        db.close()
+        lease.release()
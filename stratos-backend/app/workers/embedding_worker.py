@@ -0,0 +1,99 @@
+# app/workers/embedding_worker.py
+
+from app.workers.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.db import models
+from app.services.embedding_service import EmbeddingService
+from app.services.vector_store import get_vector_store
+from app.utils.pipeline_join import embedding_finished
+from app.utils.redis_pub import publish_event
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_RETRIES = 3
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": MAX_RETRIES},
+)
+def run_embedding(self, report_id: str, source_id: str):
+    """
+    Embedding Worker
+    - Loads the source's full cleaned page text from Postgres
+    - Chunks it, embeds chunks in batches (CPU only)
+    - Appends vectors to the report's vector store
+    - The report's last outstanding embedding releases section writing
+    """
+    try:
+        embed_source(report_id, source_id)
+    except Exception:
+        # Retries left → still outstanding
+        if self.request.retries < MAX_RETRIES:
+            raise
+        logger.exception("[EMBEDDING] Giving up on source_id=%s", source_id)
+        _finished(report_id)
+        raise
+
+    _finished(report_id)
+
+
+def _finished(report_id: str):
+    if embedding_finished(report_id):
+        publish_event("embeddings_done", {"report_id": report_id})
+
+
+def embed_source(report_id: str, source_id: str):
+    db = SessionLocal()
+    try:
+        source = (
+            db.query(
+                models.Source.url,
+                models.Source.domain,
+                models.Source.type,
+                models.Source.content,
+            )
+            .filter_by(id=source_id)
+            .first()
+        )
+    finally:
+        db.close()
+
+    if not source or not source.content:
+        return
+
+    text = source.content
+
+    service = EmbeddingService()
+    batch = service.embed_document(text)
+
+    if not batch.chunks:
+        return
+
+    metadatas = [
+        {
+            "source_id": source_id,
+            "url": source.url,
+            "domain": source.domain,
+            "type": source.type or "web",
+            "chunk_index": i,
+            "start": start,
+            "end": end,
+            "text": chunk,
+        }
+        for i, (chunk, (start, end)) in enumerate(zip(batch.chunks, batch.spans))
+    ]
+
+    get_vector_store(report_id).add(batch.vectors, metadatas)
+
+    logger.info(
+        "[EMBEDDING] source_id=%s chunks=%d %s",
+        source_id,
+        len(batch.chunks),
+        batch.stats,
+    )
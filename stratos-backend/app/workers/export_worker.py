@@ -0,0 +1,58 @@
+# app/workers/export_worker.py
+
+from app.workers.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.services.export_service import ExportService, release_render
+from app.utils.redis_pub import publish_event
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MAX_RETRIES = 3
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=5,
+    retry_kwargs={"max_retries": MAX_RETRIES},
+)
+def run_export(self, report_id: str, fmt: str, content_hash: str | None = None):
+    """
+    Export Worker
+    - Renders the latest report snapshot to a file
+    - Reuses the stored artifact when (content hash, format) is cached
+    - Releases the API's in-flight claim (content_hash) once final
+    """
+    db = SessionLocal()
+    final = True
+
+    try:
+        record = ExportService(db).export(report_id, fmt)
+
+        publish_event("export_ready", {
+            "report_id": report_id,
+            "export_id": record.id,
+            "format": fmt,
+            "content_hash": record.content_hash,
+        })
+
+    except ValueError as e:
+        # Bad format / missing optional dependency: retrying cannot help
+        publish_event("export_failed", {
+            "report_id": report_id,
+            "format": fmt,
+            "error": str(e),
+        })
+
+    except Exception:
+        # Retries left → the render is still in flight
+        final = self.request.retries >= MAX_RETRIES
+        raise
+
+    finally:
+        db.close()
+        if final and content_hash:
+            release_render(content_hash, fmt)
@@ -1,12 +1,22 @@
 from sqlalchemy.orm import Session
 import json, re
+import uuid
 
 from app.workers.celery_app import celery_app
+from app.config import settings
 from app.db.session import SessionLocal
 from app.db import models
 from app.llm.client import generate_chat
 from app.llm.prompts import OUTLINE_PROMPT
 from app.utils.redis_pub import publish_event
+from app.utils.redis_lease import ExecutionLease, LeaseLost
+from app.utils.cancellation import CancelToken, Cancelled
+from app.utils.clarification_schema import parse_clarified_summary
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 CORE_SECTIONS = [
     "Problem Context & Validation",
@@ -24,6 +34,29 @@ ALLOWED_OPTIONAL_SECTIONS = {
     "Go-To-Market Strategy",
 }
 
+# Local outline mode: optional section → trigger keywords (fixed order)
+OPTIONAL_SECTION_RULES = [
+    ("Technical Feasibility", frozenset(
+        "ai ml llm model algorithm hardware sensor sensors device devices "
+        "blockchain api integration integrations robotics iot wearable "
+        "automation computer vision realtime real-time infrastructure".split()
+    )),
+    ("Regulatory Considerations", frozenset(
+        "health healthcare medical patient patients clinical fda hipaa gdpr "
+        "privacy finance financial bank banking payments insurance legal "
+        "compliance regulated regulation children kids crypto pharmacy "
+        "lending tax drone drones".split()
+    )),
+    ("Go-To-Market Strategy", frozenset(
+        "b2b b2c marketplace pricing subscription sales customers launch "
+        "smb smbs enterprise enterprises consumers distribution channel "
+        "channels retailers resellers freemium".split()
+    )),
+]
+
+# Keyword hits needed to include an optional section
+OPTIONAL_SECTION_MIN_HITS = 2
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
@@ -36,12 +69,18 @@ def run_outline(self, report_id: str):
     1. Load report
     2. Load session.clarified_summary
     3. Validate clarified_summary exists
-    4. Call LLM to generate outline
+    4. Select sections (local rules, or LLM when OUTLINE_MODE=llm)
     5. Parse + normalize section titles
     6. Delete existing sections (idempotent)
     7. Insert ordered sections
     8. Publish outline_ready SSE event
     """
+    # Redelivery / retry while another execution is live → nothing to do
+    lease = ExecutionLease("outline", report_id)
+    if not lease.acquire():
+        logger.info("[OUTLINE] Already running for report=%s", report_id)
+        return
+
     db: Session = SessionLocal()
 
     try:
@@ -53,29 +92,41 @@ def run_outline(self, report_id: str):
         if not session or not session.clarified_summary:
             raise ValueError("Clarified summary missing")
 
+        token = CancelToken(session.id)
+        token.check()
+
         # -------------------------------
-        # Call LLM
+        # Select sections (local rules by default, LLM opt-in)
         # -------------------------------
-        prompt = OUTLINE_PROMPT.replace(
-            "{{CLARIFIED_SUMMARY}}",
-            session.clarified_summary
-        )
+        if settings.OUTLINE_MODE == "llm":
+            prompt = OUTLINE_PROMPT.replace(
+                "{{CLARIFIED_SUMMARY}}",
+                session.clarified_summary
+            )
 
-        raw_output = generate_chat(
-            messages=[{"role": "system", "content": prompt}],
-            temperature=0.2,
-        )
+            raw_output = generate_chat(
+                messages=[{"role": "system", "content": prompt}],
+                temperature=0.2,
+            )
 
-        section_titles = parse_outline(raw_output)
+            section_titles = parse_outline(raw_output)
+        else:
+            section_titles = normalize_outline(
+                select_optional_sections(session.clarified_summary)
+            )
 
         # -------------------------------
         # Idempotent persistence
         # -------------------------------
+        lease.check()
+        token.check()
         db.query(models.Section).filter_by(report_id=report_id).delete()
 
         sections = []
         for idx, title in enumerate(section_titles, start=1):
+            # Explicit id: the default only fires on flush, after the payload is built
             section = models.Section(
+                id=str(uuid.uuid4()),
                 report_id=report_id,
                 title=title,
                 order_index=idx,
@@ -87,6 +138,7 @@ def run_outline(self, report_id: str):
                 "order_index": idx,
             })
             
+        lease.check()
         db.commit()
 
         # -------------------------------
@@ -100,8 +152,18 @@ def run_outline(self, report_id: str):
             }
         )
 
+    except LeaseLost:
+        # A newer execution owns the report now; it publishes the outline
+        db.rollback()
+        logger.warning("[OUTLINE] Lease lost for report=%s, stopping", report_id)
+
+    except Cancelled:
+        db.rollback()
+        logger.info("[OUTLINE] Cancelled report=%s", report_id)
+
     finally:
         db.close()
+        lease.release()
 
     
     
@@ -120,6 +182,13 @@ def parse_outline(raw_output: str) -> list[str]:
     if not isinstance(sections, list) or not sections:
         raise ValueError("Missing or invalid 'sections' array")
 
+    return normalize_outline(sections)
+
+
+def normalize_outline(sections: list) -> list[str]:
+    """
+    Core sections first (fixed order), then up to 3 allowed optional ones.
+    """
     cleaned = []
     seen = set()
 
@@ -145,3 +214,26 @@ def parse_outline(raw_output: str) -> list[str]:
             break
 
     return cleaned
+
+
+# LOCAL MODE (no LLM) -> keyword rules over the clarified schema
+def select_optional_sections(clarified_summary: str) -> list[str]:
+    """
+    Pick optional sections whose trigger keywords appear at least
+    OPTIONAL_SECTION_MIN_HITS times across the clarified summary.
+    """
+    data = parse_clarified_summary(clarified_summary)
+    if data is None:
+        text = clarified_summary or ""
+    else:
+        text = json.dumps(data.get("final_schema") or data)
+
+    tokens = re.findall(r"[a-z0-9\-]+", text.lower())
+
+    selected = []
+    for title, keywords in OPTIONAL_SECTION_RULES:
+        hits = sum(1 for t in tokens if t in keywords)
+        if hits >= OPTIONAL_SECTION_MIN_HITS:
+            selected.append(title)
+
+    return selected
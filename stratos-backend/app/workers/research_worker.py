@@ -5,19 +5,35 @@ from app.workers.celery_app import celery_app
 from app.db.session import SessionLocal
 from app.db import models
 from app.services.research_service import ResearchService
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from app.utils.redis_pub import publish_event
+from app.utils.query_planner import QueryPlanner
+from app.utils.research_budget import ResearchBudget, limits_for
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import chain
+from app.utils import research_cache, speculation
+from app.utils.cancellation import CancelToken, Cancelled, POLL_INTERVAL_SECONDS
+from app.utils.redis_lease import ExecutionLease, LeaseLost
+from app.utils.pipeline_join import research_finished
+from app.utils.redis_pub import publish_event, redis_client
+from app.utils.domain_policy import get_domain_policy, DomainStats
+from app.utils.fetch_scheduler import FetchScheduler, RobotsCache, BLOCKED
+from app.utils.adaptive_concurrency import (
+    SERP_LIMITER,
+    FETCH_LIMITER,
+    limiter_snapshots,
+)
 
 import logging
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+MAX_RETRIES = 3
+
 @celery_app.task(
     bind=True,
     autoretry_for=(Exception,),
     retry_backoff=10,
-    retry_kwargs={"max_retries": 3},
+    retry_kwargs={"max_retries": MAX_RETRIES},
 )
 def run_research(self, report_id: str):
     """
@@ -25,9 +41,21 @@ def run_research(self, report_id: str):
     - Fetches external evidence
     - Stores raw evidence in Astra
     - Stores metadata in Postgres
+    - Bounded by the plan tier's research budget (deadline, SERP calls,
+      pages, bytes); on exhaustion it stops starting work and finishes
+      with whatever evidence it already has
+    - Stops within seconds once the session is cancelled
+      (abandons SERP calls, drops queued fetches, aborts streamed reads)
     """
     
+    # Redelivery / retry while another execution is live → nothing to do
+    lease = ExecutionLease("research", report_id)
+    if not lease.acquire():
+        logger.info("[RESEARCH] Already running for report=%s", report_id)
+        return
+
     db = SessionLocal()
+    domain_stats = DomainStats()
 
     try:
         report = db.query(models.Report).filter_by(id=report_id).first()
@@ -38,106 +66,398 @@ def run_research(self, report_id: str):
         if not session or not session.clarified_summary:
             raise ValueError("Clarified summary missing")
 
+        token = CancelToken(session.id)
+        token.check()
+
         publish_event("searching_sources", {"report_id": report_id})
 
-        service = ResearchService(db=db)
+        # One budget shared by query generation, SERP, fetch and extract;
+        # cancellation exhausts it too
+        budget = ResearchBudget(
+            limits_for(session.user.plan_tier if session.user else None),
+            cancelled=token.is_set,
+        )
+        service = ResearchService(db=db, budget=budget)
+
+        # Queries planned by the speculative prefetch are promoted as-is
+        # (their SERP + page results are already cached)
+        promoted = speculation.promote(report_id)
+        if promoted:
+            logger.info("[RESEARCH] Promoted %d speculative queries", len(promoted))
+
+        # Local keyword queries start SERP immediately;
+        # LLM queries join the plan when they arrive
+        local_queries = promoted or service.generate_local_queries(
+            session.clarified_summary
+        )
+
+        # Collapse near-duplicates, pick engines, enforce SERP budget
+        planner = QueryPlanner(budget=budget.limits.serp_calls)
+
+        # Near-duplicate indexes live for the whole report run
+        snippet_index = service.load_snippet_index(report_id)
+        page_index = service.new_page_index()
+
+        # Domain policy is applied to every SERP result before any fetch
+        policy = get_domain_policy()
+
+        # Web results wait for the fetch + batched ranking phases
+        web_hits = []  # (domain verdict, query, result)
+        seen_urls = set()
 
-        queries = service.generate_queries(session.clarified_summary)
-        logger.info(f"[RESEARCH] Generated {len(queries)} queries")
-        
         # --------------------------------------------------
         # PARALLEL QUERY EXECUTION
         # --------------------------------------------------
-        with ThreadPoolExecutor(max_workers=min(4, len(queries))) as executor:
-            future_to_query = {
-                executor.submit(service.search, query): query
-                for query in queries
-            }
-
-            for future in as_completed(future_to_query):
-                query = future_to_query[future]
-
-                try:
-                    results = future.result()
-                except Exception:
-                    logger.exception(
-                        "[RESEARCH] SERP search failed for query=%s",
-                        query,
-                    )
-                    continue
+        # Threads are only an upper bound; SERP_LIMITER gates real parallelism.
+        # Not a `with` block: at the deadline we must not wait for stragglers.
+        executor = ThreadPoolExecutor(max_workers=SERP_LIMITER.max_limit + 1)
+        try:
+            llm_future = None if promoted else executor.submit(
+                service.generate_queries,
+                session.clarified_summary,
+            )
+            pending = {}  # SERP future → query
 
+            def submit(queries: list[str], max_calls: int | None = None):
+                plan = planner.plan(queries, max_calls=max_calls)
                 logger.info(
-                    "[RESEARCH] Processing %d results for query=%s",
-                    len(results),
-                    query,
+                    "[RESEARCH] Planned %d SERP calls for %d queries (merged=%s)",
+                    sum(len(p.engines) for p in plan),
+                    len(plan),
+                    planner.merged,
                 )
+                for p in plan:
+                    if not budget.take_serp(len(p.engines)):
+                        break
+                    future = executor.submit(service.search, p.query, engines=p.engines)
+                    pending[future] = p.query
 
-                # --------------------------------------------------
-                # Result processing (SEQUENTIAL, DB-safe)
-                # --------------------------------------------------
-                for result in results:
-                    url = result["url"]
-                    source_type = result["type"]
-
-                    if service.is_duplicate_url(report_id, url):
-                        logger.debug(
-                            "[RESEARCH] Duplicate URL skipped: %s",
-                            url,
-                        )
-                        continue
+            # Local queries get half the budget; the rest waits for the LLM
+            submit(
+                local_queries,
+                max_calls=None if promoted else planner.remaining // 2,
+            )
 
-                    # ---------------------------
-                    # NEWS → snippet only
-                    # ---------------------------
-                    if source_type == "news":
-                        source = service.create_source(report_id, result)
+            while pending or llm_future is not None:
+                waiting = list(pending)
+                if llm_future is not None:
+                    waiting.append(llm_future)
 
-                        snippet = result.get("snippet")
-                        if snippet:
-                            service.save_evidence(source.id, [snippet])
+                # Short waits so a cancellation is noticed promptly
+                done, _ = wait(
+                    waiting,
+                    timeout=min(budget.remaining(), POLL_INTERVAL_SECONDS),
+                    return_when=FIRST_COMPLETED,
+                )
 
+                # Deadline / cancel: abandon outstanding SERP calls + query generation
+                if not done:
+                    if not budget.expired():
                         continue
+                    logger.warning(
+                        "[RESEARCH] Budget exhausted (%s) with %d SERP calls pending",
+                        budget.exhausted,
+                        len(pending),
+                    )
+                    break
 
-                    # ---------------------------
-                    # PATENT → metadata only
-                    # ---------------------------
-                    if source_type == "patent":
-                        service.create_source(report_id, result)
+                if llm_future in done:
+                    try:
+                        llm_queries = llm_future.result()
+                        logger.info(f"[RESEARCH] Generated {len(llm_queries)} queries")
+                        submit(llm_queries)
+                    except Exception:
+                        logger.exception("[RESEARCH] LLM query generation failed")
+                    llm_future = None
+
+                for future in done:
+                    if future not in pending:
                         continue
+                    query = pending.pop(future)
 
-                    # ---------------------------
-                    # WEB → scrape required
-                    # ---------------------------
-                    snippets, full_text = service.scrape_and_extract(url)
+                    try:
+                        results = future.result()
+                    except Exception:
+                        logger.exception(
+                            "[RESEARCH] SERP search failed for query=%s",
+                            query,
+                        )
+                        continue
 
-                    logger.debug(
-                        "[RESEARCH] Extracted %d snippets from %s",
-                        len(snippets),
-                        url,
+                    logger.info(
+                        "[RESEARCH] Processing %d results for query=%s",
+                        len(results),
+                        query,
                     )
 
-                    if not snippets:
-                        continue
+                    # --------------------------------------------------
+                    # Result processing (SEQUENTIAL, DB-safe)
+                    # --------------------------------------------------
+                    for result in results:
+                        url = result["url"]
+                        source_type = result["type"]
 
-                    source = service.create_source(report_id, result)
-                    service.save_evidence(source.id, snippets)
+                        verdict = policy.evaluate(url)
+                        domain_stats.incr(verdict.domain, "seen")
+                        if not verdict.allowed:
+                            domain_stats.incr(verdict.domain, "denied")
+                            logger.debug(
+                                "[RESEARCH] Domain policy rejected %s (rule=%s score=%.2f)",
+                                url,
+                                verdict.rule,
+                                verdict.score,
+                            )
+                            continue
 
-                    service.save_to_astra(
-                        report_id=report_id,
-                        source_id=source.id,
-                        url=url,
-                        text=full_text,
-                        metadata=result,
-                    )
+                        # Fencing: a stale execution must not write
+                        lease.check()
+                        token.check()
+
+                        if url in seen_urls or service.is_duplicate_url(report_id, url):
+                            logger.debug(
+                                "[RESEARCH] Duplicate URL skipped: %s",
+                                url,
+                            )
+                            continue
+                        seen_urls.add(url)
+
+                        # ---------------------------
+                        # NEWS → snippet only
+                        # ---------------------------
+                        if source_type == "news":
+                            snippet = result.get("snippet")
+
+                            # Syndicated copy of a story we already have
+                            if snippet and not service.unique_snippets(
+                                snippet_index, url, [snippet]
+                            ):
+                                continue
+
+                            source = service.create_source(report_id, result)
+
+                            if snippet:
+                                service.save_evidence(source.id, [snippet])
+
+                            continue
+
+                        # ---------------------------
+                        # PATENT → metadata only
+                        # ---------------------------
+                        if source_type == "patent":
+                            service.create_source(report_id, result)
+                            continue
+
+                        # ---------------------------
+                        # WEB → scrape required
+                        # ---------------------------
+                        web_hits.append((verdict, query, result))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        token.check()
+
+        # --------------------------------------------------
+        # FETCH + EXTRACT candidate passages
+        # --------------------------------------------------
+        # Highest-scoring domains first
+        web_hits.sort(key=lambda hit: hit[0].score, reverse=True)
+
+        # Per-host politeness: token buckets, Crawl-delay, robots.txt
+        scheduler = FetchScheduler(
+            fetch_fn=service.scrape_and_extract,
+            robots=RobotsCache(redis_client),
+            limiter=FETCH_LIMITER,
+            should_stop=budget.stopped,
+        )
+
+        # Pages already in the cache skip the host queues entirely
+        cached_pages, to_fetch = [], []
+        for i, (_, _, result) in enumerate(web_hits):
+            cached = research_cache.get_page(result["url"])
+            if cached is not None:
+                cached_pages.append((i, cached))
+            else:
+                to_fetch.append((i, result["url"]))
+
+        pages = []  # (domain verdict, query, result, candidates, full_text)
+        for i, fetched in chain(cached_pages, scheduler.run(to_fetch)):
+            verdict, query, result = web_hits[i]
+            url = result["url"]
+
+            if fetched is BLOCKED:
+                domain_stats.incr(verdict.domain, "denied")
+                logger.debug("[RESEARCH] robots.txt disallows %s", url)
+                continue
+
+            candidates, full_text = fetched or ([], None)
+            domain_stats.incr(verdict.domain, "fetched")
 
-        publish_event("research_done", {"report_id": report_id})
+            logger.debug(
+                "[RESEARCH] Extracted %d candidate passages from %s",
+                len(candidates),
+                url,
+            )
+
+            if not candidates:
+                domain_stats.incr(verdict.domain, "failed")
+                continue
+
+            # Mirrored / syndicated page → drop the whole source
+            duplicate_of = page_index.add(url, full_text)
+            if duplicate_of is not None:
+                logger.debug(
+                    "[RESEARCH] Near-duplicate page %s of %s",
+                    url,
+                    duplicate_of,
+                )
+                continue
+
+            pages.append((verdict, query, result, candidates, full_text))
+
+        token.check()
+
+        # --------------------------------------------------
+        # RANK all pages in one batch, then persist
+        # --------------------------------------------------
+        selected = service.select_snippets(
+            [(query, candidates) for _, query, _, candidates, _ in pages],
+            session.clarified_summary,
+        )
+
+        for (verdict, _, result, _, full_text), snippets in zip(pages, selected):
+            url = result["url"]
+
+            snippets = service.unique_snippets(snippet_index, url, snippets)
+            if not snippets:
+                continue
+
+            lease.check()
+            token.check()
+            source = service.create_source(report_id, result, content=full_text)
+            service.save_evidence(source.id, snippets)
+            domain_stats.incr(verdict.domain, "kept")
+
+            if full_text:
+                service.save_to_astra(report_id=report_id, source_id=source.id)
+
+        lease.check()
+
+        logger.info("[RESEARCH] Fetch scheduler: %s", scheduler.snapshot())
+        logger.info("[RESEARCH] Concurrency limits: %s", limiter_snapshots())
+        logger.info("[RESEARCH] Budget: %s", budget.snapshot())
+
+        # No embedding outstanding → the embedding stage completes here
+        if research_finished(report_id):
+            publish_event("embeddings_done", {"report_id": report_id})
+
+        # Partial results still complete the stage; downstream works with them
+        publish_event("research_done", {
+            "report_id": report_id,
+            "partial": budget.exhausted is not None,
+            "budget": budget.snapshot(),
+            "fetch": scheduler.snapshot(),
+            "concurrency": limiter_snapshots(),
+            "near_duplicates": {
+                "snippets": sum(len(v) for v in snippet_index.clusters.values()),
+                "pages": sum(len(v) for v in page_index.clusters.values()),
+            },
+        })
+
+    except LeaseLost:
+        # A newer execution owns the report now; it publishes research_done
+        db.rollback()
+        logger.warning("[RESEARCH] Lease lost for report=%s, stopping", report_id)
+
+    except Cancelled:
+        # Session cancelled: keep what was committed, release the slot
+        db.rollback()
+        logger.info("[RESEARCH] Cancelled report=%s", report_id)
 
     except Exception as e:
         publish_event(
             "research_failed",
-            {"report_id": report_id, "error": str(e)},
+            {
+                "report_id": report_id,
+                "error": str(e),
+                # No retry left: the session stops here
+                "final": self.request.retries >= MAX_RETRIES,
+            },
         )
         raise
 
     finally:
-        db.close()
\ No newline at end of file
+        try:
+            domain_stats.flush(redis_client)
+        except Exception:
+            logger.exception("[RESEARCH] Failed to flush domain stats")
+        db.close()
+        lease.release()
+
+
+@celery_app.task(bind=True, ignore_result=True)
+def prefetch_research(self, report_id: str):
+    """
+    Speculative Research (low priority, routed to SPECULATIVE_QUEUE)
+    - Runs while the user reviews the consent prompt
+    - Plans queries and warms the SERP + page caches
+    - Writes nothing to Postgres; run_research promotes the plan on consent
+    - Stops between steps once the speculation is cancelled
+    """
+
+    db = SessionLocal()
+
+    try:
+        report = db.query(models.Report).filter_by(id=report_id).first()
+        if not report:
+            return
+
+        session = db.query(models.Session).filter_by(id=report.session_id).first()
+        if not session or not session.clarified_summary:
+            return
+
+        service = ResearchService(db=db)
+
+        queries = service.generate_local_queries(session.clarified_summary)
+        queries += service.generate_queries(session.clarified_summary)
+        if speculation.is_cancelled(report_id):
+            return
+
+        # Same planner as run_research, so the promoted plan hits the cache
+        planner = QueryPlanner()
+        plan = planner.plan(queries)
+        speculation.save_queries(report_id, [p.query for p in plan])
+
+        policy = get_domain_policy()
+        urls = []
+        for p in plan:
+            if speculation.is_cancelled(report_id):
+                return
+            for result in service.search(p.query, engines=p.engines):
+                if result["type"] == "web" and policy.evaluate(result["url"]).allowed:
+                    urls.append(result["url"])
+
+        scheduler = FetchScheduler(
+            fetch_fn=service.scrape_and_extract,
+            robots=RobotsCache(redis_client),
+            limiter=FETCH_LIMITER,
+        )
+        for _ in scheduler.run(
+            (url, url) for url in dict.fromkeys(urls)
+            if research_cache.get_page(url) is None
+        ):
+            if speculation.is_cancelled(report_id):
+                return
+
+        logger.info(
+            "[SPECULATIVE] Warmed %d queries, %d pages for report=%s",
+            len(plan),
+            len(urls),
+            report_id,
+        )
+
+    except Exception:
+        # Best effort: the real run simply starts cold
+        logger.exception("[SPECULATIVE] Prefetch failed for report=%s", report_id)
+
+    finally:
+        db.close()
@@ -0,0 +1,307 @@
+# app/workers/section_worker.py
+
+import json
+import uuid
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.workers.celery_app import celery_app
+from app.config import settings
+from app.db.session import SessionLocal
+from app.db import models
+from app.llm.client import stream_chat
+from app.llm.prompts import SECTION_PROMPT
+from app.services.embedding_service import EmbeddingService
+from app.services.citation_service import CitationService
+from app.services.trend_service import TrendService
+from app.services.vector_store import get_vector_store
+from app.utils.redis_pub import publish_event, redis_client
+from app.utils.redis_lease import ExecutionLease, LeaseLost
+from app.utils.cancellation import CancelToken, Cancelled
+from app.utils.clarification_schema import summary_schema
+
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Retrieval focus per section (added to the title in the evidence query)
+SECTION_FOCUS = {
+    "Problem Context & Validation": "problem pain point challenge struggle survey statistics",
+    "Target Users & Personas": "users customers audience persona demographics needs behaviour",
+    "Existing Solutions": "existing solutions tools apps products workaround alternatives",
+    "Competitor Landscape": "competitors companies startups pricing features market share",
+    "Market & Industry Trends": "market size growth trend forecast funding industry adoption",
+    "Opportunities & Gaps": "gap unmet need opportunity underserved limitation complaint",
+    "Risks & Open Questions": "risk barrier challenge regulation adoption cost failure",
+    "Technical Feasibility": "technology implementation architecture accuracy integration hardware",
+    "Regulatory Considerations": "regulation compliance law privacy approval policy",
+    "Go-To-Market Strategy": "pricing distribution channel acquisition partnership launch",
+}
+
+# Schema fields that anchor every section query to the idea
+QUERY_SCHEMA_FIELDS = ("project_domain", "core_problem")
+
+EVIDENCE_CHARS = 600
+
+# Section that also gets the report's news trend statistics
+TRENDS_SECTION = "Market & Industry Trends"
+
+MAX_RETRIES = 3
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=10,
+    retry_kwargs={"max_retries": MAX_RETRIES},
+)
+def run_sections(self, report_id: str):
+    """
+    Section Writer
+    - Writes every outline section concurrently
+      (at most SECTION_MAX_INFLIGHT LLM streams at once)
+    - Each section retrieves its own top-k evidence from the vector store
+    - Paragraphs are stored as ordered Chunk rows as they stream in
+    - Sections finished by an earlier attempt are skipped on retry
+    - News trends are aggregated first (no LLM) and fed to the trends section
+    - Citations for the whole report are matched + written at the end,
+      each section against the evidence it was written from
+    - On cancellation every open LLM stream is closed within seconds
+    """
+
+    lease = ExecutionLease("sections", report_id)
+    if not lease.acquire():
+        logger.info("[SECTIONS] Already running for report=%s", report_id)
+        return
+
+    db = SessionLocal()
+    done_key = f"sections:{report_id}:done"
+    # section_id → retrieved hits, kept for citing across retries
+    evidence_key = f"sections:{report_id}:evidence"
+
+    try:
+        report = db.query(models.Report).filter_by(id=report_id).first()
+        if not report:
+            raise ValueError("Report not found")
+
+        session = db.query(models.Session).filter_by(id=report.session_id).first()
+        if not session or not session.clarified_summary:
+            raise ValueError("Clarified summary missing")
+
+        token = CancelToken(session.id)
+        token.check()
+
+        sections = (
+            db.query(models.Section.id, models.Section.title)
+            .filter_by(report_id=report_id)
+            .order_by(models.Section.order_index)
+            .all()
+        )
+        if not sections:
+            raise ValueError("Outline missing")
+
+        finished = {m.decode() for m in redis_client.smembers(done_key)}
+        pending = [(sid, title) for sid, title in sections if sid not in finished]
+
+        trends = TrendService.describe(TrendService(db).build(report_id))
+
+        summary = _summary_text(session.clarified_summary)
+        anchor = _query_anchor(session.clarified_summary)
+        store = get_vector_store(report_id)
+        embedder = EmbeddingService()
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=settings.SECTION_MAX_INFLIGHT) as executor:
+            futures = {
+                executor.submit(
+                    write_section,
+                    report_id, section_id, title,
+                    summary, anchor, store, embedder, lease, token,
+                    trends if title == TRENDS_SECTION else "",
+                ): title
+                for section_id, title in pending
+            }
+
+            for future in as_completed(futures):
+                title = futures[future]
+                try:
+                    section_id, chunks, hits = future.result()
+                except (LeaseLost, Cancelled):
+                    raise
+                except Exception:
+                    logger.exception("[SECTIONS] Failed section=%s", title)
+                    failed.append(title)
+                    continue
+
+                pipe = redis_client.pipeline(transaction=True)
+                pipe.hset(evidence_key, section_id, json.dumps([
+                    {"source_id": hit.get("source_id"), "text": hit.get("text")}
+                    for hit in hits
+                ]))
+                pipe.sadd(done_key, section_id)
+                pipe.expire(evidence_key, 24 * 3600)
+                pipe.expire(done_key, 24 * 3600)
+                pipe.execute()
+                logger.info("[SECTIONS] Wrote %d chunks for section=%s", chunks, title)
+
+        if failed:
+            # Retry only rewrites the failed sections
+            raise RuntimeError(f"Section writing failed: {failed}")
+
+        lease.check()
+        token.check()
+        retrieved = {
+            section_id.decode(): json.loads(hits)
+            for section_id, hits in redis_client.hgetall(evidence_key).items()
+        }
+        citations = CitationService(db).cite_report(report_id, retrieved)
+        redis_client.delete(done_key, evidence_key)
+
+        publish_event("sections_done", {
+            "report_id": report_id,
+            "sections": len(sections),
+            "citations": citations,
+        })
+
+    except LeaseLost:
+        logger.warning("[SECTIONS] Lease lost for report=%s, stopping", report_id)
+
+    except Cancelled:
+        logger.info("[SECTIONS] Cancelled report=%s", report_id)
+
+    except Exception as e:
+        publish_event(
+            "sections_failed",
+            {
+                "report_id": report_id,
+                "error": str(e),
+                # No retry left: the session stops here
+                "final": self.request.retries >= MAX_RETRIES,
+            },
+        )
+        raise
+
+    finally:
+        db.close()
+        lease.release()
+
+
+def write_section(
+    report_id: str,
+    section_id: str,
+    title: str,
+    summary: str,
+    anchor: str,
+    store,
+    embedder: EmbeddingService,
+    lease: ExecutionLease,
+    token: CancelToken,
+    trends: str = "",
+) -> tuple[str, int, list[dict]]:
+    """
+    Retrieve → stream → persist one section (own DB session, thread-safe).
+    Returns (section_id, chunks written, retrieved hits).
+    """
+    # Queued behind other sections when the session was cancelled
+    token.check()
+
+    query = " ".join(filter(None, (title, SECTION_FOCUS.get(title), anchor)))
+    hits = store.search(embedder.embed_query(query), k=settings.SECTION_EVIDENCE_K)
+
+    evidence = _format_evidence(hits)
+    if trends:
+        evidence = f"{trends}\n\n{evidence}"
+
+    prompt = (
+        SECTION_PROMPT
+        .replace("{{SECTION_TITLE}}", title)
+        .replace("{{CLARIFIED_SUMMARY}}", summary)
+        .replace("{{EVIDENCE}}", evidence)
+    )
+
+    db = SessionLocal()
+    try:
+        # Idempotent: a retried section starts from scratch
+        db.query(models.Chunk).filter_by(section_id=section_id).delete()
+        db.commit()
+
+        chunk_index = 0
+
+        def emit(paragraph: str):
+            nonlocal chunk_index
+            lease.check()
+            db.add(models.Chunk(
+                id=str(uuid.uuid4()),
+                section_id=section_id,
+                chunk_text=paragraph,
+                chunk_index=chunk_index,
+            ))
+            db.commit()
+
+            publish_event("section_chunk", {
+                "report_id": report_id,
+                "section_id": section_id,
+                "chunk_index": chunk_index,
+                "text": paragraph,
+            })
+            chunk_index += 1
+
+        buffer = ""
+        # closing(): a cancel mid-stream closes the HTTP stream right away
+        with closing(stream_chat(messages=[{"role": "system", "content": prompt}])) as deltas:
+            for delta in deltas:
+                token.check()
+                buffer += delta
+                while "\n\n" in buffer:
+                    paragraph, buffer = buffer.split("\n\n", 1)
+                    if paragraph.strip():
+                        emit(paragraph.strip())
+
+        if buffer.strip():
+            emit(buffer.strip())
+
+        if chunk_index == 0:
+            raise ValueError(f"LLM returned empty section: {title}")
+
+        return section_id, chunk_index, hits
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+def _format_evidence(hits: list[dict]) -> str:
+    if not hits:
+        return "(no evidence retrieved)"
+
+    return "\n\n".join(
+        f"[{i}] ({hit.get('domain') or 'unknown'}) {hit['text'][:EVIDENCE_CHARS]}"
+        for i, hit in enumerate(hits, start=1)
+    )
+
+
+def _summary_text(clarified_summary: str) -> str:
+    schema = summary_schema(clarified_summary)
+    if not schema:
+        return clarified_summary or ""
+    return "\n".join(
+        f"- {key}: {value}"
+        for key, value in schema.items()
+        if value not in (None, "", [])
+    )
+
+
+def _query_anchor(clarified_summary: str) -> str:
+    schema = summary_schema(clarified_summary)
+    return " ".join(
+        str(schema[field])
+        for field in QUERY_SCHEMA_FIELDS
+        if schema.get(field)
+    )
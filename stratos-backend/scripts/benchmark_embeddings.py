@@ -0,0 +1,45 @@
+# Embedding throughput benchmark (CPU only, no network)
+#
+#   python -m scripts.benchmark_embeddings [n_chunks]
+
+import sys
+import random
+
+from app.services.embedding_service import EmbeddingService, get_encoder
+
+WORDS = (
+    "market user problem solution startup pricing workflow team data "
+    "platform customer growth tool integration feedback analytics cost "
+    "automation revenue product feature adoption research competitor"
+).split()
+
+
+def synthetic_chunks(n: int, words_per_chunk: int = 180) -> list[str]:
+    rng = random.Random(42)
+    return [
+        " ".join(rng.choices(WORDS, k=words_per_chunk))
+        for _ in range(n)
+    ]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    texts = synthetic_chunks(n)
+    encoder = get_encoder()
+
+    print(f"encoder={type(encoder).__name__} dim={encoder.dim} chunks={n}")
+    print(f"{'batch':>6} {'seconds':>9} {'chunks/s':>10}")
+
+    for batch_size in (8, 32, 64, 128, 256):
+        batch = EmbeddingService(encoder=encoder, batch_size=batch_size).embed_texts(texts)
+        print(
+            f"{batch_size:>6} "
+            f"{batch.stats['seconds']:>9.3f} "
+            f"{batch.stats['chunks_per_sec']:>10.1f}"
+        )
+
+    print(f"matrix: {batch.vectors.dtype} {batch.vectors.shape} {batch.vectors.nbytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
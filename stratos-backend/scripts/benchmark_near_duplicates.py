@@ -0,0 +1,59 @@
+# Near-duplicate detection benchmark on a synthetic corpus
+#
+#   python -m scripts.benchmark_near_duplicates [n_originals] [threshold]
+#
+# Each original gets 0-3 copies with a small fraction of words edited
+# (syndication / boilerplate drift). Reports precision, recall, throughput.
+
+import sys
+import time
+import random
+
+from app.utils.near_duplicate import NearDuplicateIndex
+
+VOCAB = [f"w{i}" for i in range(5000)]
+
+
+def make_corpus(n: int, words: int = 60, edit_rate: float = 0.02, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = []  # (key, text, original key or None)
+
+    for i in range(n):
+        base = rng.choices(VOCAB, k=words)
+        corpus.append((f"o{i}", " ".join(base), None))
+
+        for j in range(rng.randint(0, 3)):
+            copy = [
+                rng.choice(VOCAB) if rng.random() < edit_rate else w
+                for w in base
+            ]
+            corpus.append((f"o{i}-d{j}", " ".join(copy), f"o{i}"))
+
+    rng.shuffle(corpus)
+    return corpus
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.8
+    corpus = make_corpus(n)
+    truth = {key: origin or key for key, _, origin in corpus}
+
+    index = NearDuplicateIndex(threshold=threshold)
+
+    started = time.perf_counter()
+    flagged = {key: index.add(key, text) for key, text, _ in corpus}
+    elapsed = time.perf_counter() - started
+
+    expected = len(corpus) - len({truth[k] for k in truth})
+    hits = [key for key, dup in flagged.items() if dup is not None]
+    correct = sum(1 for key in hits if truth[key] == truth[flagged[key]])
+
+    print(f"docs={len(corpus)} threshold={threshold} bands={index.bands}x{index.rows}")
+    print(f"throughput: {len(corpus) / elapsed:,.0f} docs/s ({elapsed:.2f}s)")
+    print(f"flagged={len(hits)} expected={expected} precision={correct / max(len(hits), 1):.3f} "
+          f"recall={correct / max(expected, 1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Vector store query latency benchmark (local memory-mapped backend)
+#
+#   python -m scripts.benchmark_vector_store [rows ...]
+#
+# Defaults to 10k and 1M chunks (1M x 384 float32 ≈ 1.5 GB on disk).
+
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+from app.services.vector_store import LocalVectorStore
+
+DIM = 384
+APPEND_ROWS = 100_000
+QUERIES = 50
+TYPES = ("web", "news", "patent")
+
+
+def populate(store: LocalVectorStore, rows: int, rng):
+    for start in range(0, rows, APPEND_ROWS):
+        n = min(APPEND_ROWS, rows - start)
+        vectors = rng.standard_normal((n, DIM), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        metadatas = [
+            {"type": TYPES[i % 3], "domain": f"site{i % 200}.com", "chunk_index": start + i}
+            for i in range(n)
+        ]
+        store.add(vectors, metadatas)
+
+
+def time_queries(store: LocalVectorStore, queries, **kwargs) -> float:
+    started = time.perf_counter()
+    for q in queries:
+        store.search(q, k=10, **kwargs)
+    return (time.perf_counter() - started) / len(queries) * 1000
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 1_000_000]
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((QUERIES, DIM), dtype=np.float32)
+
+    for rows in sizes:
+        root = tempfile.mkdtemp(prefix="stratos-vs-")
+        try:
+            store = LocalVectorStore("bench", dim=DIM, root=root)
+
+            started = time.perf_counter()
+            populate(store, rows, rng)
+            append_s = time.perf_counter() - started
+
+            brute = time_queries(store, queries)
+            filtered = time_queries(store, queries, source_type="news")
+
+            line = (
+                f"rows={rows:>9,} append={append_s:7.2f}s "
+                f"brute={brute:8.2f}ms filtered={filtered:8.2f}ms"
+            )
+
+            if store.build_index():
+                ivf = time_queries(store, queries)
+                line += f" ivf={ivf:8.2f}ms"
+
+            print(line)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Import smoke check: every app module must import on its own
+#
+#   python -m scripts.check_imports [module ...]
+#
+# Each module is imported in a fresh interpreter, so an import cycle
+# shows up no matter which module happens to be imported first.
+# Needs the usual env (DATABASE_URL, LLM_PROVIDER, ...); no services
+# are contacted at import time.
+
+import sys
+import pathlib
+import subprocess
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def app_modules() -> list[str]:
+    modules = []
+    for path in sorted((ROOT / "app").rglob("*.py")):
+        parts = path.relative_to(ROOT).with_suffix("").parts
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        modules.append(".".join(parts))
+    return modules
+
+
+def main():
+    modules = sys.argv[1:] or ["app.main", *app_modules()]
+
+    failed = []
+    for module in modules:
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            error = (result.stderr.strip().splitlines() or ["?"])[-1]
+            failed.append(module)
+            print(f"FAIL {module}: {error}")
+
+    print(f"{len(modules) - len(failed)}/{len(modules)} modules import cleanly")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
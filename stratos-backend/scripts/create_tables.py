@@ -1,3 +1,6 @@
+# Fresh database only: existing tables are never altered
+# (upgrade an existing one with python -m scripts.migrate_schema)
+
 from app.db.database import Base, engine
 from app.db import models
 
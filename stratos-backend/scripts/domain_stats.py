@@ -0,0 +1,42 @@
+# Per-domain research counters (flushed by run_research) for tuning
+# app/data/domain_policy.json
+#
+#   python -m scripts.domain_stats [top_n]
+
+import sys
+
+from app.utils.redis_pub import redis_client
+from app.utils.domain_policy import get_domain_policy
+
+EVENTS = ("seen", "denied", "fetched", "failed", "kept")
+
+
+def main():
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    policy = get_domain_policy()
+
+    rows = []
+    for key in redis_client.scan_iter("domain_stats:*"):
+        domain = key.decode().split(":", 1)[1]
+        counts = {
+            k.decode(): int(v)
+            for k, v in redis_client.hgetall(key).items()
+        }
+        rows.append((domain, counts))
+
+    rows.sort(key=lambda r: r[1].get("seen", 0), reverse=True)
+
+    print(f"{'domain':<32} " + " ".join(f"{e:>7}" for e in EVENTS) + f" {'keep%':>6} {'score':>6}")
+    for domain, counts in rows[:top_n]:
+        fetched = counts.get("fetched", 0)
+        keep = counts.get("kept", 0) / fetched * 100 if fetched else 0.0
+        score = policy.evaluate(f"https://{domain}/").score
+        print(
+            f"{domain:<32} "
+            + " ".join(f"{counts.get(e, 0):>7}" for e in EVENTS)
+            + f" {keep:>5.0f}% {score:>6.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
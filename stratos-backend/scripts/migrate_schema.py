@@ -0,0 +1,79 @@
+# Bring an existing database up to the current models (Postgres)
+#
+#   python -m scripts.migrate_schema
+#
+# create_tables.py (create_all) only creates missing tables; columns,
+# indexes and constraints added to existing tables are applied here.
+# Safe to re-run: every statement is IF NOT EXISTS / checked first.
+
+from sqlalchemy import text
+
+from app.db.database import Base, engine
+from app.db import models
+
+# (model, column) added after the table first shipped
+ADDED_COLUMNS = [
+    (models.User, "plan_tier"),
+    (models.Session, "batch_id"),
+    (models.Source, "title"),
+    (models.Source, "publisher"),
+    (models.Source, "published_at"),
+    (models.Source, "content"),
+    (models.Trend, "stats"),
+    (models.ExportRecord, "content_hash"),
+]
+
+EXPORTS_UNIQUE = "exports_report_id_file_type_content_hash_key"
+
+
+def add_column(conn, model, name: str):
+    column = model.__table__.c[name]
+    ddl = f"ADD COLUMN IF NOT EXISTS {name} {column.type.compile(dialect=engine.dialect)}"
+    if column.default is not None and column.default.is_scalar:
+        ddl += f" DEFAULT '{column.default.arg}'"
+    conn.execute(text(f"ALTER TABLE {model.__tablename__} {ddl}"))
+
+    if column.index:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{model.__tablename__}_{name} "
+            f"ON {model.__tablename__} ({name})"
+        ))
+
+
+def add_exports_unique(conn):
+    exists = conn.execute(
+        text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+        {"name": EXPORTS_UNIQUE},
+    ).first()
+    if exists:
+        return
+
+    # Keep the newest artifact per (report, format, content)
+    conn.execute(text("""
+        DELETE FROM exports e
+        USING exports newer
+        WHERE e.report_id = newer.report_id
+          AND e.file_type = newer.file_type
+          AND e.content_hash = newer.content_hash
+          AND (e.created_at, e.id) < (newer.created_at, newer.id)
+    """))
+    conn.execute(text(
+        f"ALTER TABLE exports ADD CONSTRAINT {EXPORTS_UNIQUE} "
+        "UNIQUE (report_id, file_type, content_hash)"
+    ))
+
+
+def main():
+    # New tables (report_snapshots, ...) first
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        for model, name in ADDED_COLUMNS:
+            add_column(conn, model, name)
+        add_exports_unique(conn)
+
+    print("Schema up to date!")
+
+
+if __name__ == "__main__":
+    main()